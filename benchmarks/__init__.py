@@ -0,0 +1,5 @@
+"""
+Benchmarks package
+Standalone timing scripts for performance-sensitive paths.
+Run a module directly, e.g. `python -m benchmarks.bench_chunk_review`.
+"""
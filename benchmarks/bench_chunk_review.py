@@ -0,0 +1,65 @@
+"""ChunkReviewDialog open time and decision flips for a file with many chunks.
+
+Run on two revisions to compare, e.g. before and after a styling change:
+
+    python -m benchmarks.bench_chunk_review --chunks 500
+"""
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import get_qt_app, measure, report
+
+
+def make_contents(chunks, gap=10):
+    """Old/new text where every `gap`-th line differs, giving `chunks` separate chunks"""
+    old_lines = []
+    new_lines = []
+    for i in range(chunks * gap):
+        line = f"value_{i} = compute({i}, factor={i % 7})\n"
+        old_lines.append(line)
+        new_lines.append(line.replace("compute", "compute_fast") if i % gap == 0 else line)
+    return "".join(old_lines), "".join(new_lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = get_qt_app()
+    from ui.dialogs.chunk_review_dialog import ChunkReviewDialog
+
+    old_content, new_content = make_contents(args.chunks)
+    file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_chunk_review.tmp")
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(new_content)
+
+    def open_dialog():
+        dialog = ChunkReviewDialog(file_path, old_content, new_content)
+        dialog.show()
+        while dialog.computing:  # The diff runs on the background worker
+            app.processEvents()
+        app.processEvents()  # Widgets are polished when first shown
+        return dialog
+
+    def flip_all(dialog):
+        dialog.accept_all_new()
+        dialog.reject_all_new()
+        app.processEvents()
+
+    try:
+        dialogs = []
+        report(f"open dialog ({args.chunks} chunks)",
+               measure(lambda: dialogs.append(open_dialog()), args.repeat))
+        report(f"accept all + revert all ({args.chunks} chunks)",
+               measure(flip_all, args.repeat, setup=lambda: dialogs.pop()))
+    finally:
+        os.remove(file_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""core.diff against difflib on the benchmark corpus.
+
+    python -m benchmarks.bench_diff
+    python -m benchmarks.bench_diff --differ-max-lines 20000   # also time Differ on big files
+"""
+import argparse
+import difflib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, report
+from benchmarks.corpus import CASES
+from core.diff import get_opcodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--differ-max-lines", type=int, default=1000,
+                        help="skip difflib.Differ above this size, it takes minutes")
+    args = parser.parse_args()
+
+    for name, make in CASES.items():
+        old, new = make()
+        print(f"\n{name}: {len(old):,} -> {len(new):,} lines")
+        report("  core.diff.get_opcodes", measure(lambda: get_opcodes(old, new), args.repeat))
+        report("  difflib.SequenceMatcher.get_opcodes",
+               measure(lambda: difflib.SequenceMatcher(None, old, new).get_opcodes(), args.repeat))
+        if max(len(old), len(new)) <= args.differ_max_lines:
+            report("  difflib.Differ.compare",
+                   measure(lambda: list(difflib.Differ().compare(old, new)), 1))
+        else:
+            old_part, new_part = old[:args.differ_max_lines], new[:args.differ_max_lines]
+            report(f"  difflib.Differ.compare (first {args.differ_max_lines:,})",
+                   measure(lambda: list(difflib.Differ().compare(old_part, new_part)), 1))
+
+
+if __name__ == "__main__":
+    main()
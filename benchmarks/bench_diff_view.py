@@ -0,0 +1,54 @@
+"""FileDiffDialog-style side-by-side view of a large diff: rows, first paint and scrolling.
+
+The target is a 200k-line diff opened (diffed, laid out and painted) in under a second:
+
+    python -m benchmarks.bench_diff_view --lines 200000
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import get_qt_app, measure, report
+from benchmarks.corpus import scattered_edits
+from core.diff import get_opcodes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = get_qt_app()
+    from ui.widgets.diff_view import DiffView, side_by_side_rows, link_scrolling
+
+    old, new = scattered_edits(args.lines)
+    old_view, new_view = DiffView(), DiffView()
+    link_scrolling(old_view, new_view)
+    for view in (old_view, new_view):
+        view.resize(600, 800)
+        view.show()
+
+    def open_diff():
+        old_rows, new_rows = side_by_side_rows(old, new, get_opcodes(old, new))
+        old_view.set_rows(old_rows)
+        new_view.set_rows(new_rows)
+        old_view.viewport().repaint()
+        new_view.viewport().repaint()
+
+    def scroll_pages():
+        bar = old_view.verticalScrollBar()
+        for value in range(0, bar.maximum(), bar.maximum() // 50 or 1):
+            bar.setValue(value)
+            old_view.viewport().repaint()
+            new_view.viewport().repaint()
+        app.processEvents()
+
+    report(f"diff + rows + first paint ({args.lines:,} lines)", measure(open_diff, args.repeat))
+    report("50 scroll jumps, both panes", measure(scroll_pages, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
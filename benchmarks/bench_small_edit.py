@@ -0,0 +1,50 @@
+"""One edited line in a large file: prefix/suffix trimming, interning and re-diffing.
+
+    python -m benchmarks.bench_small_edit
+    python -m benchmarks.bench_small_edit --lines 100000
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, report
+from benchmarks.corpus import small_edit
+from core import diff
+from core.diff import common_affixes, get_opcodes, intern_lines
+from core.incremental_diff import line_hashes, rediff_window
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    old, new = small_edit(args.lines)
+    # Separately read files share no line objects, so every comparison looks at the text
+    old = "".join(old).splitlines(keepends=True)
+    new = "".join(new).splitlines(keepends=True)
+    edited = list(new)
+    edited[args.lines // 2 + 10] = "    // patched again\n"
+    print(f"small_edit: {len(old):,} lines, NumPy {'available' if diff.np is not None else 'not installed'}")
+
+    report("  line-by-line trim (before)",
+           measure(lambda: diff._trim(old, 0, len(old), new, 0, len(new), []), args.repeat))
+    report("  common_affixes, lines", measure(lambda: common_affixes(old, new), args.repeat))
+    report("  intern_lines, whole file", measure(lambda: intern_lines(old, new), args.repeat))
+    report("  get_opcodes", measure(lambda: get_opcodes(old, new), args.repeat))
+
+    opcodes = get_opcodes(old, new)
+    new_hashes = line_hashes(new)
+    edited_hashes = line_hashes(edited)
+    report("  line_hashes", measure(lambda: line_hashes(edited), args.repeat))
+    report("  common_affixes, line hashes",
+           measure(lambda: common_affixes(new_hashes, edited_hashes), args.repeat))
+    report("  rediff_window",
+           measure(lambda: rediff_window(old, opcodes, new_hashes, edited, edited_hashes), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
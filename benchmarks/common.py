@@ -0,0 +1,30 @@
+"""Shared helpers for benchmark scripts"""
+import os
+import statistics
+import time
+
+
+def get_qt_app():
+    """Return the QApplication, creating an offscreen one when run headless"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def measure(fn, repeat=5, setup=None):
+    """Run `fn` `repeat` times and return the timings in milliseconds.
+
+    `setup` runs before every timed call and its return value is passed to `fn`.
+    """
+    timings = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings):
+    print(f"{name:<40} median {statistics.median(timings):9.1f} ms   "
+          f"min {min(timings):9.1f} ms   max {max(timings):9.1f} ms")
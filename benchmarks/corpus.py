@@ -0,0 +1,85 @@
+"""Synthetic old/new file pairs shaped like the changes we review"""
+import random
+
+
+def _source_lines(count, seed=0):
+    """Code-like lines: mostly unique statements with repeated braces and blank lines"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        r = rng.random()
+        if r < 0.12:
+            lines.append("}\n")
+        elif r < 0.2:
+            lines.append("\n")
+        else:
+            lines.append(f"    $row_{i} = $db->query('SELECT * FROM t{i % 97} WHERE id = ' . ${rng.randint(0, 999)});\n")
+    return lines
+
+
+def small_edit(lines=30000):
+    """One changed line in the middle of a large file"""
+    old = _source_lines(lines)
+    new = list(old)
+    new[lines // 2] = "    // patched\n"
+    return old, new
+
+
+def scattered_edits(lines=20000, every=40):
+    """A change every `every` lines"""
+    old = _source_lines(lines)
+    new = [("    // changed\n" if i % every == 0 else line) for i, line in enumerate(old)]
+    return old, new
+
+
+def full_rewrite(lines=20000):
+    """Regenerated file that shares only braces and blank lines with the old one"""
+    return _source_lines(lines, seed=1), _source_lines(lines, seed=2)
+
+
+def reorder(lines=20000, block=200):
+    """Same lines with blocks of `block` lines moved around"""
+    old = _source_lines(lines)
+    blocks = [old[i:i + block] for i in range(0, lines, block)]
+    random.Random(3).shuffle(blocks)
+    return old, [line for chunk in blocks for line in chunk]
+
+
+def small_edit_huge(lines=200000):
+    """One changed line in the middle of a very large file"""
+    return small_edit(lines)
+
+
+def minified(lines=40, width=100000, edits=3):
+    """Bundled JS: a few enormous lines, `edits` of them with one renamed identifier"""
+    rng = random.Random(4)
+    old = []
+    for i in range(lines):
+        parts = []
+        size = 0
+        while size < width:
+            part = f"function f{rng.randint(0, 99999)}(a,b){{return a.v{rng.randint(0, 999)}+b*{rng.randint(0, 9)}}};"
+            parts.append(part)
+            size += len(part)
+        old.append("".join(parts) + "\n")
+    new = list(old)
+    for i in rng.sample(range(lines), min(edits, lines)):
+        new[i] = new[i].replace("return a.", "return a._", 1)
+    return old, new
+
+
+def crlf_flip(lines=20000):
+    """Same text saved with CRLF instead of LF: every line differs"""
+    old = _source_lines(lines)
+    return old, [line[:-1] + "\r\n" if line.endswith("\n") else line for line in old]
+
+
+CASES = {
+    'small_edit': small_edit,
+    'small_edit_huge': small_edit_huge,
+    'scattered_edits': scattered_edits,
+    'full_rewrite': full_rewrite,
+    'reorder': reorder,
+    'minified': minified,
+    'crlf_flip': crlf_flip,
+}
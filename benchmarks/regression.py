@@ -0,0 +1,177 @@
+"""Diff code paths timed on every corpus case and checked against a saved baseline.
+
+Record a baseline on the machine (and revision) to compare against, then rerun
+after a change; the exit status is 1 when any path got slower than the tolerance:
+
+    python -m benchmarks.regression --save
+    python -m benchmarks.regression
+    python -m benchmarks.regression --case minified --path get_opcodes --tolerance 0.5
+
+Paths that need Qt (or the monolith's dependencies) are skipped when those are
+not installed. Caches are cleared before every timed call, so each run measures
+the work itself rather than a cache hit.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, report
+from benchmarks.corpus import CASES
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_TOLERANCE = 0.25   # Allowed slowdown against the baseline median (0.25 = 25 %)
+MIN_DELTA_MS = 5.0         # Slowdowns smaller than this are timer noise, never regressions
+
+
+class BenchPath:
+    """One timed code path: `run(old_lines, new_lines)`, skipped on cases longer than `max_lines`"""
+    def __init__(self, name, run, max_lines=None):
+        self.name = name
+        self.run = run
+        self.max_lines = max_lines
+
+
+def _engine_paths():
+    """Paths that only need the diff engine"""
+    from core.diff import get_opcodes
+    from core.merge3 import merge3
+    from core.models import FileChangeEntry
+    from core.syntax import PHP, tokenize_lines
+    from services.diff_service import load_and_diff
+
+    def changes(old, new):
+        return FileChangeEntry("/bench/file.php", "".join(old), "".join(new), "/bench").get_diff_lines()
+
+    def merge(old, new):
+        return merge3(old, ["// local edit\n"] + old, new)
+
+    return [
+        BenchPath("get_opcodes", get_opcodes),
+        BenchPath("load_and_diff", lambda old, new: load_and_diff("".join(old), "".join(new))),
+        BenchPath("get_diff_lines", changes),
+        BenchPath("merge3", merge),
+        BenchPath("tokenize_lines", lambda old, new: tokenize_lines(new, PHP)),
+    ]
+
+
+def _qt_paths():
+    """Paths that build Qt models or the monolith's HTML views"""
+    from benchmarks.common import get_qt_app
+    get_qt_app()
+    from services.diff_service import load_and_diff
+    from ui.dialogs.chunk_review_dialog import ChunkReviewDialog
+    from ui.models.chunk_list_model import ChunkListModel
+    from ui.widgets.diff_view import side_by_side_rows
+    from core.diff import get_opcodes
+
+    class ChunkParser:
+        """The part of ChunkReviewDialog that turns a diff into chunk rows"""
+        _set_diff_result = ChunkReviewDialog._set_diff_result
+        _parse_chunks = ChunkReviewDialog._parse_chunks
+
+        def __init__(self):
+            self.chunk_model = ChunkListModel()
+
+    def parse_chunks(old, new):
+        ChunkParser()._parse_chunks(load_and_diff("".join(old), "".join(new)))
+
+    paths = [
+        BenchPath("_parse_chunks", parse_chunks),
+        BenchPath("side_by_side_rows", lambda old, new: side_by_side_rows(old, new, get_opcodes(old, new))),
+    ]
+    try:
+        from compare_observer import FileDiffDialog
+        highlight_content = FileDiffDialog._highlight_content
+    except (ImportError, AttributeError) as e:
+        print(f"Skipping _highlight_content: {e}")
+        return paths
+
+    def highlight(old, new):
+        old_text, new_text = "".join(old), "".join(new)
+        highlight_content(None, old_text, new_text, is_old=True)
+        highlight_content(None, new_text, old_text, is_old=False)
+
+    # The HTML view is only meant for files of a few thousand lines
+    paths.append(BenchPath("_highlight_content", highlight, max_lines=30000))
+    return paths
+
+
+def bench_paths():
+    paths = []
+    for group in (_engine_paths, _qt_paths):
+        try:
+            paths += group()
+        except (ImportError, AttributeError) as e:
+            print(f"Skipping {group.__name__.strip('_')}: {e}")
+    return paths
+
+
+def clear_caches():
+    from core.diff_cache import diff_cache
+    from core.syntax import token_cache
+    diff_cache.clear()
+    token_cache.clear()
+
+
+def load_baseline(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--case", action="append", choices=sorted(CASES), help="only these corpus cases")
+    parser.add_argument("--path", action="append", help="only these code paths")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="record the medians as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA_MS, help="ms")
+    args = parser.parse_args()
+
+    paths = [p for p in bench_paths() if not args.path or p.name in args.path]
+    baseline = load_baseline(args.baseline)
+    medians = {}
+    regressions = []
+    for name in args.case or CASES:
+        old, new = CASES[name]()
+        print(f"\n{name}: {len(old):,} -> {len(new):,} lines")
+        for path in paths:
+            if path.max_lines is not None and max(len(old), len(new)) > path.max_lines:
+                continue
+            key = f"{name}/{path.name}"
+            timings = measure(lambda _: path.run(old, new), args.repeat, setup=clear_caches)
+            median = medians[key] = statistics.median(timings)
+            report(f"  {path.name}", timings)
+            before = baseline.get(key)
+            if before is not None and median > before * (1 + args.tolerance) and median - before > args.min_delta:
+                regressions.append((key, before, median))
+                print(f"  ^ REGRESSION: {before:.1f} ms -> {median:.1f} ms (+{(median / before - 1) * 100:.0f}%)")
+
+    if args.save:
+        baseline.update(medians)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline} ({len(medians)} timings)")
+        return 0
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save first")
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} path(s) slower than {args.tolerance * 100:.0f}% over the baseline:")
+        for key, before, median in regressions:
+            print(f"  {key}: {before:.1f} ms -> {median:.1f} ms")
+        return 1
+    print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
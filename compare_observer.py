@@ -1,6 +1,5 @@
 import sys
 import os
-import hashlib
 import shutil
 import json
 import time
@@ -8,18 +7,34 @@ import requests
 import re
 import threading
 import subprocess
+import multiprocessing
 
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QTableWidget, QTableWidgetItem, QPushButton, QVBoxLayout, QWidget, QHBoxLayout, QHeaderView, 
-    QDialog, QSizePolicy, QLabel, QTextEdit, QLineEdit, QGroupBox, QScrollArea, QTableView, QMessageBox, QCheckBox, QStackedWidget
+    QDialog, QSizePolicy, QLabel, QTextEdit, QLineEdit, QGroupBox, QScrollArea, QTableView, QMessageBox, QCheckBox, QStackedWidget,
+    QComboBox
 )
 from PyQt6.QtCore import QSettings, QThreadPool, QEvent, QObject, QCoreApplication, QAbstractTableModel, Qt, QSize, QThread, pyqtSignal, QByteArray, QTimer, QModelIndex
 from PyQt6.QtGui import QCursor, QPixmap, QIcon, QAction, QFont, QColor, QPainter, QPen
-import difflib
 
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import FileSystemEventHandler, FileModifiedEvent
 #from functools import partial
 
+from ui.models.log_table_model import LogTableModel
+from ui.styles import get_role_stylesheet
+from core.diff import ndiff, unified_diff
+from core.byte_compare import GENERATED, ByteComparison, read_baseline
+from core.compare_modes import EXACT, COMPARE_MODES, digest_cache, files_match
+from core.hunk_apply import write_text_like
+from core.encoding import encoding_cache
+from core.generated import classify_pair, parse_globs
+from core.syntax import language_for
+from core.diff_cache import cached_opcodes
+from services.change_bus import change_bus, path_key
+from services.diff_service import diff_service, load_and_diff, summarize_generated
+from services.patch_export import PatchEntry
+from ui.widgets.diff_view import DiffView, unified_rows
+
 API_URL = "http://khmergaming.436bet.com/app/"
 DEBUG = False
 
@@ -29,7 +44,7 @@ class WatcherThread(QThread):
     preload_complete = pyqtSignal()  # Signal to notify when preload is complete
     # all_preload_complete = pyqtSignal()
 
-    def __init__(self, table_index, table, path, excluded_folders, excluded_files, dialog):
+    def __init__(self, table_index, table, path, excluded_folders, excluded_files, dialog, compare_mode=EXACT):
         super().__init__()
         self.table = table
         self.path = path
@@ -37,13 +52,15 @@ class WatcherThread(QThread):
         self.excluded_files = excluded_files
         self.dialog = dialog
         self.table_index = table_index
+        self.compare_mode = compare_mode
 
         self.observer = Observer()
         self._running = False
 
     def run(self):
         self._running = True
-        self.event_handler = FileEventHandler(self.table, self.path, self.excluded_folders, self.excluded_files, self.dialog)
+        self.event_handler = FileEventHandler(self.table, self.path, self.excluded_folders, self.excluded_files, self.dialog,
+                                              self.compare_mode)
 
         # IMPORTANT: Preload file hashes and capture baseline BEFORE starting observer
         # This ensures we save the current file state as "old code" before watching for changes
@@ -63,12 +80,15 @@ class WatcherThread(QThread):
         # Emit started_watching signal after everything is ready
         self.started_watching.emit()
 
+        # Open review dialogs follow this watcher's changes instead of watching files themselves
+        change_bus.add_source(self.event_handler)
         try:
             while self._running:
                 self.msleep(300)  # Prevent blocking GUI
         except Exception as e:
             print(f"Exception in WatcherThread: {e}")
         finally:
+            change_bus.remove_source(self.event_handler)
             self.stop_observer()  # Ensure observer is properly stopped
             self.stopped_watching.emit()
 
@@ -180,46 +200,14 @@ class CustomCheckBox(QCheckBox):
             painter.drawLine(check_x1, check_y1, check_x2, check_y2)
             painter.drawLine(check_x2, check_y2, check_x3, check_y3)
 
-class LogTableModel(QAbstractTableModel):
-    """ Efficient model for handling large log files in QTableView """
-    def __init__(self, log_file=None):
-        super().__init__()
-        self.log_file = log_file
-        self.lines = []  # Initialize with an empty list
-        if log_file:
-            self.load_lines()
-
-    def load_lines(self):
-        """ Loads only line references (not full file) for efficiency """
-        with open(self.log_file, "r", encoding="utf-8") as f:
-            self.lines = f.readlines()  # Load lines from the file
-        self.layoutChanged.emit()  # Notify the view that the data has changed
-
-    def rowCount(self, parent=None):
-        return len(self.lines)
-
-    def columnCount(self, parent=None):
-        return 1  # One column for log text
-
-    def data(self, index, role):
-        if role == Qt.ItemDataRole.DisplayRole:
-            return self.lines[index.row()].strip()  # Return log text without extra spaces
-        return None
-
-    def append_row(self, new_line):
-        """ Append a new row to the model """
-        QIndex = QModelIndex()  
-        self.beginInsertRows(QIndex, len(self.lines), len(self.lines))  # Notify about row insertion
-        self.lines.append(new_line + "\n")  # Add the new line to the data
-        self.endInsertRows()  # End the row insertion process
-
 class LogDialog(QDialog):
     """Popup window for file scanning logs."""
     
     add_log_signal = pyqtSignal(str)  # Signal to update the table safely from another thread
+    add_file_log_signal = pyqtSignal(str, int)  # Scanned file path and its size in bytes
     upt_log_signal = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, log_file=None):
         super().__init__()
         self.setWindowTitle("Scanning files...")
         self.setMinimumWidth(600)
@@ -252,6 +240,11 @@ class LogDialog(QDialog):
         self.row_layout_user.addWidget(self.user_input_name)
         self.layout.addLayout(self.row_layout_user)
 
+        # Running counter and throughput
+        self.stats_label = QLabel("Scanned: 0 files", self)
+        self.stats_label.setStyleSheet("color: #858585; font-size: 11px;")
+        self.layout.addWidget(self.stats_label)
+
         # Table for logs
         self.table = QTableView()
         self.table.setShowGrid(False)
@@ -261,15 +254,22 @@ class LogDialog(QDialog):
         self.table.resizeRowsToContents()
         self.table.horizontalHeader().setStretchLastSection(True)
 
-        # Initialize the model
-        self.model = LogTableModel()
+        # Initialize the model; with a log file it is memory-mapped instead of kept in memory
+        self.model = LogTableModel(log_file)
         self.table.setModel(self.model)
         self.layout.addWidget(self.table)
 
         # Connect the signal to update the UI safely
         self.add_log_signal.connect(self.model.append_row)
+        self.add_file_log_signal.connect(self.model.append_row)
         self.upt_log_signal.connect(self.setText)
 
+        self._last_sample = (time.monotonic(), 0, 0)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(500)
+        self.stats_timer.timeout.connect(self.update_stats)
+        self.stats_timer.start()
+
     def setLog(self, text):
         """Safely update the table model from another thread."""
         self.add_log_signal.emit(text)  # Emit signal to safely update table
@@ -277,13 +277,34 @@ class LogDialog(QDialog):
     def setText(self, text):
         self.user_input_name.setText(text)
 
+    def update_stats(self):
+        """Refresh the file counter and files/s, MB/s since the previous tick"""
+        now = time.monotonic()
+        last_time, last_rows, last_bytes = self._last_sample
+        rows, size = self.model.total_rows, self.model.total_bytes
+        elapsed = max(now - last_time, 1e-6)
+        files_per_sec = (rows - last_rows) / elapsed
+        mb_per_sec = (size - last_bytes) / elapsed / (1024 * 1024)
+        self._last_sample = (now, rows, size)
+
+        self.stats_label.setText(
+            f"Scanned: {rows:,} files ({size / (1024 * 1024):,.1f} MB) | "
+            f"{files_per_sec:,.0f} files/s | {mb_per_sec:,.1f} MB/s"
+        )
+
+    def done(self, result):
+        # Closing (not hiding) releases a log file's mapping and handle
+        self.model.close()
+        super().done(result)
+
 class FileChangeEntry:
     """Represents a single file change with its content and metadata"""
-    def __init__(self, file_path, old_content, new_content, source_root):
+    def __init__(self, file_path, old_content, new_content, source_root, generated_globs=()):
         self.file_path = file_path
         self.old_content = old_content
         self.new_content = new_content
         self.source_root = source_root
+        self.generated_globs = generated_globs  # The owning system's globs of generated files
         self.relative_path = os.path.relpath(file_path, source_root)
         self.is_selected = True
         
@@ -296,12 +317,14 @@ class FileChangeEntry:
         else:
             old_lines = self.old_content.splitlines()
             new_lines = self.new_content.splitlines()
-            diff = difflib.unified_diff(old_lines, new_lines, lineterm='')
+            diff = unified_diff(old_lines, new_lines, lineterm='',
+                                opcodes=cached_opcodes(old_lines, new_lines))
             return list(diff)[2:]  # Skip the file header lines
 
 class GitSourceCompareDialog(QDialog):
     """Dialog to compare files between Git path and Source path"""
-    def __init__(self, git_path, source_path, backup_path="", without_paths=None, except_paths=None, parent=None):
+    def __init__(self, git_path, source_path, backup_path="", without_paths=None, except_paths=None, parent=None,
+                 compare_mode=EXACT, baselines=None, generated_globs=None):
         super().__init__(parent)
         self.setWindowTitle("Git to Source Comparison")
         self.setMinimumWidth(1000)
@@ -315,6 +338,9 @@ class GitSourceCompareDialog(QDialog):
         self.git_path = git_path
         self.source_path = source_path
         self.backup_path = backup_path
+        self.compare_mode = compare_mode
+        self.baselines = baselines or {}  # Source file -> content captured by the watcher at Start
+        self.generated_globs = generated_globs or []  # The system's globs of generated files
         self.without_paths = [self._normalize_path(p) for p in (without_paths or []) if p]
         self.except_paths = [self._normalize_path(p) for p in (except_paths or []) if p]
         
@@ -339,6 +365,8 @@ class GitSourceCompareDialog(QDialog):
             filter_info.append(f"Without: {', '.join(self.without_paths[:3])}" + ("..." if len(self.without_paths) > 3 else ""))
         if self.except_paths:
             filter_info.append(f"Except: {len(self.except_paths)} path(s)")
+        if self.compare_mode != EXACT:
+            filter_info.append(f"Compare: {COMPARE_MODES[self.compare_mode]}")
         if filter_info:
             filter_label = QLabel("🔍 Filters: " + " | ".join(filter_info))
             filter_label.setStyleSheet("font-size: 11px; color: #888888; padding: 5px;")
@@ -376,6 +404,12 @@ class GitSourceCompareDialog(QDialog):
         self.copy_to_source_btn.setEnabled(False)
         btn_layout.addWidget(self.copy_to_source_btn)
         
+        self.export_btn = QPushButton("Export Patch")
+        self.export_btn.setToolTip("Save what copying the selected files would change as one unified diff or zip")
+        self.export_btn.clicked.connect(self.export_patch)
+        self.export_btn.setEnabled(False)
+        btn_layout.addWidget(self.export_btn)
+        
         close_btn = QPushButton("Close")
         close_btn.clicked.connect(self.accept)
         btn_layout.addWidget(close_btn)
@@ -531,24 +565,6 @@ class GitSourceCompareDialog(QDialog):
         else:
             return False, "Path does not exist"
     
-    def _normalize_file_content(self, file_path):
-        """Normalize file content for comparison - handles line endings, encoding, etc."""
-        try:
-            # Try reading as text first
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            # Normalize line endings to LF
-            content = content.replace('\r\n', '\n').replace('\r', '\n')
-            # Strip trailing whitespace from each line
-            content = '\n'.join(line.rstrip() for line in content.split('\n'))
-            # Remove trailing newlines at end of file
-            content = content.rstrip('\n')
-            return content.encode('utf-8')
-        except Exception:
-            # If text reading fails, read as binary
-            with open(file_path, 'rb') as f:
-                return f.read()
-
     # Add this method to GitSourceCompareDialog class
     def scan_changes(self):
         """Scan for differences between Git and Source paths"""
@@ -625,14 +641,8 @@ class GitSourceCompareDialog(QDialog):
                                 else:
                                     # Compare file contents - only show if files are DIFFERENT
                                     try:
-                                        # Read as binary for accurate comparison
-                                        with open(git_file, 'rb') as f1:
-                                            git_content = f1.read()
-                                        with open(source_file, 'rb') as f2:
-                                            source_content = f2.read()
-                                        
-                                        # Compare content directly - if identical, skip (don't add to changes)
-                                        if git_content != source_content:
+                                        # Cached per-mode digests; identical files are skipped (not added to changes)
+                                        if not files_match(git_file, source_file, self.compare_mode):
                                             status = "Modified"
                                     except (OSError, PermissionError, TimeoutError) as e:
                                         status = f"Error reading: {str(e)[:50]}"
@@ -730,6 +740,7 @@ class GitSourceCompareDialog(QDialog):
             status_text += f" (Filters active: {', '.join(filter_info)})"
         self.status_label.setText(status_text)
         self.copy_to_source_btn.setEnabled(len(self.changes) > 0)
+        self.export_btn.setEnabled(len(self.changes) > 0)
     
     def add_change_to_list(self, display_path, status, git_file, source_file, git_rel_path):
         """Add a detected change to the list widget"""
@@ -773,48 +784,25 @@ class GitSourceCompareDialog(QDialog):
         view_btn = QPushButton(btn_text)
         view_btn.setToolTip(btn_tooltip)
         view_btn.setFixedHeight(24)  # Fixed small height, smaller than row
-        view_btn.setStyleSheet("""
-            QPushButton {
-                padding: 0px 6px;
-                font-size: 11px;
-                border-radius: 3px;
-            }
-        """)
+        view_btn.setProperty('role', 'rowAction')
         view_btn.clicked.connect(lambda checked, g=git_file, s=source_file: self.view_diff(g, s))
         self.file_list.setCellWidget(row, 2, view_btn)
         
+    def _baseline(self, source_file):
+        """Watcher baseline of a source file, if it was captured; a file changed on both sides is merged against it"""
+        return self.baselines.get(source_file.replace("\\", "/"), self.baselines.get(source_file))
+    
     def view_diff(self, git_file, source_file):
         """View line-by-line diff between git and source with individual chunk control"""
         try:
-            # Read source content (old/current)
-            if os.path.exists(source_file):
-                with open(source_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    source_content = f.read()
-            else:
-                source_content = ""
-            
-            # Read git content (new/from git)
-            if os.path.exists(git_file):
-                with open(git_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    git_content = f.read()
-            else:
-                git_content = ""
-            
-            # Check if there are differences
-            if source_content == git_content:
-                QMessageBox.information(
-                    self,
-                    "No Differences",
-                    "Files are identical. No changes to apply."
-                )
-                return
-            
             # Import ChunkReviewDialog
             from ui.dialogs.chunk_review_dialog import ChunkReviewDialog
             
             # Use ChunkReviewDialog for line-by-line control
-            # old_content = source (current), new_content = git (to apply)
-            dialog = ChunkReviewDialog(source_file, source_content, git_content, self)
+            # old = source (current), new = git (to apply); both are read on the diff worker
+            dialog = ChunkReviewDialog(source_file, None, None, self, old_path=source_file, new_path=git_file,
+                                       base_content=self._baseline(source_file),
+                                       generated_globs=self.generated_globs, close_if_identical=True)
             dialog.setWindowTitle(f"Git → Source - {os.path.basename(source_file)}")
             
             # Update info label to clarify direction
@@ -836,6 +824,15 @@ class GitSourceCompareDialog(QDialog):
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error reading files: {e}")
     
+    def export_patch(self):
+        """Export what copying the selected files to Source would change (source -> git) as a patch bundle"""
+        from ui.dialogs.patch_export_dialog import PatchExportDialog
+        selected_rows = sorted(set(item.row() for item in self.file_list.selectedItems()))
+        entries = [PatchEntry(self.changes[row]['rel_path'], old_path=self.changes[row]['source_file'],
+                              new_path=self.changes[row]['git_file'])
+                   for row in selected_rows if self.changes[row]['status'] != "Only in Source"]
+        PatchExportDialog.export(self, entries, "git-to-source")
+    
     def copy_to_source(self):
         """Copy selected files from Git to Source"""
         selected_rows = set(item.row() for item in self.file_list.selectedItems())
@@ -893,7 +890,7 @@ class GitSourceCompareDialog(QDialog):
 
 class FileDiffDialog(QDialog):
     """Dialog to view old code vs new code comparison for a single file"""
-    def __init__(self, file_path, old_content, new_content, parent=None):
+    def __init__(self, file_path, old_content, new_content, parent=None, generated_globs=None):
         super().__init__(parent)
         self.setWindowTitle(f"File Comparison - {os.path.basename(file_path)}")
         self.setMinimumWidth(1000)
@@ -907,6 +904,12 @@ class FileDiffDialog(QDialog):
         self.old_content = old_content
         self.new_content = new_content
         self.file_path = file_path
+        # A generated or minified file (per the system's globs) is summarized instead of highlighted
+        self.generated = None
+        if generated_globs is not None:
+            detail = classify_pair(old_content, new_content, name=file_path, globs=generated_globs)
+            if detail is not None:
+                self.generated = summarize_generated(old_content, new_content, detail=detail, like_path=file_path)
         
         layout = QVBoxLayout(self)
         
@@ -940,6 +943,8 @@ class FileDiffDialog(QDialog):
         """)
         if old_content is None:
             self.old_text.setHtml("<span style='color: #858585; font-style: italic;'>[File did not exist]</span>")
+        elif self.generated is not None:
+            self.old_text.setPlainText(self.generated.report('old'))
         else:
             self.old_text.setHtml(self._highlight_content(old_content, new_content, is_old=True))
         old_layout.addWidget(self.old_text)
@@ -992,6 +997,8 @@ class FileDiffDialog(QDialog):
         """)
         if new_content is None:
             self.new_text.setHtml("<span style='color: #858585; font-style: italic;'>[File was deleted]</span>")
+        elif self.generated is not None:
+            self.new_text.setPlainText(self.generated.report('new'))
         else:
             self.new_text.setHtml(self._highlight_content(new_content, old_content, is_old=False))
         new_layout.addWidget(self.new_text)
@@ -1040,10 +1047,10 @@ class FileDiffDialog(QDialog):
         content_lines = content.split('\n')
         other_lines = other_content.split('\n')
         
-        # Use difflib to get differences
-        import difflib
-        diff = difflib.ndiff(content_lines if is_old else other_lines, 
-                            other_lines if is_old else content_lines)
+        # Line-level differences (no intraline '?' hints); the second pane reuses the first one's result
+        old_lines = content_lines if is_old else other_lines
+        new_lines = other_lines if is_old else content_lines
+        diff = ndiff(old_lines, new_lines, opcodes=cached_opcodes(old_lines, new_lines))
         
         html_lines = []
         line_num = 0
@@ -1078,9 +1085,6 @@ class FileDiffDialog(QDialog):
                     f'<span style="color: #d4d4d4;">{escaped if escaped else "&nbsp;"}</span>'
                     f'</div>'
                 )
-            elif line.startswith('? '):
-                # Skip these marker lines from ndiff
-                continue
         
         return '<div style="margin: 0; font-family: Consolas, monospace; font-size: 10pt; line-height: 1.6;">' + ''.join(html_lines) + '</div>'
     
@@ -1089,8 +1093,7 @@ class FileDiffDialog(QDialog):
         # Write the new content to the file
         if self.new_content is not None:
             try:
-                with open(self.file_path, 'w', encoding='utf-8', errors='ignore') as f:
-                    f.write(self.new_content)
+                write_text_like(self.file_path, self.new_content)
                 self.selected_action = 'accept_new'
                 from PyQt6.QtWidgets import QMessageBox
                 QMessageBox.information(self, "Applied", f"✅ New code applied to:\n{os.path.basename(self.file_path)}")
@@ -1104,8 +1107,7 @@ class FileDiffDialog(QDialog):
         # Write the old content back to the file to revert changes
         if self.old_content is not None:
             try:
-                with open(self.file_path, 'w', encoding='utf-8', errors='ignore') as f:
-                    f.write(self.old_content)
+                write_text_like(self.file_path, self.old_content)
                 self.selected_action = 'revert_to_old'
                 from PyQt6.QtWidgets import QMessageBox
                 QMessageBox.information(self, "Reverted", f"File reverted to old version:\n{os.path.basename(self.file_path)}")
@@ -1128,6 +1130,8 @@ class ChangeReviewDialog(QDialog):
                           Qt.WindowType.WindowCloseButtonHint)
         self.setSizeGripEnabled(True)
         self.changes = changes  # List of FileChangeEntry objects
+        self._diff_task = None
+        self.full_diff_rows = set()  # Generated files diffed on request
         
         layout = QVBoxLayout(self)
         
@@ -1146,6 +1150,7 @@ class ChangeReviewDialog(QDialog):
         self.file_list.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
         self.file_list.setMaximumHeight(250)  # Set max height to force scrolling for many files
         self.file_list.currentItemChanged.connect(self.on_file_selected)
+        self.file_list.cellDoubleClicked.connect(self.show_full_diff)
         
         # Populate file list
         self.checkboxes = []
@@ -1184,17 +1189,9 @@ class ChangeReviewDialog(QDialog):
         self.current_file_label.setStyleSheet("font-weight: bold; font-size: 12px; color: #569cd6; padding: 5px;")
         layout.addWidget(self.current_file_label)
         
-        self.diff_viewer = QTextEdit()
-        self.diff_viewer.setReadOnly(True)
-        self.diff_viewer.setFont(QFont("Consolas", 10))
-        self.diff_viewer.setStyleSheet("""
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                border: 1px solid #3e3e3e;
-                padding: 5px;
-            }
-        """)
+        # Virtualized: only the rows in view are painted, however large the file
+        self.diff_viewer = DiffView()
+        self.diff_viewer.setStyleSheet("border: 1px solid #3e3e3e;")
         layout.addWidget(self.diff_viewer)
         
         # Buttons
@@ -1208,6 +1205,11 @@ class ChangeReviewDialog(QDialog):
         self.deselect_all_btn.clicked.connect(self.deselect_all)
         btn_layout.addWidget(self.deselect_all_btn)
         
+        self.export_btn = QPushButton("Export Patch")
+        self.export_btn.setToolTip("Save the selected changes as one unified diff or zip")
+        self.export_btn.clicked.connect(self.export_patch)
+        btn_layout.addWidget(self.export_btn)
+        
         btn_layout.addStretch()
         
         self.apply_btn = QPushButton("Apply Selected Changes")
@@ -1240,56 +1242,63 @@ class ChangeReviewDialog(QDialog):
         filename = os.path.basename(change.file_path)
         self.current_file_label.setText(f"📄 Currently viewing: {filename}")
         
-        diff_lines = change.get_diff_lines()
-        
-        # Format diff with IDE-style colors and line numbers
-        formatted_diff = []
-        line_num = 0
-        for line in diff_lines:
-            # Escape HTML but preserve structure
-            escaped = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            
-            if line.startswith('+'):
-                # Added line - green background
-                line_num += 1
-                formatted_diff.append(
-                    f'<div style="background-color: #1a4b1a; padding: 2px 0;">'
-                    f'<span style="color: #858585; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                    f'<span style="color: #89d185;">{escaped}</span>'
-                    f'</div>'
-                )
-            elif line.startswith('-'):
-                # Removed line - red background
-                line_num += 1
-                formatted_diff.append(
-                    f'<div style="background-color: #4b1818; padding: 2px 0;">'
-                    f'<span style="color: #858585; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                    f'<span style="color: #f48771;">{escaped}</span>'
-                    f'</div>'
-                )
-            elif line.startswith('@@'):
-                # Diff header - blue
-                formatted_diff.append(
-                    f'<div style="background-color: #1a1a4b; padding: 2px 0;">'
-                    f'<span style="color: #858585; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">...</span>'
-                    f'<span style="color: #569cd6; font-weight: bold;">{escaped}</span>'
-                    f'</div>'
-                )
-            else:
-                # Context line - normal
-                line_num += 1
-                formatted_diff.append(
-                    f'<div style="background-color: transparent; padding: 2px 0;">'
-                    f'<span style="color: #858585; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                    f'<span style="color: #d4d4d4;">{escaped}</span>'
-                    f'</div>'
-                )
-        
-        self.diff_viewer.setHtml(
-            '<div style="margin: 0; font-family: Consolas, monospace; font-size: 10pt; line-height: 1.6;">' + 
-            ''.join(formatted_diff) + 
-            '</div>'
-        )
+        # Diff and row layout run on the worker; a newer selection supersedes this one
+        self._cancel_diff()
+        self.diff_viewer.set_message("⏳ Computing differences...")
+        self._diff_task = diff_service.submit(self._build_rows, change, row in self.full_diff_rows, parent=self)
+        self._diff_task.finished.connect(self._show_rows)
+        self._diff_task.failed.connect(self._show_diff_error)
+    
+    def show_full_diff(self, row, column=None):
+        """Diff a generated or minified file after all"""
+        if row in self.full_diff_rows:
+            return
+        self.full_diff_rows.add(row)
+        self.on_file_selected(self.file_list.item(row, 1), None)
+    
+    def _build_rows(self, change, full_diff=False, cancel=None):
+        """Unified diff rows for one change (runs on the diff worker)"""
+        if not full_diff:
+            detail = classify_pair(change.old_content, change.new_content, name=change.file_path,
+                                   globs=change.generated_globs)
+            if detail is not None:
+                return summarize_generated(change.old_content, change.new_content, detail=detail, cancel=cancel,
+                                           like_path=change.file_path)
+        result = load_and_diff(change.old_content, change.new_content, cancel=cancel)
+        if isinstance(result, ByteComparison):
+            return result
+        return unified_rows(result.old_lines, result.new_lines, result.opcodes,
+                            language=language_for(change.file_path))
+    
+    def _show_rows(self, rows):
+        self._diff_task = None
+        if isinstance(rows, ByteComparison):
+            message = rows.report()
+            if rows.reason == GENERATED:
+                message += "\n\nDouble-click the file to show its full diff."
+            self.diff_viewer.set_message(message)
+            return
+        self.diff_viewer.set_rows(rows)
+    
+    def _show_diff_error(self, message):
+        self._diff_task = None
+        self.diff_viewer.set_message(f"Could not compare file: {message}")
+    
+    def _cancel_diff(self):
+        if self._diff_task is not None:
+            self._diff_task.cancel()
+            self._diff_task = None
+    
+    def done(self, result):
+        self._cancel_diff()
+        super().done(result)
+    
+    def export_patch(self):
+        """Export the selected changes (baseline -> current) as a patch bundle"""
+        from ui.dialogs.patch_export_dialog import PatchExportDialog
+        entries = [PatchEntry(change.relative_path, old_content=change.old_content, new_content=change.new_content)
+                   for change in self.changes if change.is_selected]
+        PatchExportDialog.export(self, entries, "changes")
     
     def select_all(self):
         for i, checkbox in enumerate(self.checkboxes):
@@ -1307,12 +1316,13 @@ class ChangeReviewDialog(QDialog):
 
 class FileEventHandler(FileSystemEventHandler, QObject):
     #open_log_dialog_signal = pyqtSignal() 
-    def __init__(self, table, watch_path, excluded_folders, excluded_files, dialog):
+    def __init__(self, table, watch_path, excluded_folders, excluded_files, dialog, compare_mode=EXACT):
         super().__init__()
         self.table = table
         self.watch_path = watch_path
         self.excluded_folders = excluded_folders
         self.excluded_files = excluded_files
+        self.compare_mode = compare_mode  # A save that only changes what the mode ignores is not a change
         self.file_hashes = {}  # Dictionary to store last known file hashes
         self.load_file_hash = True
         self.preload_complete = False  # Flag to ignore events until baseline is captured
@@ -1322,22 +1332,24 @@ class FileEventHandler(FileSystemEventHandler, QObject):
     def stopp_reload_file_hashes(self):
         self.load_file_hash = False
         
-    def calculate_file_hash(self, file_path, keep_hash = True):
+    def calculate_file_hash(self, file_path, keep_hash = True, changed = False):
         # print(f"cal={file_path}")
-        """Calculate and cache the file hash based solely on its content."""
+        """Calculate and cache the file hash based solely on its content.
+
+        `changed` is set for change events: the cached digest may predate the change
+        when the size stayed the same within the mtime resolution.
+        """
         forward_slash_path = file_path.replace("\\", "/")
         try:
             # If the file path exists and has a cached hash, return the cached hash
             #if file_path in self.file_hashes:
             #    return self.file_hashes[file_path]  # Return cached hash
 
-            # Otherwise, compute the file hash
-            hasher = hashlib.md5()
-            with open(file_path, "rb") as f:
-                while chunk := f.read(8192):  # Read in chunks for efficiency
-                    hasher.update(chunk)
-
-            file_hash = hasher.hexdigest()
+            # Otherwise, compute the file hash (normalized per the compare mode)
+            # Every mode's digest is cached, so a mode switch or a scan does not read the file again
+            if changed:
+                digest_cache.forget(file_path)
+            file_hash = digest_cache.digest(file_path, self.compare_mode)
             # Store the hash in the cache (no need to store mtime)
             #normpath = os.path.normpath(file_path)
             if keep_hash:
@@ -1365,16 +1377,18 @@ class FileEventHandler(FileSystemEventHandler, QObject):
                     
                     # Capture file content as "old" baseline when scanning starts
                     try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            self.table.file_contents[file_path] = content
-                            if DEBUG:
-                                print(f"Captured baseline content for: {file_path}")
+                        self.table.file_contents[file_path] = read_baseline(file_path)
+                        if DEBUG:
+                            print(f"Captured baseline content for: {file_path}")
                     except Exception as e:
                         print(f"Error capturing baseline content for {file_path}: {e}")
                         self.table.file_contents[file_path] = None
                         
-                self.dialog.add_log_signal.emit(file_path)
+                try:
+                    file_size = os.path.getsize(file_path)
+                except OSError:
+                    file_size = 0
+                self.dialog.add_file_log_signal.emit(file_path, file_size)
 
         for root, dirs, files in os.walk(self.watch_path):
             if not self.load_file_hash:
@@ -1418,7 +1432,7 @@ class FileEventHandler(FileSystemEventHandler, QObject):
             return
         
         # Calculate the new hash for the file
-        new_hash = self.calculate_file_hash(file_path, False)
+        new_hash = self.calculate_file_hash(file_path, False, changed=True)
         forward_slash_path  = file_path.replace("\\", "/")
         if DEBUG == True:
             print(f"new_hash={forward_slash_path} {new_hash}")
@@ -1438,6 +1452,12 @@ class FileEventHandler(FileSystemEventHandler, QObject):
 
                     self.file_hashes[forward_slash_path] = new_hash
                     QCoreApplication.postEvent(self.table, FileUpdateEvent(self.table, file_path))
+                    change_bus.publish(file_path, new_hash)
+
+    def on_moved(self, event):
+        """A temp file renamed over a watched one (an atomic save) modifies the target"""
+        if not event.is_directory:
+            self.on_modified(FileModifiedEvent(event.dest_path))
 
     def on_created(self, event):
         #print(f"on_created triggered for {event.src_path}")
@@ -1446,7 +1466,7 @@ class FileEventHandler(FileSystemEventHandler, QObject):
             return
 
         file_path = event.src_path
-        file_hash = self.calculate_file_hash(file_path)
+        file_hash = self.calculate_file_hash(file_path, changed=True)
         
         if file_hash:
             forward_slash_path  = file_path.replace("\\", "/")
@@ -1454,6 +1474,8 @@ class FileEventHandler(FileSystemEventHandler, QObject):
             # Create and post event
             event_obj = FileCreateEvent(self.table, file_path)
             QCoreApplication.postEvent(self.table, event_obj)
+            # Editors that save by replacing the file show up as a create
+            change_bus.publish(file_path, file_hash)
 
     def on_deleted(self, event):
         if self._is_excluded(event.src_path):
@@ -1468,6 +1490,11 @@ class FileEventHandler(FileSystemEventHandler, QObject):
                 print(f"File deleted: {forward_slash_path}")
                 # Handle the deletion event as needed
                 QCoreApplication.postEvent(self.table, FileDeleteEvent(self.table, file_path))
+                change_bus.publish(file_path, None)
+
+    def watches(self, path):
+        """True when changes of `path` are reported by this handler (see ChangeBus)"""
+        return path_key(path).startswith(path_key(self.watch_path).rstrip("/") + "/") and not self._is_excluded(path)
 
     def _is_excluded(self, path):
         excluded_paths = [os.path.join(self.watch_path, folder) for folder in self.excluded_folders]
@@ -1499,6 +1526,7 @@ class FileWatcherTable(QTableWidget):
         super().__init__()
         self.folder_to_watch = folder_to_watch
         self.file_contents = {}  # Track old file content for diff {file_path: content}
+        self.generated_globs = []  # The system's globs of generated files, summarized instead of diffed
         
         self.setColumnCount(2)  # Ensure only 2 columns
         self.setHorizontalHeaderLabels(["File Name", "Action"])
@@ -1524,38 +1552,33 @@ class FileWatcherTable(QTableWidget):
         if column != 0:
             return
         
-        file_name = self.item(row, 0).text()
-        # Normalize path to forward slashes to match stored baseline keys
-        file_path = os.path.join(self.folder_to_watch, file_name).replace("\\", "/")
-        
-        # Get old content from cache (baseline from when Start was clicked)
-        # Try normalized path first, then try original path format if not found
-        old_content = self.file_contents.get(file_path)
-        if old_content is None:
-            # Try with backslashes (Windows format) in case baseline was stored differently
-            file_path_backslash = file_path.replace("/", "\\")
-            old_content = self.file_contents.get(file_path_backslash)
-            if old_content is not None:
-                # Found with backslashes - copy to normalized format for consistency
-                self.file_contents[file_path] = old_content
-        
         if DEBUG:
-            print(f"on_file_clicked: {file_path}")
-            print(f"old_content found: {old_content is not None}")
-        
-        # Read current content
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                new_content = f.read()
-        except Exception as e:
-            print(f"Error reading file {file_path}: {e}")
-            new_content = None
+            print(f"on_file_clicked: {self.item(row, 0).text()}")
         
-        # Show chunk-by-chunk review dialog
-        from ui.dialogs.chunk_review_dialog import ChunkReviewDialog
-        dialog = ChunkReviewDialog(file_path, old_content, new_content, self)
+        # Review every file of the table in one window, starting at the clicked one; the
+        # current contents are read on the diff worker
+        from ui.dialogs.review_session_dialog import ReviewSessionDialog
+        dialog = ReviewSessionDialog(self.review_items(), row, self)
         dialog.exec()
     
+    def review_items(self):
+        """A ReviewItem per row: the baseline from when Start was clicked against the file on disk"""
+        from ui.dialogs.review_session_dialog import ReviewItem
+        items = []
+        for row in range(self.rowCount()):
+            # Normalize path to forward slashes to match stored baseline keys
+            file_path = os.path.join(self.folder_to_watch, self.item(row, 0).text()).replace("\\", "/")
+            old_content = self.file_contents.get(file_path)
+            if old_content is None:
+                # Try with backslashes (Windows format) in case baseline was stored differently
+                old_content = self.file_contents.get(file_path.replace("/", "\\"))
+                if old_content is not None:
+                    # Found with backslashes - copy to normalized format for consistency
+                    self.file_contents[file_path] = old_content
+            items.append(ReviewItem(file_path, old_content, new_path=file_path,
+                                    generated_globs=self.generated_globs))
+        return items
+    
     def remove_button_row(self, button):
         #removeRow build-in, but overrite to see log
         for row in range(self.rowCount()):
@@ -1635,8 +1658,7 @@ class FileWatcherTable(QTableWidget):
             # No baseline exists - file was created after preload
             # Store current content as baseline (but there won't be a diff for first change)
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    self.file_contents[normalized_path] = f.read()
+                self.file_contents[normalized_path] = read_baseline(file_path)
             except Exception as e:
                 print(f"Error reading file {file_path}: {e}")
                 self.file_contents[normalized_path] = None
@@ -1657,17 +1679,7 @@ class FileWatcherTable(QTableWidget):
         btn_remove = QPushButton()
         btn_remove.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
         btn_remove.setFixedSize(20, 20)  # Make delete button smaller than the row
-        btn_remove.setStyleSheet("""
-            QPushButton {
-                border: none;
-                padding: 0px;
-                background: transparent;
-            }
-            QPushButton:hover {
-                background: rgba(255, 0, 0, 0.1);
-                border-radius: 3px;
-            }
-        """)
+        btn_remove.setProperty('role', 'rowRemove')
         
         # Set icon
         # icon_path = "remove_icon.png" 
@@ -1758,6 +1770,8 @@ class SettingsDialog(QDialog):
         source_path = setting.get("source_path", {})
         git_path = setting.get("git_path", {})
         backup_path = setting.get("backup_path", {})
+        compare_mode = setting.get("compare_mode", {})
+        generated_globs = setting.get("generated_globs", {})
         user    = setting.get("user", {})
         
         # Get number of systems configured
@@ -1871,6 +1885,8 @@ class SettingsDialog(QDialog):
         self.dest_inputs = []
         self.git_inputs = []
         self.backup_inputs = []  # New backup path inputs
+        self.compare_mode_inputs = []
+        self.generated_inputs = []
         self.system_rows = []
         
         # Create initial system rows
@@ -1880,7 +1896,9 @@ class SettingsDialog(QDialog):
                                   source_path.get(sys_key, ""),
                                   dest_path.get(sys_key, ""),
                                   git_path.get(sys_key, ""),
-                                  backup_path.get(sys_key, ""))
+                                  backup_path.get(sys_key, ""),
+                                  compare_mode.get(sys_key, EXACT),
+                                  generated_globs.get(sys_key, ""))
         
         systems_layout.addWidget(self.systems_container)
         systems_group.setLayout(systems_layout)
@@ -2009,7 +2027,7 @@ class SettingsDialog(QDialog):
         self.save_button.clicked.connect(self.save_settings)
         self.main_layout.addWidget(self.save_button, alignment=Qt.AlignmentFlag.AlignCenter)
     
-    def create_system_row(self, index, source="", dest="", git="", backup=""):
+    def create_system_row(self, index, source="", dest="", git="", backup="", compare_mode=EXACT, generated=""):
         """Create a system configuration row"""
         sys_num = index + 1
         row_widget = QWidget()
@@ -2131,10 +2149,66 @@ class SettingsDialog(QDialog):
         
         row_layout.addLayout(second_row)
         
+        # Third row: how Git/Source scans and the watcher decide that a file changed
+        third_row = QHBoxLayout()
+        compare_label = QLabel("Compare:", row_widget)
+        compare_label.setFixedWidth(60)
+        compare_label.setStyleSheet("color: #E0E0E0; font-size: 12px;")
+        compare_input = QComboBox(row_widget)
+        for mode, label in COMPARE_MODES.items():
+            compare_input.addItem(label, mode)
+        compare_input.setCurrentIndex(max(0, compare_input.findData(compare_mode)))
+        compare_input.setFixedHeight(30)
+        compare_input.setToolTip("Ignore line-ending (CRLF/LF) or trailing-whitespace churn between checkouts")
+        compare_input.setStyleSheet("""
+            QComboBox {
+                background-color: #3C3C3C;
+                color: #E0E0E0;
+                border: 2px solid #5A5A5A;
+                border-radius: 6px;
+                padding: 4px 8px;
+                font-size: 11px;
+            }
+            QComboBox:focus {
+                border: 2px solid #1976D2;
+                border-radius: 6px;
+            }
+        """)
+        third_row.addWidget(compare_label)
+        third_row.addWidget(compare_input, 1)
+        
+        # Files review dialogs summarize by size and digest instead of diffing
+        generated_label = QLabel("Generated:", row_widget)
+        generated_label.setStyleSheet("color: #E0E0E0; font-size: 12px;")
+        generated_input = QLineEdit(generated, row_widget)
+        generated_input.setFixedHeight(30)
+        generated_input.setPlaceholderText("e.g. dist/*, *.generated.php (minified files are detected anyway)")
+        generated_input.setToolTip("Comma-separated globs of generated files; their full diff opens on request")
+        generated_input.setStyleSheet("""
+            QLineEdit {
+                background-color: #3C3C3C;
+                color: #E0E0E0;
+                border: 2px solid #5A5A5A;
+                border-radius: 6px;
+                padding: 4px 8px;
+                font-size: 11px;
+            }
+            QLineEdit:focus {
+                border: 2px solid #1976D2;
+                border-radius: 6px;
+            }
+        """)
+        third_row.addWidget(generated_label)
+        third_row.addWidget(generated_input, 1)
+        
+        row_layout.addLayout(third_row)
+        
         self.source_inputs.append(source_input)
         self.dest_inputs.append(dest_input)
         self.git_inputs.append(git_input)
         self.backup_inputs.append(backup_input)
+        self.compare_mode_inputs.append(compare_input)
+        self.generated_inputs.append(generated_input)
         self.system_rows.append(row_widget)
         
         self.systems_layout.addWidget(row_widget)
@@ -2166,6 +2240,8 @@ class SettingsDialog(QDialog):
             self.dest_inputs.pop()
             self.git_inputs.pop()
             self.backup_inputs.pop()
+            self.compare_mode_inputs.pop()
+            self.generated_inputs.pop()
             self.num_systems -= 1
             
             # Update tables
@@ -2247,6 +2323,8 @@ class SettingsDialog(QDialog):
         dest_path = {}
         source_path = {}
         backup_path = {}
+        compare_mode = {}
+        generated_globs = {}
         
         for i in range(self.num_systems):
             sys_key = f"sys{i+1}"
@@ -2254,6 +2332,8 @@ class SettingsDialog(QDialog):
             dest_path[sys_key] = self.dest_inputs[i].text() if i < len(self.dest_inputs) else ""
             git_path[sys_key] = self.git_inputs[i].text() if i < len(self.git_inputs) else ""
             backup_path[sys_key] = self.backup_inputs[i].text() if i < len(self.backup_inputs) else ""
+            compare_mode[sys_key] = self.compare_mode_inputs[i].currentData() if i < len(self.compare_mode_inputs) else EXACT
+            generated_globs[sys_key] = self.generated_inputs[i].text() if i < len(self.generated_inputs) else ""
         
         username = self.user_input_name.text()
         telegram_token = self.tele_input_token.text()
@@ -2269,6 +2349,8 @@ class SettingsDialog(QDialog):
         self.parent().setting["source_path"] = source_path
         self.parent().setting["git_path"] = git_path
         self.parent().setting["backup_path"] = backup_path
+        self.parent().setting["compare_mode"] = compare_mode
+        self.parent().setting["generated_globs"] = generated_globs
         self.parent().setting["num_systems"] = self.num_systems
 
         table_data = self.get_table_values(self.table)
@@ -2297,6 +2379,8 @@ class SettingsDialog(QDialog):
             "dest_path": dest_path,
             "source_path": source_path,
             "backup_path": backup_path,
+            "compare_mode": compare_mode,
+            "generated_globs": generated_globs,
             "sys_path" : path_setting_data,
             "sys_path2" : path_setting_data2,
             "telegram_token": telegram_token,
@@ -2480,7 +2564,7 @@ class FileWatcherApp(QMainWindow):
             QScrollBar::add-page:horizontal, QScrollBar::sub-page:horizontal {
                 background: none;
             }
-        """)
+        """ + get_role_stylesheet())  # Property-driven rules for rows, cards and dialogs opened from here
 
         # Hide default menu bar and create custom title bar
         self.setMenuWidget(QWidget())  # Hide menu bar
@@ -2851,11 +2935,7 @@ class FileWatcherApp(QMainWindow):
     def create_git_source_page(self):
         """Create the Git & Source comparison page - professional design"""
         page = QWidget()
-        page.setStyleSheet("""
-            QWidget {
-                background-color: #1E1E1E;
-            }
-        """)
+        page.setProperty('role', 'gitPage')
         layout = QVBoxLayout(page)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
@@ -2863,25 +2943,13 @@ class FileWatcherApp(QMainWindow):
         # Toolbar header
         toolbar = QWidget()
         toolbar.setFixedHeight(52)
-        toolbar.setStyleSheet("""
-            QWidget {
-                background-color: #252526;
-                border-bottom: 1px solid #3C3C3C;
-            }
-        """)
+        toolbar.setProperty('role', 'gitToolbar')
         toolbar_layout = QHBoxLayout(toolbar)
         toolbar_layout.setContentsMargins(20, 0, 20, 0)
         toolbar_layout.setSpacing(12)
         
         title_label = QLabel("Git & Source Comparison")
-        title_label.setStyleSheet("""
-            QLabel {
-                color: #FFFFFF; 
-                font-size: 14px;
-                font-weight: 600;
-                background-color: transparent;
-            }
-        """)
+        title_label.setProperty('role', 'gitToolbarTitle')
         toolbar_layout.addWidget(title_label)
         toolbar_layout.addStretch()
         
@@ -2889,26 +2957,20 @@ class FileWatcherApp(QMainWindow):
         
         # Content area with scroll
         content_scroll = QWidget()
-        content_scroll.setStyleSheet("background-color: #1E1E1E;")
+        content_scroll.setProperty('role', 'gitContent')
         content_layout = QVBoxLayout(content_scroll)
         content_layout.setContentsMargins(20, 20, 20, 20)
         content_layout.setSpacing(16)
         
         # Description
         desc_label = QLabel("Select a system to compare and review changes")
-        desc_label.setStyleSheet("""
-            QLabel {
-                font-size: 13px; 
-                color: #858585; 
-                background-color: transparent;
-            }
-        """)
+        desc_label.setProperty('role', 'pageDescription')
         content_layout.addWidget(desc_label)
         
         # Systems list
         from PyQt6.QtWidgets import QVBoxLayout as QVBoxLayout2
         systems_widget = QWidget()
-        systems_widget.setStyleSheet("background-color: transparent;")
+        systems_widget.setProperty('role', 'transparent')
         systems_layout = QVBoxLayout2(systems_widget)
         systems_layout.setSpacing(12)
         
@@ -2928,17 +2990,7 @@ class FileWatcherApp(QMainWindow):
                 
                 # Create system card - Cursor style
                 system_card = QWidget()
-                system_card.setStyleSheet("""
-                    QWidget {
-                        background-color: #252526;
-                        border-radius: 6px;
-                        border: 1px solid #3C3C3C;
-                    }
-                    QWidget:hover {
-                        border: 1px solid: #505050;
-                        background-color: #2A2D2E;
-                    }
-                """)
+                system_card.setProperty('role', 'systemCard')
                 card_layout = QVBoxLayout(system_card)
                 card_layout.setContentsMargins(20, 18, 20, 18)
                 card_layout.setSpacing(14)
@@ -2947,32 +2999,10 @@ class FileWatcherApp(QMainWindow):
                 header_layout = QHBoxLayout()
                 
                 system_title = QLabel(f"System {sys_num}")
-                system_title.setStyleSheet("""
-                    font-size: 15px;
-                    font-weight: 600;
-                    color: #FFFFFF;
-                    background-color: transparent;
-                """)
+                system_title.setProperty('role', 'systemTitle')
                 
                 system_btn = QPushButton("Compare")
-                system_btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #007ACC;
-                        color: #FFFFFF;
-                        border: none;
-                        padding: 5px 14px;
-                        font-size: 12px;
-                        font-weight: 500;
-                        border-radius: 6px;
-                        min-height: 24px;
-                    }
-                    QPushButton:hover {
-                        background-color: #1C97EA;
-                    }
-                    QPushButton:pressed {
-                        background-color: #005A9E;
-                    }
-                """)
+                system_btn.setProperty('role', 'compareButton')
                 system_btn.clicked.connect(lambda checked, gp=git_path, sp=source_path, sn=sys_num: 
                                           self.open_git_compare_embedded(gp, sp, sn))
                 
@@ -2982,25 +3012,17 @@ class FileWatcherApp(QMainWindow):
                 
                 # Paths
                 paths_container = QWidget()
-                paths_container.setStyleSheet("background-color: transparent;")
+                paths_container.setProperty('role', 'transparent')
                 paths_layout = QVBoxLayout(paths_container)
                 paths_layout.setContentsMargins(0, 0, 0, 0)
                 paths_layout.setSpacing(6)
                 
                 git_label = QLabel(f"Git: {git_path}")
-                git_label.setStyleSheet("""
-                    font-size: 12px; 
-                    color: #858585; 
-                    background-color: transparent;
-                """)
+                git_label.setProperty('role', 'pathLabel')
                 git_label.setWordWrap(True)
                 
                 source_label = QLabel(f"Source: {source_path}")
-                source_label.setStyleSheet("""
-                    font-size: 12px; 
-                    color: #858585; 
-                    background-color: transparent;
-                """)
+                source_label.setProperty('role', 'pathLabel')
                 source_label.setWordWrap(True)
                 
                 paths_layout.addWidget(git_label)
@@ -3014,30 +3036,17 @@ class FileWatcherApp(QMainWindow):
         if not has_systems:
             # No systems configured - Cursor style empty state
             no_config_card = QWidget()
-            no_config_card.setStyleSheet("""
-                QWidget {
-                    background-color: transparent;
-                }
-            """)
+            no_config_card.setProperty('role', 'transparent')
             no_config_layout = QVBoxLayout(no_config_card)
             no_config_layout.setContentsMargins(40, 60, 40, 60)
             no_config_layout.setSpacing(12)
             
             no_config_label = QLabel("No systems configured")
-            no_config_label.setStyleSheet("""
-                font-size: 16px; 
-                font-weight: 500;
-                color: #CCCCCC; 
-                background-color: transparent;
-            """)
+            no_config_label.setProperty('role', 'emptyTitle')
             no_config_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             
             no_config_desc = QLabel("Configure Git and Source paths in Settings to get started")
-            no_config_desc.setStyleSheet("""
-                font-size: 13px; 
-                color: #858585; 
-                background-color: transparent;
-            """)
+            no_config_desc.setProperty('role', 'emptyDescription')
             no_config_desc.setAlignment(Qt.AlignmentFlag.AlignCenter)
             
             no_config_layout.addWidget(no_config_label)
@@ -3076,7 +3085,12 @@ class FileWatcherApp(QMainWindow):
         print(f"  EXCEPT paths ({len(except_list)}): {except_list}")
         print(f"{'='*60}\n")
         
-        dialog = GitSourceCompareDialog(git_path, source_path, backup_path, without_list, except_list, self)
+        compare_mode = self.setting.get("compare_mode", {}).get(sys_key, EXACT)
+        table = self.tables[sys_num - 1] if 0 < sys_num <= len(self.tables) else None
+        dialog = GitSourceCompareDialog(git_path, source_path, backup_path, without_list, except_list, self,
+                                        compare_mode=compare_mode,
+                                        baselines=table.file_contents if table is not None else None,
+                                        generated_globs=parse_globs(self.setting.get("generated_globs", {}).get(sys_key, "")))
         dialog.setWindowTitle(f"Git ↔ Source - System {sys_num}")
         dialog.exec()
     
@@ -3153,8 +3167,10 @@ class FileWatcherApp(QMainWindow):
                 excluded_files = [item["path"] for item in sys_excluded_files]
 
                 table = self.watch_tables[f"sys{i}"]
+                table.generated_globs = parse_globs(self.setting.get("generated_globs", {}).get(f"sys{i + 1}", ""))
 
-                watcher_thread = WatcherThread(i, table, path, excluded_folders, excluded_files, self.dialog)
+                compare_mode = self.setting.get("compare_mode", {}).get(f"sys{i + 1}", EXACT)
+                watcher_thread = WatcherThread(i, table, path, excluded_folders, excluded_files, self.dialog, compare_mode)
                 watcher_thread.started_watching.connect(lambda p=path: self.on_started_watching(p))
                 watcher_thread.stopped_watching.connect(lambda p=path: self.on_stopped_watching(p))
 
@@ -3327,8 +3343,11 @@ class FileWatcherApp(QMainWindow):
                             f"Git path for System {sys_num} is not configured.")
             return
         
+        compare_mode = self.setting.get("compare_mode", {}).get(dest_key, EXACT)
         dialog = GitSourceCompareDialog(git_path, source_path, backup_path, 
-                                    without_list, except_list, self)
+                                    without_list, except_list, self, compare_mode=compare_mode,
+                                    baselines=self.tables[table_index].file_contents,
+                                    generated_globs=parse_globs(self.setting.get("generated_globs", {}).get(dest_key, "")))
         dialog.exec()
 
     def copy_files_from_table(self, table_index, send = False):
@@ -3361,8 +3380,7 @@ class FileWatcherApp(QMainWindow):
             
             # Read current file content
             try:
-                with open(source_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    new_content = f.read()
+                new_content = encoding_cache.read(source_path)[0]
             except Exception as e:
                 print(f"Error reading file {source_path}: {e}")
                 new_content = None
@@ -3380,7 +3398,7 @@ class FileWatcherApp(QMainWindow):
                     table.file_contents[normalized_source_path] = old_content
             
             # Create file change entry
-            change = FileChangeEntry(source_path, old_content, new_content, src_root)
+            change = FileChangeEntry(source_path, old_content, new_content, src_root, table.generated_globs)
             changes.append(change)
         
         # Show diff dialog
@@ -3497,7 +3515,7 @@ class FileWatcherApp(QMainWindow):
                 event_handler = self.watcher_threads[table_index].event_handler
                 if event_handler and os.path.exists(source_path):
                     # Calculate new hash for the file (after copy, this is the new baseline)
-                    new_hash = event_handler.calculate_file_hash(source_path, True)
+                    new_hash = event_handler.calculate_file_hash(source_path, True, changed=True)
                     if DEBUG:
                         print(f"Updated hash for {normalized_source_path} after copy: {new_hash}")
         if(send):
@@ -3570,7 +3588,19 @@ class FileWatcherApp(QMainWindow):
         event.accept()
 
 if __name__ == "__main__":
+    # Patch exports diff in worker processes, which a frozen build has to be able to start
+    multiprocessing.freeze_support()
+    from services.stall_detector import StallDetector
+
     app = QApplication(sys.argv)
+    # Start before the main window so blocking work in its constructor is attributed too
+    stall_detector = StallDetector()
+    stall_detector.start()
+    app.aboutToQuit.connect(stall_detector.stop)
+    if DEBUG:
+        from core.diff_cache import diff_cache
+        app.aboutToQuit.connect(lambda: print(diff_cache.report()))
+
     main_window = FileWatcherApp()
     main_window.show()
     sys.exit(app.exec())
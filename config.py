@@ -8,3 +8,59 @@ API_URL = "http://khmergaming.436bet.com/app/"
 # Debug Mode
 DEBUG = False
 
+# GUI stall detection
+STALL_THRESHOLD_MS = 200  # Event-loop lag that counts as a stall
+STALL_REPORT_TOP = 10     # Number of offenders shown in the stall report
+
+# Scan log
+LOG_MAX_ROWS = 5000           # Rows kept in the scan log before the oldest are dropped
+LOG_FLUSH_INTERVAL_MS = 100   # Queued log rows are inserted once per tick
+LOG_FOLLOW_INTERVAL_MS = 250  # Poll interval for file-backed logs (indexing progress and tail-follow)
+
+# Scan progress
+PROGRESS_MAX_UPDATES_PER_SEC = 10  # Upper bound on progress signals sent to the GUI
+
+# Diff cache
+DIFF_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Memory budget for cached diff results
+
+# Background diffing
+DIFF_WORKERS = 2  # Worker threads computing diffs for the review dialogs
+REVIEW_PREFETCH_FILES = 3  # Files a review session diffs ahead of the one on screen
+
+# Intraline highlighting
+INTRALINE_MAX_CHARS = 2000     # Longer line pairs are shown as whole-line changes
+INTRALINE_CACHE_SIZE = 4096    # Line pairs whose word-level spans are kept
+
+# Large and binary files
+TEXT_DIFF_MAX_BYTES = 16 * 1024 * 1024  # Larger files are compared byte-wise instead of diffed as text
+BYTE_COMPARE_BLOCK_SIZE = 64 * 1024     # Block size of the changed-block map for byte comparisons
+
+# Compare modes
+DIGEST_CHUNK_SIZE = 1024 * 1024      # Read size when hashing files for comparison
+DIGEST_CACHE_MAX_ENTRIES = 200_000   # Files whose per-mode digests are kept
+
+# Writing review decisions
+APPLY_COPY_BLOCK_SIZE = 1024 * 1024  # Bytes copied at a time from the original file to the rewritten one
+
+# Syntax highlighting
+HIGHLIGHT_WORKERS = 1                   # Worker threads tokenizing files for the diff views
+SYNTAX_MAX_LINES = 200_000              # Longer files are shown without highlighting
+SYNTAX_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Approximate memory bound of the token cache
+
+# Patch export
+PATCH_EXPORT_WORKERS = 4        # Processes diffing files for a patch export
+PATCH_EXPORT_MAX_PENDING = 32   # Diffs submitted but not yet written; bounds memory on large exports
+
+# Text encodings
+LEGACY_ENCODING = 'cp874'            # Codec for files that are not valid UTF-8 and have no BOM
+ENCODING_OVERRIDES = {}              # File extension -> codec, e.g. {'.tis': 'cp874'}; skips sniffing
+ENCODING_CACHE_MAX_ENTRIES = 200_000 # File versions whose detected codec is kept
+
+# Generated and minified files: summarized by size and digest, diffed only on request
+GENERATED_GLOBS = ['*.min.js', '*.min.css', '*.bundle.js', '*.chunk.js', '*.map',
+                   'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml', 'composer.lock']  # Plus each system's own
+GENERATED_MARKERS = ('@generated', 'DO NOT EDIT', 'Code generated', 'auto-generated', 'autogenerated')
+GENERATED_MARKER_BYTES = 1024        # Markers only count near the top of a file
+GENERATED_SAMPLE_BYTES = 64 * 1024   # Leading bytes whose line lengths are measured
+GENERATED_MAX_LINE_LENGTH = 5000     # A longer line means minified
+GENERATED_MEAN_LINE_LENGTH = 300     # ...as does a longer average line
@@ -1,6 +1,16 @@
 """Core module containing models and events"""
 from .models import FileChangeEntry
+from .diff import get_opcodes, DiffCancelled
+from .diff_cache import DiffCache, diff_cache, cached_opcodes
+from .incremental_diff import line_hashes, rediff_window
+from .byte_compare import ByteComparison, classify_file, compare_streams
+from .encoding import encoding_cache, read_text, sniff_encoding
+from .generated import classify_generated, parse_globs
+from .compare_modes import COMPARE_MODES, digest_cache, files_match
+from .hunk_apply import ApplyError, apply_hunks
+from .merge3 import MergeResult, merge3
+from .syntax import language_for, token_cache
 from .events import FileUpdateEvent, FileCreateEvent, FileDeleteEvent
 
-__all__ = ['FileChangeEntry', 'FileUpdateEvent', 'FileCreateEvent', 'FileDeleteEvent']
+__all__ = ['FileChangeEntry', 'get_opcodes', 'DiffCancelled', 'DiffCache', 'diff_cache', 'cached_opcodes', 'line_hashes', 'rediff_window', 'ByteComparison', 'classify_file', 'compare_streams', 'encoding_cache', 'read_text', 'sniff_encoding', 'classify_generated', 'parse_globs', 'COMPARE_MODES', 'digest_cache', 'files_match', 'ApplyError', 'apply_hunks', 'MergeResult', 'merge3', 'language_for', 'token_cache', 'FileUpdateEvent', 'FileCreateEvent', 'FileDeleteEvent']
 
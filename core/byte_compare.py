@@ -0,0 +1,258 @@
+"""Classification of files that should not be diffed as text, and byte-wise comparison for them.
+
+Decoding a binary or a multi-hundred-MB file as UTF-8 and diffing its "lines" hangs
+the dialogs and mangles the content on write-back. classify_file() sniffs the first
+few KB for null bytes and checks the size; anything that is not TEXT is compared with
+compare_streams(), which reads both sides block by block and reports the first
+differing offset, a map of the changed blocks and a hex preview around the first
+difference.
+"""
+import codecs
+import hashlib
+import io
+import os
+
+from config import TEXT_DIFF_MAX_BYTES, BYTE_COMPARE_BLOCK_SIZE
+from core.diff import DiffCancelled
+from core.encoding import encoding_cache, utf16_without_bom
+
+TEXT, BINARY, OVERSIZE = 'text', 'binary', 'oversize'
+GENERATED = 'generated'  # Text not diffed unless asked to (core.generated)
+
+SNIFF_BYTES = 8192         # Leading bytes checked for null bytes
+HEX_PREVIEW_BYTES = 128    # Bytes shown per side around the first difference
+HEX_PREVIEW_BEFORE = 32    # ...of which this many come before it
+HEX_ROW_BYTES = 16
+
+# UTF-16/32 text is full of null bytes; a BOM marks it as text all the same
+TEXT_BOMS = (codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+
+
+def looks_binary(sample):
+    """True when a leading sample of a file contains null bytes and is not UTF-16/32 text"""
+    if sample.startswith(TEXT_BOMS):
+        return False
+    return b'\0' in sample and utf16_without_bom(sample) is None
+
+
+def classify_file(path, max_bytes=TEXT_DIFF_MAX_BYTES):
+    """TEXT, BINARY or OVERSIZE for a file on disk; a missing file counts as (empty) text"""
+    try:
+        if os.path.getsize(path) > max_bytes:
+            return OVERSIZE
+        with open(path, 'rb') as f:
+            sample = f.read(SNIFF_BYTES)
+    except OSError:
+        return TEXT
+    return BINARY if looks_binary(sample) else TEXT
+
+
+def classify_content(content, max_bytes=TEXT_DIFF_MAX_BYTES):
+    """Same as classify_file() for content already in memory.
+
+    Bytes are what the watchers keep as the baseline of a binary file, so they are
+    always compared byte-wise; strings are checked like a file would be.
+    """
+    if content is None:
+        return TEXT
+    if len(content) > max_bytes:
+        return OVERSIZE
+    if isinstance(content, (bytes, bytearray)):
+        return BINARY
+    return BINARY if '\0' in content[:SNIFF_BYTES] else TEXT
+
+
+def read_baseline(path):
+    """Content kept by the watchers to diff against later.
+
+    Text files are read as text in their detected encoding (remembered for the later
+    diffs and write-backs of this file version), binary files as bytes (compared
+    byte-wise later) and oversized files are not kept at all (None), so a scan never
+    holds hundreds of MB of decoded content.
+    """
+    kind = classify_file(path)
+    if kind == OVERSIZE:
+        return None
+    if kind == BINARY:
+        with open(path, 'rb') as f:
+            return f.read()
+    return encoding_cache.read(path)[0]
+
+
+def byte_mode(*kinds):
+    """The reason to compare byte-wise given the kinds of both sides, or None for a text diff"""
+    if OVERSIZE in kinds:
+        return OVERSIZE
+    if BINARY in kinds:
+        return BINARY
+    return None
+
+
+def open_source(content=None, path=None):
+    """Seekable binary stream for one side: the file at `path`, else the content itself"""
+    if path is not None:
+        if os.path.exists(path):
+            return open(path, 'rb')
+        return io.BytesIO(b"")
+    if content is None:
+        return io.BytesIO(b"")
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return io.BytesIO(content)
+
+
+def first_mismatch(a, b):
+    """Offset of the first differing byte of two blocks (the shorter length if one is a prefix)"""
+    lo, hi = 0, min(len(a), len(b))
+    # Halve the window while comparing slices at C speed, then scan the rest
+    while hi - lo > 64:
+        mid = (lo + hi) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid
+    for i in range(lo, hi):
+        if a[i] != b[i]:
+            return i
+    return hi
+
+
+def hex_dump(data, base_offset=0):
+    """Classic hex dump lines: offset, 16 bytes in hex and their printable ASCII"""
+    lines = []
+    for start in range(0, len(data), HEX_ROW_BYTES):
+        row = data[start:start + HEX_ROW_BYTES]
+        hex_part = ' '.join(f"{byte:02x}" for byte in row[:8])
+        if len(row) > 8:
+            hex_part += '  ' + ' '.join(f"{byte:02x}" for byte in row[8:])
+        text = ''.join(chr(byte) if 32 <= byte < 127 else '.' for byte in row)
+        lines.append(f"{base_offset + start:08x}  {hex_part:<49}|{text}|")
+    return lines
+
+
+def format_size(nbytes):
+    for unit in ('B', 'KB', 'MB'):
+        if nbytes < 1024:
+            return f"{nbytes:,.0f} {unit}" if unit == 'B' else f"{nbytes:,.1f} {unit}"
+        nbytes /= 1024
+    return f"{nbytes:,.1f} GB"
+
+
+class ByteComparison:
+    """Result of compare_streams() for a binary, oversized or generated pair.
+
+    `first_difference` is None when both sides are identical. `detail` says why a
+    generated file was not diffed, and the digests (MD5 hex, as the exact compare
+    mode uses) are set when they were asked for. `changed_blocks` are the
+    indices of the `block_size` blocks that differ (a size change marks every block
+    past the shorter end). The previews are hex_dump() lines around the first
+    difference.
+    """
+    def __init__(self, reason, old_size, new_size, first_difference, changed_blocks, block_size,
+                 old_preview=(), new_preview=(), detail=None, old_digest=None, new_digest=None):
+        self.reason = reason
+        self.old_size = old_size
+        self.new_size = new_size
+        self.first_difference = first_difference
+        self.changed_blocks = changed_blocks
+        self.block_size = block_size
+        self.old_preview = list(old_preview)
+        self.new_preview = list(new_preview)
+        self.detail = detail
+        self.old_digest = old_digest
+        self.new_digest = new_digest
+
+    @property
+    def identical(self):
+        return self.first_difference is None
+
+    def changed_ranges(self):
+        """Changed blocks merged into (start offset, end offset) byte ranges"""
+        ranges = []
+        for block in self.changed_blocks:
+            start = block * self.block_size
+            end = min(start + self.block_size, max(self.old_size, self.new_size))
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def describe(self, max_ranges=10):
+        """Multi-line summary for the dialogs"""
+        if self.reason == GENERATED:
+            kind = f"Generated or minified file ({self.detail})" if self.detail else "Generated or minified file"
+        else:
+            kind = "Binary file" if self.reason == BINARY else "File too large for a text diff"
+        lines = [f"{kind} - compared byte by byte.",
+                 f"Old: {format_size(self.old_size)}    New: {format_size(self.new_size)}"]
+        if self.old_digest is not None:
+            lines.append(f"MD5 old: {self.old_digest}    new: {self.new_digest}")
+        if self.identical:
+            lines.append("No differences.")
+            return "\n".join(lines)
+        ranges = self.changed_ranges()
+        lines.append(f"First difference at offset 0x{self.first_difference:08x} ({self.first_difference:,}).")
+        lines.append(f"{len(self.changed_blocks):,} changed block(s) of {format_size(self.block_size)}:")
+        for start, end in ranges[:max_ranges]:
+            lines.append(f"  0x{start:08x} - 0x{end:08x}")
+        if len(ranges) > max_ranges:
+            lines.append(f"  ... {len(ranges) - max_ranges:,} more range(s)")
+        return "\n".join(lines)
+
+    def hex_preview(self, side=None):
+        """Hex dump of 'old', 'new' or (None) both sides around the first difference"""
+        parts = []
+        if not self.identical:
+            if side in (None, 'old'):
+                parts.append("Old:\n" + "\n".join(self.old_preview))
+            if side in (None, 'new'):
+                parts.append("New:\n" + "\n".join(self.new_preview))
+        return "\n\n".join(parts)
+
+    def report(self, side=None):
+        """describe() followed by hex_preview()"""
+        preview = self.hex_preview(side)
+        return f"{self.describe()}\n\n{preview}" if preview else self.describe()
+
+
+def _preview(stream, offset):
+    start = max(0, offset - HEX_PREVIEW_BEFORE) // HEX_ROW_BYTES * HEX_ROW_BYTES
+    stream.seek(start)
+    return hex_dump(stream.read(HEX_PREVIEW_BYTES), start)
+
+
+def compare_streams(old_stream, new_stream, reason=BINARY, block_size=BYTE_COMPARE_BLOCK_SIZE, cancel=None,
+                    digests=False):
+    """Compare two seekable binary streams block by block without loading either one"""
+    old_md5 = hashlib.md5() if digests else None
+    new_md5 = hashlib.md5() if digests else None
+    first_difference = None
+    changed_blocks = []
+    old_size = new_size = 0
+    block = 0
+    while True:
+        if cancel is not None and cancel.is_set():
+            raise DiffCancelled()
+        a = old_stream.read(block_size)
+        b = new_stream.read(block_size)
+        if not a and not b:
+            break
+        old_size += len(a)
+        new_size += len(b)
+        if digests:
+            old_md5.update(a)
+            new_md5.update(b)
+        if a != b:
+            changed_blocks.append(block)
+            if first_difference is None:
+                first_difference = block * block_size + first_mismatch(a, b)
+        block += 1
+
+    result = ByteComparison(reason, old_size, new_size, first_difference, changed_blocks, block_size)
+    if digests:
+        result.old_digest, result.new_digest = old_md5.hexdigest(), new_md5.hexdigest()
+    if first_difference is not None:
+        result.old_preview = _preview(old_stream, first_difference)
+        result.new_preview = _preview(new_stream, first_difference)
+    return result
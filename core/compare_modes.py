@@ -0,0 +1,173 @@
+"""Content digests for the compare modes: exact, ignore line endings, ignore trailing whitespace.
+
+One streaming pass over a file produces the digest of every mode, and the digests
+are cached by (path, size, mtime), so switching a system's compare mode does not
+read any file again. Files are hashed as bytes; nothing is decoded.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from config import DIGEST_CHUNK_SIZE, DIGEST_CACHE_MAX_ENTRIES
+
+EXACT = 'exact'
+IGNORE_EOL = 'ignore_eol'
+IGNORE_TRAILING_WS = 'ignore_trailing_ws'
+
+# mode -> label shown in the settings
+COMPARE_MODES = {
+    EXACT: "Exact",
+    IGNORE_EOL: "Ignore line endings",
+    IGNORE_TRAILING_WS: "Ignore line endings and trailing whitespace",
+}
+
+_TRAILING_WS = re.compile(rb'[ \t\f\v]+\n')
+
+# Unfinished line kept between chunks before its head is hashed
+MAX_CARRY = 1024 * 1024
+
+
+def normalize_eol(data):
+    """CRLF and lone CR become LF"""
+    return data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+
+class _Digester:
+    """Feeds the raw bytes of a file to the digest of every mode"""
+    def __init__(self):
+        self.raw = hashlib.md5()
+        self.eol = hashlib.md5()
+        self.ws = hashlib.md5()
+        self.carry = b''           # Bytes after the last LF, kept until their line is complete
+        self.pending_newlines = 0  # Blank lines that only count if more content follows
+
+    def update(self, chunk):
+        self.raw.update(chunk)
+        data = self.carry + chunk
+        end = data.rfind(b'\n') + 1
+        # A lone CR ends a line too, unless it is the last byte (an LF may follow)
+        cr = data.rfind(b'\r', end, len(data) - 1)
+        if cr >= 0:
+            end = cr + 1
+        self._feed_lines(normalize_eol(data[:end]))
+        self.carry = data[end:]
+        if len(self.carry) > MAX_CARRY:
+            # A very long line: everything before its trailing whitespace is final already
+            keep = len(self.carry.rstrip(b' \t\f\v\r'))
+            self._feed_text(self.carry[:keep])
+            self.carry = self.carry[keep:]
+
+    def _feed_text(self, text):
+        """Part of a line without LF or trailing whitespace"""
+        if text:
+            self.eol.update(text)
+            self.ws.update(b'\n' * self.pending_newlines)
+            self.ws.update(text)
+            self.pending_newlines = 0
+
+    def _feed_lines(self, text):
+        if not text:
+            return
+        self.eol.update(text)
+        text = _TRAILING_WS.sub(b'\n', text)
+        stripped = text.rstrip(b'\n')
+        if stripped:
+            self.ws.update(b'\n' * self.pending_newlines)
+            self.ws.update(stripped)
+            self.pending_newlines = 0
+        self.pending_newlines += len(text) - len(stripped)
+
+    def hexdigests(self):
+        tail = normalize_eol(self.carry)
+        self.eol.update(tail)
+        # The last line has no LF of its own; strip it as if it had one
+        tail = _TRAILING_WS.sub(b'\n', tail + b'\n')[:-1].rstrip(b' \t\f\v\n')
+        if tail:
+            self.ws.update(b'\n' * self.pending_newlines)
+            self.ws.update(tail)
+        return {EXACT: self.raw.hexdigest(), IGNORE_EOL: self.eol.hexdigest(), IGNORE_TRAILING_WS: self.ws.hexdigest()}
+
+
+def content_digests(data):
+    """Digest of every mode for content in memory (bytes)"""
+    digester = _Digester()
+    digester.update(data)
+    return digester.hexdigests()
+
+
+def file_digests(path, chunk_size=DIGEST_CHUNK_SIZE):
+    """Digest of every mode for a file, read once in chunks"""
+    digester = _Digester()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digester.update(chunk)
+    return digester.hexdigests()
+
+
+def file_digest(path, mode=EXACT, chunk_size=DIGEST_CHUNK_SIZE):
+    """Digest of a file under one mode; exact digests skip the normalization work"""
+    if mode != EXACT:
+        return file_digests(path, chunk_size)[mode]
+    hasher = hashlib.md5()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class DigestCache:
+    """LRU of file_digests() keyed by path and validated by size and mtime.
+
+    A rewrite keeping the size within the file system's mtime resolution goes
+    unnoticed, so callers reacting to a change event forget() the path first.
+    """
+    def __init__(self, max_entries=DIGEST_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # path -> ((size, mtime_ns), digests)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path):
+        # One entry per file, whichever separators the watcher, scanner or dialog used
+        return os.path.normcase(os.path.abspath(path))
+
+    def digests(self, path):
+        stat = os.stat(path)
+        path = self._key(path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(path)
+                return entry[1]
+        digests = file_digests(path)
+        with self._lock:
+            self._entries[path] = (stamp, digests)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return digests
+
+    def digest(self, path, mode=EXACT):
+        return self.digests(path)[mode]
+
+    def forget(self, path):
+        with self._lock:
+            self._entries.pop(self._key(path), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by the scanners and the watchers
+digest_cache = DigestCache()
+
+
+def files_match(path_a, path_b, mode=EXACT):
+    """True when two files have the same content under a compare mode"""
+    if mode == EXACT and os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+    return digest_cache.digest(path_a, mode) == digest_cache.digest(path_b, mode)
@@ -0,0 +1,420 @@
+"""Line diff engine: patience anchoring with a linear-space Myers fallback.
+
+Opcodes use difflib's format, (tag, i1, i2, j1, j2) with tag one of 'equal',
+'replace', 'delete' or 'insert', so they can replace SequenceMatcher.get_opcodes()
+anywhere. Unlike difflib.Differ no intraline '?' hints are computed.
+"""
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:  # Optional: id and hash arrays are then compared as plain lists
+    np = None
+
+# Myers work budget per region, roughly edits * region length. When a region needs more
+# edits than this allows, it is split at the furthest point reached so far (the
+# heuristic GNU diff uses) instead of searching for the minimal script. Both halves are
+# diffed again, so a full rewrite stays linear and scattered edits are still found.
+MYERS_COST_BUDGET = 1_000_000
+MYERS_MIN_EDITS = 64
+# A region whose furthest path so far is mostly edits (e.g. a regenerated file sharing
+# only braces and blank lines) is not worth searching further: it becomes one replace.
+# Checked once MYERS_MIN_EDITS edits are spent and again at every doubling.
+MYERS_MIN_MATCH_DENSITY = 0.3
+
+# How often the inner loops look at the cancel token
+CANCEL_CHECK_EVERY = 256
+
+# The common prefix/suffix search compares slices of this many items, doubling each time
+AFFIX_CHUNK = 256
+
+
+class DiffCancelled(Exception):
+    """Raised when the cancel token passed to get_opcodes() is set"""
+
+
+def get_opcodes(a, b, cancel=None):
+    """Opcodes turning sequence `a` into sequence `b`.
+
+    `a` and `b` are lists of hashable items, normally lines. `cancel` is an optional
+    object with is_set() (e.g. threading.Event); DiffCancelled is raised once it is set.
+    """
+    return blocks_to_opcodes(get_matching_blocks(a, b, cancel), len(a), len(b))
+
+
+def get_matching_blocks(a, b, cancel=None):
+    """Sorted, merged (i, j, size) runs of equal items; no terminating sentinel.
+
+    The common prefix and suffix are split off first, a slice at a time, and only the
+    differing middle is interned and diffed, so a small edit in a large file costs
+    little more than comparing the two lists.
+    """
+    len_a, len_b = len(a), len(b)
+    prefix, suffix = common_affixes(a, b)
+    blocks = []
+    if prefix:
+        blocks.append((0, 0, prefix))
+    if suffix:
+        blocks.append((len_a - suffix, len_b - suffix, suffix))
+    a_ids, b_ids = intern_lines(a[prefix:len_a - suffix], b[prefix:len_b - suffix])
+    blocks.extend((i + prefix, j + prefix, size) for i, j, size in _match_regions(a_ids, b_ids, cancel))
+
+    blocks.sort()
+    merged = []
+    for i, j, size in blocks:
+        if merged:
+            pi, pj, psize = merged[-1]
+            if pi + psize == i and pj + psize == j:
+                merged[-1] = (pi, pj, psize + size)
+                continue
+        merged.append((i, j, size))
+    return merged
+
+
+def common_affixes(a, b):
+    """(prefix, suffix): lengths of the equal head and tail of two sequences.
+
+    The suffix is measured on what the prefix leaves, so the two never overlap. Lists
+    are compared a slice at a time at C speed; NumPy arrays (e.g. line hashes) with
+    vectorized comparisons.
+    """
+    limit = min(len(a), len(b))
+    prefix = _equal_run(a, b, limit, from_end=False)
+    suffix = _equal_run(a, b, limit - prefix, from_end=True)
+    return prefix, suffix
+
+
+def intern_lines(a, b):
+    """Both sequences as lists of small integer ids, equal items getting the same id.
+
+    The diff loops then hash and compare ints instead of whole lines.
+    """
+    ids = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+    return a_ids, b_ids
+
+
+def _equal_run(a, b, limit, from_end):
+    """Number of equal items at the start (or end) of a and b, at most `limit`"""
+    len_a, len_b = len(a), len(b)
+    vectorized = np is not None and isinstance(a, np.ndarray) and isinstance(b, np.ndarray)
+    done, size = 0, AFFIX_CHUNK
+    while done < limit:
+        stop = min(limit, done + size)
+        if from_end:
+            part_a, part_b = a[len_a - stop:len_a - done], b[len_b - stop:len_b - done]
+        else:
+            part_a, part_b = a[done:stop], b[done:stop]
+        if vectorized:
+            unequal = np.flatnonzero(part_a != part_b)
+            if len(unequal):
+                return done + (stop - done - 1 - int(unequal[-1]) if from_end else int(unequal[0]))
+        elif part_a != part_b:
+            pairs = zip(reversed(part_a), reversed(part_b)) if from_end else zip(part_a, part_b)
+            return done + next(k for k, (x, y) in enumerate(pairs) if x != y)
+        done = stop
+        size *= 2
+    return limit
+
+
+def _match_regions(a, b, cancel):
+    """Unsorted (i, j, size) matches found by patience anchoring and Myers"""
+    blocks = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        _check(cancel)
+        alo, ahi, blo, bhi = stack.pop()
+        alo, ahi, blo, bhi = _trim(a, alo, ahi, b, blo, bhi, blocks)
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if anchors is None:
+            continue  # Nothing in common, e.g. a rewritten block: one replace
+        if anchors:
+            # Regions between consecutive anchors are diffed independently
+            i, j = alo, blo
+            for ai, bj in anchors:
+                stack.append((i, ai, j, bj))
+                blocks.append((ai, bj, 1))
+                i, j = ai + 1, bj + 1
+            stack.append((i, ahi, j, bhi))
+        else:
+            _myers(a, alo, ahi, b, blo, bhi, blocks, cancel)
+    return blocks
+
+
+def blocks_to_opcodes(blocks, len_a, len_b):
+    opcodes = []
+    i = j = 0
+    for ai, bj, size in list(blocks) + [(len_a, len_b, 0)]:
+        if i < ai and j < bj:
+            opcodes.append(('replace', i, ai, j, bj))
+        elif i < ai:
+            opcodes.append(('delete', i, ai, j, j))
+        elif j < bj:
+            opcodes.append(('insert', i, i, j, bj))
+        if size:
+            opcodes.append(('equal', ai, ai + size, bj, bj + size))
+        i, j = ai + size, bj + size
+    return opcodes
+
+
+def get_grouped_opcodes(opcodes, n=3):
+    """Split opcodes into hunks with up to `n` lines of context (as SequenceMatcher does)"""
+    codes = list(opcodes)
+    if not codes:
+        codes = [('equal', 0, 1, 0, 1)]
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    nn = n + n
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == 'equal' and i2 - i1 > nn:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        yield group
+
+
+def unified_diff(a, b, fromfile='', tofile='', n=3, lineterm='\n', opcodes=None):
+    """Same output as difflib.unified_diff (without dates), driven by get_opcodes()"""
+    if opcodes is None:
+        opcodes = get_opcodes(a, b)
+    started = False
+    for group in get_grouped_opcodes(opcodes, n):
+        if not started:
+            started = True
+            yield f'--- {fromfile}{lineterm}'
+            yield f'+++ {tofile}{lineterm}'
+
+        yield hunk_header(group) + lineterm
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                for line in a[i1:i2]:
+                    yield ' ' + line
+                continue
+            if tag in ('replace', 'delete'):
+                for line in a[i1:i2]:
+                    yield '-' + line
+            if tag in ('replace', 'insert'):
+                for line in b[j1:j2]:
+                    yield '+' + line
+
+
+def hunk_header(group):
+    """'@@ -a,b +c,d @@' line (without line terminator) for a group from get_grouped_opcodes()"""
+    first, last = group[0], group[-1]
+    return f'@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@'
+
+
+def ndiff(a, b, opcodes=None):
+    """Like difflib.ndiff but without '?' hint lines: '  ', '- ' and '+ ' prefixed lines"""
+    if opcodes is None:
+        opcodes = get_opcodes(a, b)
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            for line in a[i1:i2]:
+                yield '  ' + line
+            continue
+        for line in a[i1:i2]:
+            yield '- ' + line
+        for line in b[j1:j2]:
+            yield '+ ' + line
+
+
+def _format_range(start, stop):
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f'{beginning}'
+    if not length:
+        beginning -= 1
+    return f'{beginning},{length}'
+
+
+def _check(cancel):
+    if cancel is not None and cancel.is_set():
+        raise DiffCancelled()
+
+
+def _trim(a, alo, ahi, b, blo, bhi, blocks):
+    """Strip the common prefix and suffix of a region, recording them as matches"""
+    start_a, start_b = alo, blo
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        alo += 1
+        blo += 1
+    if alo > start_a:
+        blocks.append((start_a, start_b, alo - start_a))
+
+    end_a, end_b = ahi, bhi
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+    if ahi < end_a:
+        blocks.append((ahi, bhi, end_a - ahi))
+    return alo, ahi, blo, bhi
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """Longest increasing run of lines that occur exactly once on both sides (patience).
+
+    Returns None when the two regions share no line at all.
+    """
+    seen_a = {}
+    for i in range(alo, ahi):
+        line = a[i]
+        seen_a[line] = -1 if line in seen_a else i
+    seen_b = {}
+    for j in range(blo, bhi):
+        line = b[j]
+        if line in seen_a:
+            seen_b[line] = -1 if line in seen_b else j
+    if not seen_b:
+        return None
+
+    pairs = []
+    for line, j in seen_b.items():
+        if j >= 0:
+            i = seen_a[line]
+            if i >= 0:
+                pairs.append((i, j))
+    if not pairs:
+        return []
+    pairs.sort()
+
+    # Patience sorting over b positions, in a order
+    tails = []       # Smallest b position ending an increasing run of each length
+    tail_index = []  # Index into pairs of that run's last element
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        k = bisect_left(tails, j)
+        if k:
+            previous[index] = tail_index[k - 1]
+        if k == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[k] = j
+            tail_index[k] = index
+
+    anchors = []
+    index = tail_index[-1]
+    while index >= 0:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _myers(a, alo, ahi, b, blo, bhi, blocks, cancel):
+    """Linear-space Myers (divide and conquer on the middle snake)"""
+    stack = [(alo, ahi, blo, bhi)]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        alo, ahi, blo, bhi = _trim(a, alo, ahi, b, blo, bhi, blocks)
+        if alo == ahi or blo == bhi:
+            continue
+
+        max_edits = max(MYERS_MIN_EDITS, MYERS_COST_BUDGET // (ahi - alo + bhi - blo))
+        snake = _middle_snake(a, alo, ahi, b, blo, bhi, max_edits, cancel)
+        if snake is None:
+            continue  # No split found: leave the region as one replace
+        x0, y0, x1, y1 = snake
+        if x1 > x0:
+            blocks.append((x0, y0, x1 - x0))
+        stack.append((alo, x0, blo, y0))
+        stack.append((x1, ahi, y1, bhi))
+
+
+def _middle_snake(a, alo, ahi, b, blo, bhi, max_edits, cancel):
+    """Find the middle snake of an optimal edit path, in absolute indices.
+
+    The region must be trimmed (first and last items differ) so at least two edits are
+    needed and both halves around the snake are strictly smaller. When more than
+    `max_edits` edits would be needed, an empty snake at the furthest point reached by
+    the forward search is returned instead, or None if that path is mostly edits.
+    """
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = delta & 1
+    d_max = min((n + m + 1) // 2, max_edits)
+    offset = d_max + 1
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+
+    steps = 0
+    for d in range(d_max + 1):
+        # Forward search from the top-left corner
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and -(d - 1) <= delta - k <= d - 1 and x + backward[offset + delta - k] >= n:
+                return alo + x0, blo + y0, alo + x, blo + y
+
+        if d >= MYERS_MIN_EDITS and not d & (d - 1):
+            x, y = _furthest_point(forward, offset, d, n, m)
+            if _match_density(x, y, d) < MYERS_MIN_MATCH_DENSITY:
+                return None
+
+        # Backward search from the bottom-right corner, on reversed sequences
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + forward[offset + delta - k] >= n:
+                return ahi - x, bhi - y, ahi - x0, bhi - y0
+
+        steps += d + 1
+        if steps >= CANCEL_CHECK_EVERY:
+            steps = 0
+            _check(cancel)
+
+    x, y = _furthest_point(forward, offset, d_max, n, m)
+    if x + y == 0 or (x, y) == (n, m) or _match_density(x, y, d_max) < MYERS_MIN_MATCH_DENSITY:
+        return None
+    return alo + x, blo + y, alo + x, blo + y
+
+
+def _furthest_point(forward, offset, d, n, m):
+    """The in-bounds point with the largest x + y reached by the forward search at round d"""
+    best_x = best_y = 0
+    for k in range(-d, d + 1, 2):
+        x = forward[offset + k]
+        y = x - k
+        if 0 <= y <= m and x <= n and x + y > best_x + best_y:
+            best_x, best_y = x, y
+    return best_x, best_y
+
+
+def _match_density(x, y, edits):
+    """Share of a path to (x, y) spent on matches: each match advances x + y by 2, each edit by 1"""
+    if x + y == 0:
+        return 0.0
+    return (x + y - edits) / (x + y)
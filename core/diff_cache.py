@@ -0,0 +1,105 @@
+"""Process-wide LRU cache of diff results keyed by content digests"""
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+
+from config import DIFF_CACHE_MAX_BYTES
+from core.diff import get_opcodes
+
+# Rough footprint of one opcode tuple with its five items
+OPCODE_BYTES = 120
+
+
+def lines_digest(lines):
+    """Digest of a line list; lists split differently from the same text get different digests"""
+    hasher = hashlib.md5("".join(lines).encode("utf-8", "surrogatepass"))
+    # The line lengths fix the split whatever characters the lines contain
+    hasher.update(array('Q', map(len, lines)).tobytes())
+    return hasher.hexdigest()
+
+
+class DiffCache:
+    """Size-bounded LRU of opcode lists keyed by (old digest, new digest).
+
+    Every view that diffs the same pair of contents (review dialogs, both panes of the
+    diff dialog, FileChangeEntry) shares one result. Opcodes are stored as tuples so
+    callers on any thread can hold on to them safely.
+    """
+    def __init__(self, max_bytes=DIFF_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (opcodes, size)
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, opcodes):
+        opcodes = tuple(opcodes)
+        size = len(opcodes) * OPCODE_BYTES
+        if size > self.max_bytes:
+            return opcodes
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.memory_bytes -= previous[1]
+            self._entries[key] = (opcodes, size)
+            self.memory_bytes += size
+            while self.memory_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.memory_bytes -= evicted_size
+        return opcodes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.memory_bytes = 0
+
+    def opcodes(self, old_lines, new_lines, cancel=None):
+        """Opcodes for old -> new, computed at most once per pair of contents"""
+        key = (lines_digest(old_lines), lines_digest(new_lines))
+        opcodes = self.get(key)
+        if opcodes is None:
+            opcodes = self.put(key, get_opcodes(old_lines, new_lines, cancel))
+        return opcodes
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'memory_bytes': self.memory_bytes,
+            'max_bytes': self.max_bytes,
+        }
+
+    def report(self):
+        return (f"Diff cache: {len(self._entries)} entries, {self.memory_bytes / (1024 * 1024):.1f}/"
+                f"{self.max_bytes / (1024 * 1024):.0f} MB, hit rate {self.hit_rate:.0%} "
+                f"({self.hits} hits, {self.misses} misses)")
+
+
+diff_cache = DiffCache()
+
+
+def cached_opcodes(old_lines, new_lines, cancel=None):
+    """get_opcodes() through the shared diff cache"""
+    return diff_cache.opcodes(old_lines, new_lines, cancel)
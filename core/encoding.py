@@ -0,0 +1,163 @@
+"""Text encoding detection shared by every reader and writer of watched files.
+
+Files used to be read as UTF-8 with undecodable bytes dropped, which turned legacy
+cp874 files into garbage and UTF-16 files into "binary". sniff_encoding() picks a
+codec once from the bytes: a BOM, then a per-extension override, then UTF-16
+without a BOM, then strict UTF-8, else LEGACY_ENCODING. The result is cached by
+(path, size, mtime), so the baseline capture decides the codec and every dialog,
+diff and write-back of the same file version reuses it without decoding twice.
+
+A BOM is kept in the decoded text as U+FEFF, so encoding the text with the same
+codec gives the original bytes back.
+"""
+import codecs
+import os
+import threading
+from collections import OrderedDict
+
+from config import LEGACY_ENCODING, ENCODING_OVERRIDES, ENCODING_CACHE_MAX_ENTRIES
+
+UTF8 = 'utf-8'
+
+# Longest first: the UTF-32 LE BOM starts with the UTF-16 LE one
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, UTF8),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+UTF16_SNIFF_BYTES = 4096     # Leading bytes checked for BOM-less UTF-16
+UTF16_MIN_ZERO_RATIO = 0.3   # Share of high bytes that must be zero (ASCII in UTF-16)
+UTF16_MAX_OTHER_ZERO_RATIO = 0.05
+
+
+def utf16_without_bom(sample):
+    """'utf-16-le' or 'utf-16-be' when a sample looks like BOM-less UTF-16 text, else None.
+
+    Mostly-ASCII UTF-16 has a zero in every other byte and almost none in between.
+    """
+    sample = sample[:len(sample) // 2 * 2]
+    if len(sample) < 4:
+        return None
+    half = len(sample) // 2
+    even_zeros = sample[0::2].count(0) / half
+    odd_zeros = sample[1::2].count(0) / half
+    if odd_zeros >= UTF16_MIN_ZERO_RATIO and even_zeros <= UTF16_MAX_OTHER_ZERO_RATIO:
+        return 'utf-16-le'
+    if even_zeros >= UTF16_MIN_ZERO_RATIO and odd_zeros <= UTF16_MAX_OTHER_ZERO_RATIO:
+        return 'utf-16-be'
+    return None
+
+
+def bom_codec(data):
+    """Codec named by a leading BOM, or None"""
+    for bom, codec in BOMS:
+        if data.startswith(bom):
+            return codec
+    return None
+
+
+def is_ascii_compatible(codec):
+    """True when line breaks and ASCII are single bytes of the same value (not UTF-16/32)"""
+    try:
+        return '\r\n\x0b\x0c\x1c'.encode(codec) == b'\r\n\x0b\x0c\x1c'
+    except (LookupError, UnicodeEncodeError):
+        return False
+
+
+def decode_bytes(data, path=None):
+    """(text, codec) for the raw bytes of a file; line endings are left as they are"""
+    codec = bom_codec(data)
+    if codec is None and path is not None:
+        codec = ENCODING_OVERRIDES.get(os.path.splitext(path)[1].lower())
+    if codec is None:
+        codec = utf16_without_bom(data[:UTF16_SNIFF_BYTES])
+    if codec is not None:
+        return data.decode(codec, errors='replace'), codec
+    try:
+        return data.decode(UTF8), UTF8
+    except UnicodeDecodeError:
+        return data.decode(LEGACY_ENCODING, errors='replace'), LEGACY_ENCODING
+
+
+def sniff_encoding(data, path=None):
+    """Codec decode_bytes() would pick for `data`"""
+    return decode_bytes(data, path)[1]
+
+
+def universal_newlines(text):
+    """CRLF and lone CR become LF, as open(..., 'r') would read them"""
+    if '\r' not in text:
+        return text
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+class EncodingCache:
+    """Codec of each file version, keyed by path and validated by size and mtime"""
+    def __init__(self, max_entries=ENCODING_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # path -> ((size, mtime_ns), codec)
+        self._lock = threading.Lock()
+
+    def get(self, path, stamp):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != stamp:
+                return None
+            self._entries.move_to_end(path)
+            return entry[1]
+
+    def put(self, path, stamp, codec):
+        with self._lock:
+            self._entries[path] = (stamp, codec)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def read(self, path):
+        """(text with universal newlines, codec) of a file, sniffing only versions not seen before"""
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        codec = self.get(path, stamp)
+        if codec is not None:
+            return universal_newlines(data.decode(codec, errors='replace')), codec
+        text, codec = decode_bytes(data, path)
+        self.put(path, stamp, codec)
+        return universal_newlines(text), codec
+
+    def encoding(self, path):
+        """Codec of the file as it is on disk now; UTF-8 for a file that does not exist"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return UTF8
+        codec = self.get(path, (stat.st_size, stat.st_mtime_ns))
+        if codec is not None:
+            return codec
+        try:
+            return self.read(path)[1]
+        except OSError:
+            return UTF8
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared by the watchers, the dialogs and the write-back paths
+encoding_cache = EncodingCache()
+
+
+def read_text(path):
+    """Text of a file in its detected encoding, with universal newlines; a missing file reads as empty"""
+    if not os.path.exists(path):
+        return ""
+    return encoding_cache.read(path)[0]
+
+
+def file_encoding(path):
+    return encoding_cache.encoding(path)
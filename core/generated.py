@@ -0,0 +1,75 @@
+"""Detection of minified and generated files, whose diffs cost the most and say the least.
+
+classify_generated() looks at a file's name and its leading bytes only: a glob from
+GENERATED_GLOBS or the system's own list, a generator marker near the top, or line
+lengths no hand-written file has. The review dialogs then show a size and digest
+summary instead of diffing, and diff such a file only when asked to.
+"""
+import fnmatch
+
+from config import (GENERATED_GLOBS, GENERATED_MARKERS, GENERATED_SAMPLE_BYTES, GENERATED_MARKER_BYTES,
+                    GENERATED_MAX_LINE_LENGTH, GENERATED_MEAN_LINE_LENGTH)
+
+
+def parse_globs(text):
+    """Globs from a comma or newline separated settings value"""
+    return [glob.strip() for glob in text.replace("\n", ",").split(",") if glob.strip()]
+
+
+def matches_glob(path, globs):
+    """The first glob matching the file name or the end of its path, or None"""
+    path = path.replace("\\", "/")
+    name = path.rsplit("/", 1)[-1]
+    for glob in globs:
+        glob = glob.replace("\\", "/")
+        if fnmatch.fnmatch(name, glob) or fnmatch.fnmatch(path, glob) or fnmatch.fnmatch(path, "*/" + glob):
+            return glob
+    return None
+
+
+def sample_reason(sample):
+    """Why a file starting with `sample` (bytes or str) looks generated, or None"""
+    if isinstance(sample, str):
+        sample = sample[:GENERATED_SAMPLE_BYTES].encode('utf-8', 'replace')
+    head = sample[:GENERATED_MARKER_BYTES].lower()
+    for marker in GENERATED_MARKERS:
+        if marker.lower().encode('ascii') in head:
+            return f"marked '{marker}'"
+    lines = sample.split(b'\n')
+    if len(sample) >= GENERATED_SAMPLE_BYTES:
+        lines = lines[:-1] or lines  # The last line of a cut sample is incomplete
+    longest = max(map(len, lines))
+    if longest > GENERATED_MAX_LINE_LENGTH:
+        return f"minified, a {longest:,}+ character line"
+    mean = len(sample) / len(lines)
+    if len(sample) >= GENERATED_MAX_LINE_LENGTH and mean > GENERATED_MEAN_LINE_LENGTH:
+        return f"minified, {mean:,.0f} characters per line"
+    return None
+
+
+def classify_generated(path=None, content=None, globs=()):
+    """A short reason when the file (at `path`, else `content`) is minified or generated, else None"""
+    if path is not None:
+        glob = matches_glob(path, list(GENERATED_GLOBS) + list(globs))
+        if glob is not None:
+            return f"matches {glob}"
+        if content is None:
+            try:
+                with open(path, 'rb') as f:
+                    content = f.read(GENERATED_SAMPLE_BYTES)
+            except OSError:
+                return None
+    if not content:
+        return None
+    return sample_reason(content[:GENERATED_SAMPLE_BYTES])
+
+
+def classify_pair(old_content, new_content, old_path=None, new_path=None, globs=(), name=None):
+    """classify_generated() of the new side, else of the old one; `name` is matched against
+    the globs when both sides are contents"""
+    if name is not None:
+        glob = matches_glob(name, list(GENERATED_GLOBS) + list(globs))
+        if glob is not None:
+            return f"matches {glob}"
+    return (classify_generated(new_path, None if new_path is not None else new_content, globs)
+            or classify_generated(old_path, None if old_path is not None else old_content, globs))
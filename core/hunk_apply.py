@@ -0,0 +1,241 @@
+"""Writing review decisions back to disk without rebuilding the whole file.
+
+The dialogs read files in universal-newline mode, so their lines end in LF whatever
+the file uses; joining them and writing the result rewrote every line ending (and
+dropped undecodable bytes) even when only one hunk changed. apply_hunks() instead
+maps the file, copies every range that stays as it is byte for byte, encodes only
+the replaced hunks (in the file's own line ending) and renames a temp file over
+the original, so readers never see a half-written file.
+
+Text is encoded in the codec detected for the file (core.encoding). For UTF-16/32,
+whose line breaks are not single bytes, the file is decoded and rebuilt instead,
+still keeping every untouched line exactly as it was.
+"""
+import codecs
+import contextlib
+import functools
+import mmap
+import os
+import re
+import shutil
+import tempfile
+
+from config import APPLY_COPY_BLOCK_SIZE
+from core.encoding import BOMS, file_encoding, is_ascii_compatible, universal_newlines
+
+# Line boundaries as str.splitlines() sees them, in UTF-8 bytes
+_LINE_BREAK = re.compile(rb'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]')
+_EOL = re.compile(rb'\r\n|\n|\r')
+_TEXT_EOL = re.compile(r'\r\n|\n|\r')
+_TEXT_LINE_BREAKS = '\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+
+EOL_SAMPLE_BYTES = 64 * 1024  # Leading bytes looked at to pick the line ending of new lines
+EOL_SAMPLE_LINES = 1000       # ...or leading lines, for files that are decoded whole
+
+
+class ApplyError(Exception):
+    """The file on disk no longer matches the lines the decisions were made on"""
+
+
+@contextlib.contextmanager
+def atomic_writer(path):
+    """Binary file for a temp file next to `path`, renamed over it when the block succeeds.
+
+    Readers (and the file watcher) only ever see the old or the new file, never a
+    partially written one. Permission bits of an existing file are kept.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def detect_eol(data):
+    """'\\r\\n', '\\n' or '\\r', whichever ends most lines of `data` (bytes or str); None when it has no line breaks"""
+    counts = {}
+    pattern = _TEXT_EOL if isinstance(data, str) else _EOL
+    for match in pattern.finditer(data):
+        eol = match.group()
+        counts[eol] = counts.get(eol, 0) + 1
+    if not counts:
+        return None
+    eol = max(counts, key=counts.get)
+    return eol if isinstance(eol, str) else eol.decode('ascii')
+
+
+@functools.lru_cache(maxsize=None)
+def _line_break_pattern(codec):
+    """Regex over the bytes of an ASCII-compatible codec matching the boundaries str.splitlines() sees"""
+    if codecs.lookup(codec).name in ('utf-8', 'utf-8-sig'):
+        return _LINE_BREAK
+    extra = b''.join(re.escape(bytes([byte])) for byte in range(0x80, 0x100)
+                     if bytes([byte]).decode(codec, errors='ignore') in tuple(_TEXT_LINE_BREAKS))
+    return re.compile(rb'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e' + extra + rb']')
+
+
+def _bom(codec):
+    name = codecs.lookup(codec).name
+    for bom, bom_codec in BOMS:
+        if codecs.lookup(bom_codec).name == name:
+            return bom
+    return None
+
+
+def with_eol(lines, eol):
+    """Lines read in universal-newline mode with their LF replaced by `eol`"""
+    if eol is None or eol == '\n':
+        return lines
+    return [line[:-1] + eol if line.endswith('\n') else line for line in lines]
+
+
+def read_head(path, size=EOL_SAMPLE_BYTES):
+    """Leading bytes of a file, or b'' when it does not exist"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(size)
+    except FileNotFoundError:
+        return b''
+
+
+def encode_like(text, head, encoding='utf-8'):
+    """Encode text read in universal-newline mode the way a file starting with `head` is written.
+
+    The file's dominant line ending replaces LF, and the file's BOM is kept (or not
+    added) to match the file.
+    """
+    eol_sample = head if is_ascii_compatible(encoding) else head.decode(encoding, errors='ignore')
+    text = ''.join(with_eol(text.splitlines(keepends=True), detect_eol(eol_sample)))
+    bom = _bom(encoding)
+    if bom is not None and head.startswith(bom) and not text.startswith('\ufeff'):
+        text = '\ufeff' + text
+    return text.encode(encoding, errors='replace')
+
+
+def write_text_like(path, text, encoding=None):
+    """Replace a file with text, keeping its line endings, BOM and encoding; bytes are written as they are.
+
+    Without an `encoding` the one detected for the file on disk is used.
+    """
+    if isinstance(text, (bytes, bytearray)):
+        data = text
+    else:
+        data = encode_like(text, read_head(path), encoding or file_encoding(path))
+    with atomic_writer(path) as f:
+        f.write(data)
+
+
+def _line_bounds(view, wanted, pattern=_LINE_BREAK):
+    """Byte offset of the start of each line number in `wanted`, and the file's line count"""
+    offsets = {}
+    line = 0
+    end = 0
+    if 0 in wanted:
+        offsets[0] = 0
+    for match in pattern.finditer(view):
+        line += 1
+        end = match.end()
+        if line in wanted:
+            offsets[line] = end
+    count = line + (1 if end < len(view) else 0)
+    if count in wanted:
+        offsets[count] = len(view)
+    return offsets, count
+
+
+def _copy(view, start, stop, target, block_size):
+    for offset in range(start, stop, block_size):
+        target.write(view[offset:min(offset + block_size, stop)])
+
+
+def _line_count_error(path, count, expected):
+    return ApplyError(f"{os.path.basename(path)} has {count:,} lines on disk, "
+                      f"expected {expected:,}; refresh and review again")
+
+
+def _range_error(path, start, end):
+    return ApplyError(f"Lines {start + 1}-{end} of {os.path.basename(path)} changed on disk; "
+                      f"refresh and review again")
+
+
+def _keep_bom(text, start, has_bom):
+    """Replacement text for base lines from `start`: a replaced first line keeps the file's BOM,
+    as write_text_like() keeps it for a whole file"""
+    if start == 0 and has_bom and not text.startswith('\ufeff'):
+        return '\ufeff' + text
+    return text
+
+
+def _apply_decoded(path, base_lines, replacements, codec):
+    """apply_hunks() for codecs whose line breaks are not single ASCII bytes (UTF-16/32)"""
+    with open(path, 'rb') as source:
+        lines = source.read().decode(codec, errors='replace').splitlines(keepends=True)
+    if len(lines) != len(base_lines):
+        raise _line_count_error(path, len(lines), len(base_lines))
+    eol = detect_eol(''.join(lines[:EOL_SAMPLE_LINES]))
+    has_bom = bool(lines) and lines[0].startswith('\ufeff')
+    parts = []
+    pos = 0
+    for start, end, new_lines in replacements:
+        if universal_newlines(''.join(lines[start:end])) != ''.join(base_lines[start:end]):
+            raise _range_error(path, start, end)
+        parts.extend(lines[pos:start])
+        parts.append(_keep_bom(''.join(with_eol(new_lines, eol)), start, has_bom))
+        pos = end
+    parts.extend(lines[pos:])
+    with atomic_writer(path) as target:
+        target.write(''.join(parts).encode(codec, errors='replace'))
+
+
+def apply_hunks(path, base_lines, replacements, encoding=None, block_size=APPLY_COPY_BLOCK_SIZE):
+    """Rewrite `path` with some line ranges replaced.
+
+    `base_lines` are the lines of the file as it was read for the diff (universal
+    newlines) and `replacements` are (start, end, lines) triples sorted by start:
+    base lines [start, end) become `lines`. Everything else is copied from the file
+    as bytes. Raises ApplyError, leaving the file alone, when the file no longer has
+    as many lines or a replaced range no longer reads as its base lines. Without an
+    `encoding` the one detected for the file is used.
+    """
+    codec = encoding or file_encoding(path)
+    if not is_ascii_compatible(codec):
+        _apply_decoded(path, base_lines, replacements, codec)
+        return
+    pattern = _line_break_pattern(codec)
+    wanted = {0, len(base_lines)}
+    for start, end, _lines in replacements:
+        wanted.update((start, end))
+
+    with atomic_writer(path) as target:
+        with open(path, 'rb') as source:
+            size = os.fstat(source.fileno()).st_size
+            view = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+            try:
+                offsets, count = _line_bounds(view, wanted, pattern)
+                if count != len(base_lines):
+                    raise _line_count_error(path, count, len(base_lines))
+                eol = detect_eol(view[:EOL_SAMPLE_BYTES])
+                bom = _bom(codec)
+                has_bom = bom is not None and view[:len(bom)] == bom
+                pos = 0
+                for start, end, lines in replacements:
+                    current = universal_newlines(view[offsets[start]:offsets[end]].decode(codec, errors='replace'))
+                    if current != ''.join(base_lines[start:end]):
+                        raise _range_error(path, start, end)
+                    _copy(view, offsets[pos], offsets[start], target, block_size)
+                    text = _keep_bom(''.join(with_eol(lines, eol)), start, has_bom)
+                    target.write(text.encode(codec, errors='replace'))
+                    pos = end
+                _copy(view, offsets[pos], size, target, block_size)
+            finally:
+                if size:
+                    view.close()
@@ -0,0 +1,75 @@
+"""Incremental re-diffing after one side of a diff was edited.
+
+When the new side of an old -> new diff is saved again, usually only a small window
+of lines differs from the previous save. Lines are compared through hashes kept
+from the previous run, the window is widened to the nearest unchanged change on
+each side, and only that part of the old/new pair is diffed again. Changes outside
+the window are reused as they are (shifted when lines were added or removed).
+"""
+from core.diff import common_affixes, get_opcodes, np
+
+
+def line_hashes(lines):
+    """Per-line hashes; kept alongside a diff so the next edit can be located cheaply.
+
+    With NumPy installed they are an int64 array, so the edit window is found with
+    vectorized comparisons.
+    """
+    if np is not None:
+        return np.fromiter(map(hash, lines), dtype=np.int64, count=len(lines))
+    return [hash(line) for line in lines]
+
+
+def changes_to_opcodes(changes, len_a, len_b):
+    """Full opcode list from the non-equal opcodes, filling the gaps with 'equal' runs"""
+    opcodes = []
+    i = j = 0
+    for tag, i1, i2, j1, j2 in changes:
+        if i < i1 or j < j1:
+            opcodes.append(('equal', i, i1, j, j1))
+        opcodes.append((tag, i1, i2, j1, j2))
+        i, j = i2, j2
+    if i < len_a or j < len_b:
+        opcodes.append(('equal', i, len_a, j, len_b))
+    return opcodes
+
+
+def rediff_window(old_lines, prev_opcodes, prev_hashes, new_lines, new_hashes, cancel=None):
+    """Opcodes for old_lines -> new_lines, reusing prev_opcodes (old -> previous new).
+
+    `prev_hashes` and `new_hashes` are line_hashes() of the previous and current new
+    side. Returns (opcodes, kept_before, kept_after): the first `kept_before` and the
+    last `kept_after` non-equal opcodes are unchanged changes carried over from the
+    previous diff, in the same order; everything between them was diffed again.
+    """
+    changes = [op for op in prev_opcodes if op[0] != 'equal']
+    prev_len, new_len = len(prev_hashes), len(new_hashes)
+
+    # Edit window: [start, prev_end) in the previous new side, [start, new_end) now
+    start, suffix = common_affixes(prev_hashes, new_hashes)
+    if start == prev_len == new_len:
+        return list(prev_opcodes), len(changes), 0
+    prev_end = prev_len - suffix
+    delta = new_len - prev_len
+
+    # Changes strictly clear of the window survive; the ones touching it are redone
+    before = 0
+    while before < len(changes) and changes[before][4] < start:
+        before += 1
+    after = before
+    while after < len(changes) and changes[after][3] <= prev_end:
+        after += 1
+
+    # Re-diff between the surviving neighbours, whose edges are aligned on both sides
+    old_lo, new_lo = (changes[before - 1][2], changes[before - 1][4]) if before else (0, 0)
+    if after < len(changes):
+        old_hi, new_hi = changes[after][1], changes[after][3] + delta
+    else:
+        old_hi, new_hi = len(old_lines), new_len
+    middle = [(tag, i1 + old_lo, i2 + old_lo, j1 + new_lo, j2 + new_lo)
+              for tag, i1, i2, j1, j2 in get_opcodes(old_lines[old_lo:old_hi], new_lines[new_lo:new_hi], cancel)
+              if tag != 'equal']
+    shifted = [(tag, i1, i2, j1 + delta, j2 + delta) for tag, i1, i2, j1, j2 in changes[after:]]
+
+    opcodes = changes_to_opcodes(changes[:before] + middle + shifted, len(old_lines), new_len)
+    return opcodes, before, len(shifted)
@@ -0,0 +1,66 @@
+"""Word-level differences inside a changed line pair, computed on demand.
+
+Views call intraline_spans() only for the line pairs they are about to paint, and
+results are memoized, so a large diff pays nothing for word highlighting until
+its lines scroll into view.
+"""
+import re
+from functools import lru_cache
+
+from config import INTRALINE_CACHE_SIZE, INTRALINE_MAX_CHARS
+from core.diff import get_opcodes
+
+# Words, runs of whitespace and single punctuation characters
+TOKEN_PATTERN = re.compile(r'\w+|\s+|[^\w\s]')
+
+# Pairs sharing less than this fraction of their text read better as whole-line changes
+MIN_SHARED_RATIO = 0.4
+
+
+def tokenize(line):
+    return TOKEN_PATTERN.findall(line)
+
+
+def _offsets(tokens):
+    """Character offset of every token, plus the end of the line"""
+    offsets = [0]
+    for token in tokens:
+        offsets.append(offsets[-1] + len(token))
+    return offsets
+
+
+def _add_span(spans, start, end):
+    if spans and spans[-1][1] == start:
+        spans[-1] = (spans[-1][0], end)
+    else:
+        spans.append((start, end))
+
+
+@lru_cache(maxsize=INTRALINE_CACHE_SIZE)
+def intraline_spans(old_line, new_line):
+    """(old_spans, new_spans): (start, end) character ranges that differ in each line.
+
+    Returns None when the lines are too long or too different for word-level
+    highlighting to help; the caller then shows the whole line as changed.
+    """
+    if old_line == new_line:
+        return (), ()
+    if len(old_line) > INTRALINE_MAX_CHARS or len(new_line) > INTRALINE_MAX_CHARS:
+        return None
+
+    old_tokens, new_tokens = tokenize(old_line), tokenize(new_line)
+    old_offsets, new_offsets = _offsets(old_tokens), _offsets(new_tokens)
+    old_spans, new_spans = [], []
+    shared = 0
+    for tag, i1, i2, j1, j2 in get_opcodes(old_tokens, new_tokens):
+        if tag == 'equal':
+            shared += old_offsets[i2] - old_offsets[i1]
+            continue
+        if i1 < i2:
+            _add_span(old_spans, old_offsets[i1], old_offsets[i2])
+        if j1 < j2:
+            _add_span(new_spans, new_offsets[j1], new_offsets[j2])
+
+    if 2 * shared < MIN_SHARED_RATIO * (len(old_line) + len(new_line)):
+        return None
+    return tuple(old_spans), tuple(new_spans)
@@ -0,0 +1,165 @@
+"""Three-way line merge: the watcher's baseline as the common ancestor of the working copy and git.
+
+merge3() diffs the baseline against each side (through the shared diff cache, so
+pairs the two-way dialogs already compared are not diffed again) and walks both
+opcode lists once. Changes whose baseline ranges neither overlap nor touch are
+taken automatically; where both sides changed the same lines to the same text the
+change is taken once; everything else is a conflict left for review.
+"""
+from core.diff_cache import cached_opcodes
+
+# Region kinds
+UNCHANGED, OURS, THEIRS, BOTH, CONFLICT = 'unchanged', 'ours', 'theirs', 'both', 'conflict'
+
+
+class MergeRegion:
+    """Baseline lines [base_start, base_end) and the ranges they correspond to on each side"""
+    def __init__(self, kind, base_start, base_end, ours_start, ours_end, theirs_start, theirs_end):
+        self.kind = kind
+        self.base_start = base_start
+        self.base_end = base_end
+        self.ours_start = ours_start
+        self.ours_end = ours_end
+        self.theirs_start = theirs_start
+        self.theirs_end = theirs_end
+
+    def __repr__(self):
+        return (f"MergeRegion({self.kind!r}, base={self.base_start}:{self.base_end}, "
+                f"ours={self.ours_start}:{self.ours_end}, theirs={self.theirs_start}:{self.theirs_end})")
+
+
+class MergeResult:
+    """The regions of a merge, in order, covering all three line lists.
+
+    Conflicts are resolved by a list of choices, 'ours' or 'theirs', one per conflict
+    in order; without choices every conflict keeps ours.
+    """
+    def __init__(self, base, ours, theirs, regions):
+        self.base = base
+        self.ours = ours
+        self.theirs = theirs
+        self.regions = regions
+
+    @property
+    def conflicts(self):
+        return [region for region in self.regions if region.kind == CONFLICT]
+
+    @property
+    def auto_merged(self):
+        """Number of changes taken without review"""
+        return sum(1 for region in self.regions if region.kind in (OURS, THEIRS, BOTH))
+
+    def _taken(self, choices):
+        """(region, 'ours' or 'theirs') for every region, conflicts resolved by `choices`"""
+        choices = iter(choices or ())
+        for region in self.regions:
+            if region.kind == THEIRS:
+                yield region, THEIRS
+            elif region.kind == CONFLICT:
+                yield region, next(choices, OURS)
+            else:
+                yield region, OURS
+
+    def merged_lines(self, choices=None):
+        lines = []
+        for region, side in self._taken(choices):
+            if side == THEIRS:
+                lines.extend(self.theirs[region.theirs_start:region.theirs_end])
+            else:
+                lines.extend(self.ours[region.ours_start:region.ours_end])
+        return lines
+
+    def ours_replacements(self, choices=None):
+        """The merge as (start, end, lines) replacements of our lines, for apply_hunks()"""
+        return [(region.ours_start, region.ours_end, self.theirs[region.theirs_start:region.theirs_end])
+                for region, side in self._taken(choices) if side == THEIRS]
+
+    def review_sides(self):
+        """(ours_lines, theirs_lines, opcodes) to review only the conflicts.
+
+        Both sides hold the merge, one with our side of every conflict and the other
+        with theirs; the opcodes mark each conflict as one 'replace' and nothing else.
+        """
+        old_lines, new_lines, opcodes = [], [], []
+        equal_start = None
+        for region, side in self._taken(None):
+            if region.kind != CONFLICT:
+                if equal_start is None:
+                    equal_start = (len(old_lines), len(new_lines))
+                chunk = (self.theirs[region.theirs_start:region.theirs_end] if side == THEIRS
+                         else self.ours[region.ours_start:region.ours_end])
+                old_lines.extend(chunk)
+                new_lines.extend(chunk)
+                continue
+            if equal_start is not None and len(old_lines) > equal_start[0]:
+                opcodes.append(('equal', equal_start[0], len(old_lines), equal_start[1], len(new_lines)))
+            equal_start = None
+            i1, j1 = len(old_lines), len(new_lines)
+            old_lines.extend(self.ours[region.ours_start:region.ours_end])
+            new_lines.extend(self.theirs[region.theirs_start:region.theirs_end])
+            opcodes.append(('replace', i1, len(old_lines), j1, len(new_lines)))
+        if equal_start is not None and len(old_lines) > equal_start[0]:
+            opcodes.append(('equal', equal_start[0], len(old_lines), equal_start[1], len(new_lines)))
+        return old_lines, new_lines, opcodes
+
+
+def _changes(opcodes):
+    return [(i1, i2, j1, j2) for tag, i1, i2, j1, j2 in opcodes if tag != 'equal']
+
+
+def _side_range(changes, lo, hi, delta):
+    """Range on one side covering baseline [lo, hi), given that side's changes in it"""
+    if not changes:
+        return lo + delta, hi + delta
+    first, last = changes[0], changes[-1]
+    return first[2] - (first[0] - lo), last[3] + (hi - last[1])
+
+
+def merge3(base, ours, theirs, cancel=None):
+    """Merge two edited copies of `base` (lists of lines) into a MergeResult"""
+    changes_a = _changes(cached_opcodes(base, ours, cancel))
+    changes_b = _changes(cached_opcodes(base, theirs, cancel))
+    regions = []
+    a = b = 0
+    delta_a = delta_b = 0  # Line offset of each side against the baseline so far
+    pos = 0                # Baseline lines before this are covered by regions
+    while a < len(changes_a) or b < len(changes_b):
+        # Start a cluster at the next change of either side, then pull in every change
+        # that overlaps or touches it until it stops growing
+        if b >= len(changes_b) or (a < len(changes_a) and changes_a[a][0] <= changes_b[b][0]):
+            lo, hi = changes_a[a][0], changes_a[a][1]
+        else:
+            lo, hi = changes_b[b][0], changes_b[b][1]
+        cluster_a, cluster_b = [], []
+        while True:
+            if a < len(changes_a) and changes_a[a][0] <= hi:
+                hi = max(hi, changes_a[a][1])
+                cluster_a.append(changes_a[a])
+                a += 1
+            elif b < len(changes_b) and changes_b[b][0] <= hi:
+                hi = max(hi, changes_b[b][1])
+                cluster_b.append(changes_b[b])
+                b += 1
+            else:
+                break
+
+        if pos < lo:
+            regions.append(MergeRegion(UNCHANGED, pos, lo, pos + delta_a, lo + delta_a, pos + delta_b, lo + delta_b))
+        o1, o2 = _side_range(cluster_a, lo, hi, delta_a)
+        t1, t2 = _side_range(cluster_b, lo, hi, delta_b)
+        if not cluster_b:
+            kind = OURS
+        elif not cluster_a:
+            kind = THEIRS
+        elif ours[o1:o2] == theirs[t1:t2]:
+            kind = BOTH
+        else:
+            kind = CONFLICT
+        regions.append(MergeRegion(kind, lo, hi, o1, o2, t1, t2))
+        delta_a, delta_b = o2 - hi, t2 - hi
+        pos = hi
+
+    if pos < len(base):
+        regions.append(MergeRegion(UNCHANGED, pos, len(base), pos + delta_a, len(base) + delta_a,
+                                   pos + delta_b, len(base) + delta_b))
+    return MergeResult(base, ours, theirs, regions)
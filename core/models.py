@@ -1,15 +1,18 @@
 """Data models for the application"""
 import os
-import difflib
+
+from core.diff import unified_diff
+from core.diff_cache import cached_opcodes
 
 
 class FileChangeEntry:
     """Represents a single file change with its content and metadata"""
-    def __init__(self, file_path, old_content, new_content, source_root):
+    def __init__(self, file_path, old_content, new_content, source_root, generated_globs=()):
         self.file_path = file_path
         self.old_content = old_content
         self.new_content = new_content
         self.source_root = source_root
+        self.generated_globs = generated_globs  # The owning system's globs of generated files
         self.relative_path = os.path.relpath(file_path, source_root)
         self.is_selected = True
         
@@ -22,6 +25,7 @@ class FileChangeEntry:
         else:
             old_lines = self.old_content.splitlines(keepends=True)
             new_lines = self.new_content.splitlines(keepends=True)
-            diff = difflib.unified_diff(old_lines, new_lines, lineterm='')
+            diff = unified_diff(old_lines, new_lines, lineterm='',
+                                opcodes=cached_opcodes(old_lines, new_lines))
             return list(diff)[2:]  # Skip the file header lines
 
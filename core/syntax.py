@@ -0,0 +1,206 @@
+"""Line tokenizers for syntax highlighting and a cache of their results.
+
+Each language is one combined regex plus the constructs that can span lines
+(block comments, triple-quoted strings, template literals). tokenize_lines() walks
+the lines once, carrying the open construct from one line to the next, and returns
+per line a tuple of (start, end, kind) spans; text outside every span is drawn in
+the default color. Results are cached by language and content digest, so every view
+of the same file shares one tokenization.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from config import SYNTAX_CACHE_MAX_BYTES, SYNTAX_MAX_LINES
+from core.diff import DiffCancelled
+from core.diff_cache import lines_digest
+
+# Token kinds
+KEYWORD, STRING, COMMENT, NUMBER, VARIABLE = 'keyword', 'string', 'comment', 'number', 'variable'
+
+# Rough footprint of one span tuple, and of a line's tuple of spans
+SPAN_BYTES = 100
+LINE_BYTES = 56
+
+# Lines checked for cancellation at a time
+CANCEL_CHECK_LINES = 2000
+
+_NUMBER = r'\b(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b'
+_DQ_STRING = r'"(?:[^"\\]|\\.)*"?'
+_SQ_STRING = r"'(?:[^'\\]|\\.)*'?"
+
+
+def _words(words):
+    return r'\b(?:' + '|'.join(sorted(words.split(), key=len, reverse=True)) + r')\b'
+
+
+class Language:
+    """A tokenizer: `rules` are (kind, regex) tried in order; `blocks` map an opening
+    delimiter regex to (closing delimiter, kind) for constructs that can span lines.
+    """
+    def __init__(self, name, rules, blocks=(), ignore_case=False):
+        self.name = name
+        parts = [f'(?P<block{i}>{opener})' for i, (opener, _closer, _kind) in enumerate(blocks)]
+        parts += [f'(?P<{kind}{i}>{regex})' for i, (kind, regex) in enumerate(rules)]
+        self.pattern = re.compile('|'.join(parts), re.IGNORECASE if ignore_case else 0)
+        self.blocks = {f'block{i}': (closer, kind) for i, (_opener, closer, kind) in enumerate(blocks)}
+        self.kinds = {f'{kind}{i}': kind for i, (kind, _regex) in enumerate(rules)}
+
+    def tokenize(self, line, state):
+        """(spans, state) for one line; `state` is the (closer, kind) of a construct still open"""
+        spans = []
+        pos = 0
+        if state is not None:
+            closer, kind = state
+            end = line.find(closer)
+            if end < 0:
+                return ((0, len(line), kind),) if line.strip() else (), state
+            pos = end + len(closer)
+            spans.append((0, pos, kind))
+            state = None
+        pattern = self.pattern
+        while True:
+            match = pattern.search(line, pos)
+            if match is None:
+                break
+            group = match.lastgroup
+            start, pos = match.span()
+            if pos == start:
+                pos += 1
+                continue
+            block = self.blocks.get(group)
+            if block is None:
+                spans.append((start, pos, self.kinds[group]))
+                continue
+            closer, kind = block
+            if closer is None:
+                closer = match.group().lstrip('rRbBuUfF')  # Triple quotes close with the same quotes
+            end = line.find(closer, pos)
+            if end < 0:
+                spans.append((start, len(line.rstrip('\r\n')), kind))
+                return tuple(spans), (closer, kind)
+            pos = end + len(closer)
+            spans.append((start, pos, kind))
+        return tuple(spans), state
+
+
+PYTHON = Language('python', [
+    (COMMENT, r'#.*'),
+    (STRING, r'\b[rRbBuUfF]{1,2}' + _DQ_STRING + '|' + r'\b[rRbBuUfF]{1,2}' + _SQ_STRING),
+    (STRING, _DQ_STRING + '|' + _SQ_STRING),
+    (KEYWORD, _words("False None True and as assert async await break class continue def del elif else "
+                     "except finally for from global if import in is lambda nonlocal not or pass raise "
+                     "return try while with yield self match case")),
+    (NUMBER, _NUMBER),
+], blocks=[(r'\b[rRbBuUfF]{0,2}(?:"""|\'\'\')|(?:"""|\'\'\')', None, STRING)])
+
+JAVASCRIPT = Language('javascript', [
+    (COMMENT, r'//.*'),
+    (STRING, _DQ_STRING + '|' + _SQ_STRING),
+    (KEYWORD, _words("async await break case catch class const continue debugger default delete do else "
+                     "export extends false finally for function if import in instanceof let new null of "
+                     "return static super switch this throw true try typeof undefined var void while "
+                     "with yield")),
+    (NUMBER, _NUMBER),
+], blocks=[(r'/\*', '*/', COMMENT), (r'`', '`', STRING)])
+
+PHP = Language('php', [
+    (COMMENT, r'(?://|#(?!\[)).*?(?=\?>|$)'),
+    (STRING, _DQ_STRING + '|' + _SQ_STRING),
+    (VARIABLE, r'\$[A-Za-z_]\w*'),
+    (KEYWORD, _words("abstract and array as break callable case catch class clone const continue declare "
+                     "default do echo else elseif empty enddeclare endfor endforeach endif endswitch "
+                     "endwhile enum extends false final finally fn for foreach function global goto if "
+                     "implements include include_once instanceof insteadof interface isset list match "
+                     "namespace new null or print private protected public readonly require "
+                     "require_once return static switch throw trait true try unset use var while xor "
+                     "yield")),
+    (NUMBER, _NUMBER),
+], blocks=[(r'/\*', '*/', COMMENT)])
+
+SQL = Language('sql', [
+    (COMMENT, r'--.*'),
+    (STRING, r"'(?:[^']|'')*'?"),
+    (KEYWORD, _words("add all alter and as asc begin between by case check column commit constraint create "
+                     "cross database default delete desc distinct drop else end exists foreign from full "
+                     "group having if in index inner insert into is join key left like limit not null on "
+                     "or order outer primary procedure references replace right rollback select set "
+                     "table then transaction trigger truncate union unique update values view when where "
+                     "with")),
+    (NUMBER, _NUMBER),
+], blocks=[(r'/\*', '*/', COMMENT)], ignore_case=True)
+
+# File extension -> language
+LANGUAGES = {
+    '.py': PYTHON, '.pyw': PYTHON,
+    '.js': JAVASCRIPT, '.mjs': JAVASCRIPT, '.cjs': JAVASCRIPT, '.jsx': JAVASCRIPT,
+    '.ts': JAVASCRIPT, '.tsx': JAVASCRIPT,
+    '.php': PHP, '.phtml': PHP, '.inc': PHP,
+    '.sql': SQL,
+}
+
+
+def language_for(path):
+    """Language of a file by its extension, or None when it is not highlighted"""
+    if not path:
+        return None
+    return LANGUAGES.get(os.path.splitext(path)[1].lower())
+
+
+def tokenize_lines(lines, language, cancel=None):
+    """Spans of every line, one tuple per line"""
+    tokenize = language.tokenize
+    result = []
+    state = None
+    for index, line in enumerate(lines):
+        if index % CANCEL_CHECK_LINES == 0 and cancel is not None and cancel.is_set():
+            raise DiffCancelled()
+        spans, state = tokenize(line, state)
+        result.append(spans)
+    return result
+
+
+class TokenCache:
+    """Size-bounded LRU of tokenize_lines() results keyed by (language, content digest)"""
+    def __init__(self, max_bytes=SYNTAX_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (tokens, size)
+        self._lock = threading.Lock()
+        self.memory_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def tokens(self, lines, language, cancel=None):
+        """Spans of every line, tokenized at most once per content; None for files too long to highlight"""
+        if len(lines) > SYNTAX_MAX_LINES:
+            return None
+        key = (language.name, lines_digest(lines))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+        tokens = tokenize_lines(lines, language, cancel)
+        size = len(tokens) * LINE_BYTES + sum(map(len, tokens)) * SPAN_BYTES
+        if size > self.max_bytes:
+            return tokens
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.memory_bytes -= previous[1]
+            self._entries[key] = (tokens, size)
+            self.memory_bytes += size
+            while self.memory_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.memory_bytes -= evicted_size
+        return tokens
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.memory_bytes = 0
+
+
+token_cache = TokenCache()
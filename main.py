@@ -11,13 +11,16 @@ This file provides a template for the main application.
 """
 
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 
 # Import from refactored modules
 from config import API_URL, DEBUG
 from core.models import FileChangeEntry
+from core.diff_cache import diff_cache
 from services.file_watcher import WatcherThread
 from services.telegram_service import TelegramService
+from services.stall_detector import StallDetector
 from ui.dialogs.log_dialog import LogDialog
 from ui.dialogs.settings_dialog import SettingsDialog
 from ui.dialogs.change_review_dialog import ChangeReviewDialog
@@ -37,7 +40,16 @@ except ImportError:
     sys.exit(1)
 
 if __name__ == "__main__":
+    # Patch exports diff in worker processes, which a frozen build has to be able to start
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
+    # Start before the main window so blocking work in its constructor is attributed too
+    stall_detector = StallDetector()
+    stall_detector.start()
+    app.aboutToQuit.connect(stall_detector.stop)
+    if DEBUG:
+        app.aboutToQuit.connect(lambda: print(diff_cache.report()))
+
     main_window = FileWatcherApp()
     main_window.show()
     sys.exit(app.exec())
@@ -1,6 +1,14 @@
 """Services module containing business logic"""
 from .file_watcher import WatcherThread, FileEventHandler
 from .telegram_service import TelegramService
+from .stall_detector import StallDetector
+from .progress_reporter import ProgressReporter
+from .change_bus import ChangeBus, change_bus
+from .diff_service import DiffService, DiffTask, DiffResult, diff_service
+from .highlight_service import HighlightService, highlight_service
+from .patch_export import PatchEntry, PatchExportThread, export_patch
 
-__all__ = ['WatcherThread', 'FileEventHandler', 'TelegramService']
+__all__ = ['WatcherThread', 'FileEventHandler', 'TelegramService', 'StallDetector', 'ProgressReporter',
+           'ChangeBus', 'change_bus', 'DiffService', 'DiffTask', 'DiffResult', 'diff_service',
+           'HighlightService', 'highlight_service', 'PatchEntry', 'PatchExportThread', 'export_patch']
 
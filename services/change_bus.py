@@ -0,0 +1,78 @@
+"""Per-path change notifications from the watchers, for dialogs that auto-refresh"""
+import os
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+
+def path_key(path):
+    """One spelling per file, whatever separators or case the caller used"""
+    return os.path.normcase(os.path.abspath(path)).replace("\\", "/")
+
+
+class ChangeBus(QObject):
+    """Hands the changes FileEventHandler detects to whoever shows that file.
+
+    A watcher registers its handler as a source while it runs and publishes the new
+    digest of every file whose content changed (None when it was deleted), in the
+    source's compare_mode. Delivery
+    happens on the GUI thread and only to the subscribers of that path, so any number
+    of open dialogs share the watcher's single recursive watch and its digest instead
+    of adding an OS watch and reading the file each.
+    """
+    _published = pyqtSignal(str, object)  # Path key, digest; queued from the watchdog thread
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._sources = []
+        self._subscribers = {}  # Path key -> callbacks taking (path, digest)
+        self._lock = threading.Lock()
+        self._published.connect(self._deliver)
+
+    def add_source(self, handler):
+        """Start counting on `handler` (has watches(path)) to publish its files' changes"""
+        with self._lock:
+            self._sources.append(handler)
+
+    def remove_source(self, handler):
+        with self._lock:
+            if handler in self._sources:
+                self._sources.remove(handler)
+
+    def covers(self, path):
+        """True when a running watcher publishes changes of `path`"""
+        return self.compare_mode(path) is not None
+
+    def compare_mode(self, path):
+        """Compare mode of the digests published for `path`, or None when no watcher covers it"""
+        with self._lock:
+            sources = list(self._sources)
+        for source in sources:
+            if source.watches(path):
+                return source.compare_mode
+        return None
+
+    def publish(self, path, digest):
+        """A file's content changed; callable from any thread"""
+        key = path_key(path)
+        if key in self._subscribers:
+            self._published.emit(key, digest)
+
+    def subscribe(self, path, callback):
+        self._subscribers.setdefault(path_key(path), []).append(callback)
+
+    def unsubscribe(self, path, callback):
+        key = path_key(path)
+        callbacks = self._subscribers.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._subscribers.pop(key, None)
+
+    @pyqtSlot(str, object)
+    def _deliver(self, key, digest):
+        for callback in list(self._subscribers.get(key, ())):
+            callback(key, digest)
+
+
+# Shared by every watcher and dialog
+change_bus = ChangeBus()
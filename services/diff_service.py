@@ -0,0 +1,229 @@
+"""Background diff computation for the review dialogs"""
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from config import DIFF_WORKERS
+from core.byte_compare import GENERATED, TEXT, byte_mode, classify_content, classify_file, compare_streams, open_source
+from core.diff import DiffCancelled
+from core.diff_cache import cached_opcodes
+from core.encoding import file_encoding, read_text
+from core.generated import classify_pair
+from core.hunk_apply import encode_like, read_head
+from core.incremental_diff import line_hashes, rediff_window
+from core.merge3 import merge3
+
+
+class DiffResult:
+    """Both contents, their line snapshots and the opcodes between them.
+
+    `new_hashes` are the new side's line hashes for a later load_and_rediff(). For an
+    incremental result `reused` is (kept_before, kept_after) as returned by
+    rediff_window(); it is None when everything was diffed from scratch. For a
+    three-way merge `merge` is the MergeResult and the opcodes cover only its conflicts.
+    """
+    def __init__(self, old_content, new_content, old_lines, new_lines, opcodes, new_hashes, reused=None,
+                 merge=None):
+        self.old_content = old_content
+        self.new_content = new_content
+        self.old_lines = old_lines
+        self.new_lines = new_lines
+        self.opcodes = opcodes
+        self.new_hashes = new_hashes
+        self.reused = reused
+        self.merge = merge
+
+
+def classify_sides(old_content, new_content, old_path=None, new_path=None):
+    """BINARY or OVERSIZE when the pair must be compared byte-wise, None for a text diff"""
+    old_kind = classify_file(old_path) if old_path is not None else classify_content(old_content)
+    new_kind = classify_file(new_path) if new_path is not None else classify_content(new_content)
+    return byte_mode(old_kind, new_kind)
+
+
+def compare_bytes(old_content, new_content, old_path=None, new_path=None, reason=None, cancel=None,
+                  digests=False):
+    """Streaming byte comparison of the two sides; the result is a ByteComparison"""
+    with open_source(old_content, old_path) as old_stream, open_source(new_content, new_path) as new_stream:
+        return compare_streams(old_stream, new_stream, reason, cancel=cancel, digests=digests)
+
+
+def _encoded_like(content, path):
+    """Decoded text as the file at `path` stores it (codec, line ending, BOM); other content as it is"""
+    if isinstance(content, str) and path is not None and os.path.exists(path):
+        return encode_like(content, read_head(path), file_encoding(path))
+    return content
+
+
+def summarize_generated(old_content, new_content, old_path=None, new_path=None, detail=None, cancel=None,
+                        like_path=None):
+    """Size and digest summary (a ByteComparison) of a generated pair that is not diffed.
+
+    A side given as decoded text (a watcher baseline, read with universal newlines) is
+    encoded the way `like_path`, by default the other side's file, stores text, so an
+    unchanged file is not reported as changed.
+    """
+    if old_path is None:
+        old_content = _encoded_like(old_content, like_path or new_path)
+    if new_path is None:
+        new_content = _encoded_like(new_content, like_path or old_path)
+    comparison = compare_bytes(old_content, new_content, old_path, new_path, GENERATED, cancel, digests=True)
+    comparison.detail = detail
+    return comparison
+
+
+def load_and_diff(old_content, new_content, old_path=None, new_path=None, cancel=None, generated_globs=None):
+    """Diff two contents, reading a side from disk when its path is given.
+
+    Binary and oversized pairs are never decoded: the result is then a
+    ByteComparison instead of a DiffResult. With `generated_globs` (a system's globs,
+    possibly empty) a minified or generated pair is only summarized the same way,
+    with digests.
+    """
+    reason = classify_sides(old_content, new_content, old_path, new_path)
+    if reason is not None:
+        return compare_bytes(old_content, new_content, old_path, new_path, reason, cancel)
+    if generated_globs is not None:
+        detail = classify_pair(old_content, new_content, old_path, new_path, generated_globs)
+        if detail is not None:
+            return summarize_generated(old_content, new_content, old_path, new_path, detail, cancel)
+    if old_path is not None:
+        old_content = read_text(old_path)
+    if new_path is not None:
+        new_content = read_text(new_path)
+    old_content = old_content or ""
+    new_content = new_content or ""
+    if cancel is not None and cancel.is_set():
+        raise DiffCancelled()
+
+    old_lines = old_content.splitlines(keepends=True)
+    new_lines = new_content.splitlines(keepends=True)
+    opcodes = cached_opcodes(old_lines, new_lines, cancel)
+    return DiffResult(old_content, new_content, old_lines, new_lines, opcodes, line_hashes(new_lines))
+
+
+def load_and_rediff(previous, new_path, cancel=None):
+    """Re-read `new_path` and update the DiffResult `previous` by re-diffing only the edited window"""
+    if classify_file(new_path) != TEXT:
+        return load_and_diff(previous.old_content, None, new_path=new_path, cancel=cancel)
+    new_content = read_text(new_path)
+    new_lines = new_content.splitlines(keepends=True)
+    new_hashes = line_hashes(new_lines)
+    opcodes, kept_before, kept_after = rediff_window(
+        previous.old_lines, previous.opcodes, previous.new_hashes, new_lines, new_hashes, cancel)
+    return DiffResult(previous.old_content, new_content, previous.old_lines, new_lines, opcodes,
+                      new_hashes, reused=(kept_before, kept_after))
+
+
+def load_and_merge(base_content, ours_path, theirs_path, cancel=None):
+    """Three-way merge of two files against their common baseline.
+
+    The result is a DiffResult of ours against theirs holding only the conflicts,
+    with `merge` set. When either file is unchanged since the baseline (or there is
+    no text baseline) there is nothing to merge and this is load_and_diff() of the
+    two files.
+    """
+    if not isinstance(base_content, str) or classify_sides(None, None, ours_path, theirs_path) is not None:
+        return load_and_diff(None, None, ours_path, theirs_path, cancel)
+    ours_content = read_text(ours_path)
+    theirs_content = read_text(theirs_path)
+    if base_content in (ours_content, theirs_content):
+        return load_and_diff(ours_content, theirs_content, cancel=cancel)
+    merge = merge3(base_content.splitlines(keepends=True), ours_content.splitlines(keepends=True),
+                   theirs_content.splitlines(keepends=True), cancel)
+    old_lines, new_lines, opcodes = merge.review_sides()
+    return DiffResult(''.join(old_lines), ''.join(new_lines), old_lines, new_lines, opcodes,
+                      line_hashes(new_lines), merge=merge)
+
+
+class DiffTask(QObject):
+    """Handle for one background job.
+
+    `finished(result)` and `failed(message)` are delivered on the thread that created
+    the task, and never after cancel(): the worker only hands the future over, and
+    the owner's thread decides whether it is still wanted.
+    """
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    _done = pyqtSignal(object)  # Carries the future from the worker to the owner's thread
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._done.connect(self._deliver)
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Stop the job at its next cancel check; no signal is emitted afterwards"""
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def _on_future_done(self, future):
+        try:
+            self._done.emit(future)
+        except RuntimeError:
+            pass  # The owner was destroyed before the job finished
+
+    @pyqtSlot(object)
+    def _deliver(self, future):
+        if self.cancelled or future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            self.finished.emit(future.result())
+        elif not isinstance(error, DiffCancelled):
+            self.failed.emit(str(error))
+
+
+class DiffService:
+    """Runs diff jobs on a small thread pool and returns DiffTask handles.
+
+    Jobs are plain functions taking a `cancel` keyword (a threading.Event), so the
+    same code runs synchronously in scripts and benchmarks.
+    """
+    def __init__(self, max_workers=DIFF_WORKERS, thread_name_prefix="diff-worker"):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, parent=None):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix=self.thread_name_prefix)
+        task = DiffTask(parent)
+        task.future = self._executor.submit(fn, *args, cancel=task.cancel_event)
+        task.future.add_done_callback(task._on_future_done)
+        return task
+
+    def diff(self, old_content, new_content, old_path=None, new_path=None, parent=None, generated_globs=None):
+        """Background load_and_diff(); the task's result is a DiffResult or a ByteComparison"""
+        job = functools.partial(load_and_diff, generated_globs=generated_globs)
+        return self.submit(job, old_content, new_content, old_path, new_path, parent=parent)
+
+    def rediff(self, previous, new_path, parent=None):
+        """Background load_and_rediff(); the task's result is a DiffResult with `reused` set"""
+        return self.submit(load_and_rediff, previous, new_path, parent=parent)
+
+    def merge(self, base_content, ours_path, theirs_path, parent=None):
+        """Background load_and_merge(); the task's result is a DiffResult or a ByteComparison"""
+        return self.submit(load_and_merge, base_content, ours_path, theirs_path, parent=parent)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Shared by every dialog
+diff_service = DiffService()
@@ -1,12 +1,14 @@
 """File watching services"""
 import os
-import hashlib
 import threading
 from PyQt6.QtCore import QThread, pyqtSignal, QCoreApplication, QObject
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import FileSystemEventHandler, FileModifiedEvent
 
+from core.byte_compare import read_baseline
+from core.compare_modes import EXACT, digest_cache
 from core.events import FileUpdateEvent, FileCreateEvent, FileDeleteEvent
+from services.change_bus import change_bus, path_key
 from config import DEBUG
 
 
@@ -15,7 +17,7 @@ class WatcherThread(QThread):
     stopped_watching = pyqtSignal()
     preload_complete = pyqtSignal()  # Signal to notify when preload is complete
 
-    def __init__(self, table_index, table, path, excluded_folders, excluded_files, dialog):
+    def __init__(self, table_index, table, path, excluded_folders, excluded_files, dialog, compare_mode=EXACT):
         super().__init__()
         self.table = table
         self.path = path
@@ -23,13 +25,15 @@ class WatcherThread(QThread):
         self.excluded_files = excluded_files
         self.dialog = dialog
         self.table_index = table_index
+        self.compare_mode = compare_mode
 
         self.observer = Observer()
         self._running = False
 
     def run(self):
         self._running = True
-        self.event_handler = FileEventHandler(self.table, self.path, self.excluded_folders, self.excluded_files, self.dialog)
+        self.event_handler = FileEventHandler(self.table, self.path, self.excluded_folders, self.excluded_files, self.dialog,
+                                              self.compare_mode)
         self.observer.schedule(self.event_handler, self.path, recursive=True)
         self.observer.start()
 
@@ -41,12 +45,15 @@ class WatcherThread(QThread):
         # Emit started_watching signal after preload is done
         self.started_watching.emit()
 
+        # Open review dialogs follow this watcher's changes instead of watching files themselves
+        change_bus.add_source(self.event_handler)
         try:
             while self._running:
                 self.msleep(300)  # Prevent blocking GUI
         except Exception as e:
             print(f"Exception in WatcherThread: {e}")
         finally:
+            change_bus.remove_source(self.event_handler)
             self.stop_observer()  # Ensure observer is properly stopped
             self.stopped_watching.emit()
 
@@ -65,12 +72,13 @@ class WatcherThread(QThread):
 
 
 class FileEventHandler(FileSystemEventHandler, QObject):
-    def __init__(self, table, watch_path, excluded_folders, excluded_files, dialog):
+    def __init__(self, table, watch_path, excluded_folders, excluded_files, dialog, compare_mode=EXACT):
         super().__init__()
         self.table = table
         self.watch_path = watch_path
         self.excluded_folders = excluded_folders
         self.excluded_files = excluded_files
+        self.compare_mode = compare_mode  # A save that only changes what the mode ignores is not a change
         self.file_hashes = {}  # Dictionary to store last known file hashes
         self.load_file_hash = True
         self.preload_complete = False  # Flag to ignore events until baseline is captured
@@ -79,16 +87,18 @@ class FileEventHandler(FileSystemEventHandler, QObject):
     def stopp_reload_file_hashes(self):
         self.load_file_hash = False
         
-    def calculate_file_hash(self, file_path, keep_hash=True):
-        """Calculate and cache the file hash based solely on its content."""
+    def calculate_file_hash(self, file_path, keep_hash=True, changed=False):
+        """Calculate and cache the file hash based solely on its content.
+
+        `changed` is set for change events: the cached digest may predate the change
+        when the size stayed the same within the mtime resolution.
+        """
         forward_slash_path = file_path.replace("\\", "/")
         try:
-            hasher = hashlib.md5()
-            with open(file_path, "rb") as f:
-                while chunk := f.read(8192):  # Read in chunks for efficiency
-                    hasher.update(chunk)
-
-            file_hash = hasher.hexdigest()
+            # Every mode's digest is cached, so a mode switch or a scan does not read the file again
+            if changed:
+                digest_cache.forget(file_path)
+            file_hash = digest_cache.digest(file_path, self.compare_mode)
             if keep_hash:
                 self.file_hashes[forward_slash_path] = file_hash
             return file_hash
@@ -114,17 +124,19 @@ class FileEventHandler(FileSystemEventHandler, QObject):
                     
                     # Capture file content as "old" baseline when scanning starts
                     try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            self.table.file_contents[file_path] = content
-                            from config import DEBUG
-                            if DEBUG:
-                                print(f"Captured baseline content for: {file_path}")
+                        self.table.file_contents[file_path] = read_baseline(file_path)
+                        from config import DEBUG
+                        if DEBUG:
+                            print(f"Captured baseline content for: {file_path}")
                     except Exception as e:
                         print(f"Error capturing baseline content for {file_path}: {e}")
                         self.table.file_contents[file_path] = None
                         
-                self.dialog.add_log_signal.emit(file_path)
+                try:
+                    file_size = os.path.getsize(file_path)
+                except OSError:
+                    file_size = 0
+                self.dialog.add_file_log_signal.emit(file_path, file_size)
 
         for root, dirs, files in os.walk(self.watch_path):
             if not self.load_file_hash:
@@ -167,7 +179,7 @@ class FileEventHandler(FileSystemEventHandler, QObject):
             return
         
         # Calculate the new hash for the file
-        new_hash = self.calculate_file_hash(file_path, False)
+        new_hash = self.calculate_file_hash(file_path, False, changed=True)
         forward_slash_path = file_path.replace("\\", "/")
         if DEBUG:
             print(f"new_hash={forward_slash_path} {new_hash}")
@@ -186,6 +198,12 @@ class FileEventHandler(FileSystemEventHandler, QObject):
 
                     self.file_hashes[forward_slash_path] = new_hash
                     QCoreApplication.postEvent(self.table, FileUpdateEvent(self.table, file_path))
+                    change_bus.publish(file_path, new_hash)
+
+    def on_moved(self, event):
+        """A temp file renamed over a watched one (an atomic save) modifies the target"""
+        if not event.is_directory:
+            self.on_modified(FileModifiedEvent(event.dest_path))
 
     def on_created(self, event):
         if self._is_excluded(event.src_path):
@@ -193,7 +211,7 @@ class FileEventHandler(FileSystemEventHandler, QObject):
             return
 
         file_path = event.src_path
-        file_hash = self.calculate_file_hash(file_path)
+        file_hash = self.calculate_file_hash(file_path, changed=True)
         
         if file_hash:
             forward_slash_path = file_path.replace("\\", "/")
@@ -201,6 +219,8 @@ class FileEventHandler(FileSystemEventHandler, QObject):
             # Create and post event
             event_obj = FileCreateEvent(self.table, file_path)
             QCoreApplication.postEvent(self.table, event_obj)
+            # Editors that save by replacing the file show up as a create
+            change_bus.publish(file_path, file_hash)
 
     def on_deleted(self, event):
         if self._is_excluded(event.src_path):
@@ -215,6 +235,11 @@ class FileEventHandler(FileSystemEventHandler, QObject):
                 print(f"File deleted: {forward_slash_path}")
                 # Handle the deletion event as needed
                 QCoreApplication.postEvent(self.table, FileDeleteEvent(self.table, file_path))
+                change_bus.publish(file_path, None)
+
+    def watches(self, path):
+        """True when changes of `path` are reported by this handler (see ChangeBus)"""
+        return path_key(path).startswith(path_key(self.watch_path).rstrip("/") + "/") and not self._is_excluded(path)
 
     def _is_excluded(self, path):
         excluded_paths = [os.path.join(self.watch_path, folder) for folder in self.excluded_folders]
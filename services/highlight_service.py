@@ -0,0 +1,22 @@
+"""Background tokenization for syntax highlighting in the diff views"""
+from config import HIGHLIGHT_WORKERS
+from core.syntax import token_cache
+from services.diff_service import DiffService
+
+
+def load_tokens(lines, language, cancel=None):
+    """Spans of every line through the shared token cache (runs on the highlight worker)"""
+    return token_cache.tokens(lines, language, cancel)
+
+
+class HighlightService(DiffService):
+    """Tokenizes files on their own worker, so highlighting never queues behind a diff"""
+    def __init__(self, max_workers=HIGHLIGHT_WORKERS):
+        super().__init__(max_workers, thread_name_prefix="highlight-worker")
+
+    def tokens(self, lines, language, parent=None):
+        """Background load_tokens(); the task's result is one tuple of spans per line, or None"""
+        return self.submit(load_tokens, lines, language, parent=parent)
+
+
+highlight_service = HighlightService()
@@ -0,0 +1,160 @@
+"""Patch bundles of many files: diffed in parallel processes, streamed to one file on disk"""
+import os
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from config import PATCH_EXPORT_WORKERS, PATCH_EXPORT_MAX_PENDING
+from core.byte_compare import byte_mode, classify_content, classify_file, compare_streams, open_source
+from core.diff import DiffCancelled, get_opcodes, unified_diff
+from core.encoding import UTF8, file_encoding, is_ascii_compatible
+from core.hunk_apply import atomic_writer
+from services.diff_service import read_text
+from services.progress_reporter import ProgressReporter
+
+NO_NEWLINE = "\\ No newline at end of file\n"
+
+
+class PatchEntry:
+    """One file of a patch. `name` is its path inside the patch; a side is read from its
+    path when one is given, else taken from its content. A side that is None or whose
+    file does not exist is /dev/null.
+    """
+    def __init__(self, name, old_path=None, new_path=None, old_content=None, new_content=None):
+        self.name = name.replace("\\", "/")
+        self.old_path = old_path
+        self.new_path = new_path
+        self.old_content = old_content
+        self.new_content = new_content
+
+
+def _side(content, path):
+    """(exists, kind) for one side of an entry"""
+    if path is not None:
+        return os.path.exists(path), classify_file(path)
+    return content is not None, classify_content(content)
+
+
+def _patch_encoding(entry):
+    """Codec a file's diff is written in: the file's own, like git, unless it is UTF-16/32"""
+    for path in (entry.new_path, entry.old_path):
+        if path is not None and os.path.exists(path):
+            codec = file_encoding(path)
+            return codec if is_ascii_compatible(codec) else UTF8
+    return UTF8
+
+
+def diff_entry(entry):
+    """(name, encoded patch or None when unchanged, bytes compared) for one entry; runs in a worker process"""
+    old_exists, old_kind = _side(entry.old_content, entry.old_path)
+    new_exists, new_kind = _side(entry.new_content, entry.new_path)
+    old_label = f"a/{entry.name}" if old_exists else "/dev/null"
+    new_label = f"b/{entry.name}" if new_exists else "/dev/null"
+
+    if byte_mode(old_kind, new_kind) is not None:
+        with open_source(entry.old_content, entry.old_path) as old_stream, \
+                open_source(entry.new_content, entry.new_path) as new_stream:
+            comparison = compare_streams(old_stream, new_stream)
+        if comparison.identical and old_exists == new_exists:
+            return entry.name, None, comparison.old_size + comparison.new_size
+        return (entry.name, f"Binary files {old_label} and {new_label} differ\n".encode(UTF8),
+                comparison.old_size + comparison.new_size)
+
+    old_text = read_text(entry.old_path) if entry.old_path is not None else entry.old_content or ""
+    new_text = read_text(entry.new_path) if entry.new_path is not None else entry.new_content or ""
+    nbytes = len(old_text) + len(new_text)
+    if old_text == new_text and old_exists == new_exists:
+        return entry.name, None, nbytes
+    old_lines = old_text.splitlines(keepends=True)
+    new_lines = new_text.splitlines(keepends=True)
+    parts = []
+    for line in unified_diff(old_lines, new_lines, old_label, new_label, opcodes=get_opcodes(old_lines, new_lines)):
+        parts.append(line if line.endswith("\n") else line + "\n" + NO_NEWLINE)
+    if not parts:
+        # Created or deleted empty file: headers only
+        parts.append(f"--- {old_label}\n+++ {new_label}\n")
+    return entry.name, "".join(parts).encode(_patch_encoding(entry), "replace"), nbytes
+
+
+def export_patch(entries, out_path, reporter=None, cancel=None, workers=PATCH_EXPORT_WORKERS,
+                 max_pending=PATCH_EXPORT_MAX_PENDING):
+    """Diff `entries` (PatchEntry) in a process pool and write them, in order, to `out_path`.
+
+    A path ending in .zip gets one <name>.diff member per changed file, anything else
+    a single unified diff. Only the diffs in flight are held in memory, and the file
+    only replaces `out_path` once complete. Returns {'files', 'changed', 'bytes', 'seconds'}.
+    """
+    entries = list(entries)
+    started = time.monotonic()
+    stats = {'files': 0, 'changed': 0, 'bytes': 0, 'seconds': 0.0}
+    if reporter is not None:
+        reporter.set_total(len(entries))
+    as_zip = out_path.lower().endswith(".zip")
+    pool = ProcessPoolExecutor(max_workers=max(1, min(workers, len(entries))))
+    try:
+        with atomic_writer(out_path) as out:
+            archive = zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) if as_zip else None
+            pending = deque()
+            remaining = iter(entries)
+            for entry in remaining:
+                pending.append(pool.submit(diff_entry, entry))
+                if len(pending) >= max_pending:
+                    break
+            while pending:
+                if cancel is not None and cancel.is_set():
+                    raise DiffCancelled()
+                name, data, nbytes = pending.popleft().result()
+                entry = next(remaining, None)
+                if entry is not None:
+                    pending.append(pool.submit(diff_entry, entry))
+                if data is not None:
+                    if archive is not None:
+                        archive.writestr(f"{name}.diff", data)
+                    else:
+                        out.write(data)
+                    stats['changed'] += 1
+                stats['files'] += 1
+                stats['bytes'] += nbytes
+                if reporter is not None:
+                    reporter.update(nbytes=nbytes, current=name)
+            if archive is not None:
+                archive.close()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    stats['seconds'] = time.monotonic() - started
+    if reporter is not None:
+        reporter.finish()
+    return stats
+
+
+class PatchExportThread(QThread):
+    """Runs export_patch() off the GUI thread, reporting files/s and ETA through `progress`"""
+    progress = pyqtSignal(int, str)       # Percent, message
+    export_finished = pyqtSignal(object)  # Stats dict from export_patch()
+    export_failed = pyqtSignal(str)
+
+    def __init__(self, entries, out_path, parent=None):
+        super().__init__(parent)
+        self.entries = entries
+        self.out_path = out_path
+        self._cancel = threading.Event()
+
+    def stop(self):
+        self._cancel.set()
+
+    def run(self):
+        reporter = ProgressReporter(self.progress.emit, stats_key="patch_export", label="Exporting")
+        try:
+            stats = export_patch(self.entries, self.out_path, reporter, self._cancel)
+        except DiffCancelled:
+            self.export_failed.emit("Export cancelled")
+            return
+        except Exception as e:
+            print(f"Patch export failed: {e}")
+            self.export_failed.emit(str(e))
+            return
+        self.export_finished.emit(stats)
@@ -0,0 +1,115 @@
+"""Throttled progress reporting for long-running scans"""
+import json
+import time
+from PyQt6.QtCore import QSettings
+
+from config import PROGRESS_MAX_UPDATES_PER_SEC
+
+# How many seconds of the previous scan's speed are blended into early estimates
+PRIOR_WEIGHT_SECONDS = 2.0
+
+
+def load_scan_stats(key):
+    """Return {'files', 'bytes', 'seconds'} recorded for the previous scan with this key"""
+    settings = QSettings("KgObservedApp", "KgObservedAppStorage")
+    try:
+        stats = json.loads(settings.value("scan_stats", "") or "{}")
+    except (TypeError, ValueError):
+        return None
+    return stats.get(key)
+
+
+def save_scan_stats(key, files, nbytes, seconds):
+    settings = QSettings("KgObservedApp", "KgObservedAppStorage")
+    try:
+        stats = json.loads(settings.value("scan_stats", "") or "{}")
+    except (TypeError, ValueError):
+        stats = {}
+    stats[key] = {'files': files, 'bytes': nbytes, 'seconds': seconds}
+    settings.setValue("scan_stats", json.dumps(stats))
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressReporter:
+    """Aggregates per-file progress and calls `emit(percent, message)` a bounded number of times per second.
+
+    Counts and byte totals are accumulated on every update, but the message is only
+    built when an emit is due. Throughput and ETA are smoothed with the speed of the
+    previous scan stored under `stats_key`, so the first estimates are not wild.
+    """
+    def __init__(self, emit, stats_key=None, max_per_sec=PROGRESS_MAX_UPDATES_PER_SEC, label="Scanning"):
+        self._emit = emit
+        self.stats_key = stats_key
+        self.label = label
+        self.min_interval = 1.0 / max_per_sec if max_per_sec > 0 else 0
+        self.total = 0
+        self.processed = 0
+        self.nbytes = 0
+        self.current = ""
+        self.started = time.monotonic()
+        self._last_emit = 0.0
+
+        self.prior_files = 0.0
+        self.prior_bytes = 0.0
+        previous = load_scan_stats(stats_key) if stats_key else None
+        if previous and previous.get('seconds'):
+            scale = PRIOR_WEIGHT_SECONDS / previous['seconds']
+            self.prior_files = previous.get('files', 0) * scale
+            self.prior_bytes = previous.get('bytes', 0) * scale
+
+    def set_total(self, total):
+        self.total = total
+        self.started = time.monotonic()
+
+    def update(self, files=1, nbytes=0, current=None):
+        self.processed += files
+        self.nbytes += nbytes
+        if current is not None:
+            self.current = current
+
+        now = time.monotonic()
+        if now - self._last_emit >= self.min_interval:
+            self._last_emit = now
+            self._emit(self.percent(), self.message(now))
+
+    def percent(self):
+        if self.total <= 0:
+            return 0
+        return min(100, int(self.processed * 100 / self.total))
+
+    def rates(self, now=None):
+        """Smoothed (files/s, bytes/s), seeded with the previous scan's speed"""
+        elapsed = (now or time.monotonic()) - self.started
+        weight = PRIOR_WEIGHT_SECONDS if self.prior_files else 0.0
+        denominator = elapsed + weight
+        if denominator <= 0:
+            return 0.0, 0.0
+        return ((self.processed + self.prior_files) / denominator,
+                (self.nbytes + self.prior_bytes) / denominator)
+
+    def eta(self, now=None):
+        files_per_sec, _ = self.rates(now)
+        if files_per_sec <= 0 or self.total <= 0:
+            return None
+        return max(0, self.total - self.processed) / files_per_sec
+
+    def message(self, now=None):
+        files_per_sec, bytes_per_sec = self.rates(now)
+        return (f"{self.label}: {self.current} | {self.processed:,}/{self.total:,} files | "
+                f"{files_per_sec:,.0f} files/s, {bytes_per_sec / (1024 * 1024):,.1f} MB/s | "
+                f"ETA {format_eta(self.eta(now))}")
+
+    def finish(self, save_stats=True):
+        """Emit the final state and remember this scan's speed for the next ETA"""
+        elapsed = time.monotonic() - self.started
+        self._emit(self.percent(), self.message())
+        if save_stats and self.stats_key and self.processed and elapsed > 0:
+            save_scan_stats(self.stats_key, self.processed, self.nbytes, elapsed)
@@ -0,0 +1,145 @@
+"""GUI-thread stall detection with stack attribution"""
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+from PyQt6.QtCore import QObject, QTimer
+
+from config import DEBUG, STALL_THRESHOLD_MS, STALL_REPORT_TOP
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StallDetector(QObject):
+    """Watchdog that detects event-loop stalls and records where the GUI thread was stuck.
+
+    A heartbeat timer ticks on the GUI thread. A monitor thread checks how long ago
+    the last tick happened; once that exceeds the threshold it samples the GUI
+    thread's stack through sys._current_frames() until the loop recovers. Each stall
+    is attributed to the innermost project frame seen most often during the stall.
+    """
+    def __init__(self, threshold_ms=STALL_THRESHOLD_MS, heartbeat_ms=50, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000.0
+        self.poll_interval = heartbeat_ms / 1000.0
+        self.gui_ident = threading.get_ident()  # Must be created on the GUI thread
+
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setInterval(heartbeat_ms)
+        self.heartbeat.timeout.connect(self._beat)
+
+        self._last_beat = time.monotonic()
+        self._running = False
+        self._monitor = None
+        self._lock = threading.Lock()
+
+        # Current stall being sampled
+        self._stall_started = None
+        self._samples = Counter()
+        self._sample_stacks = {}
+
+        # key -> {'count', 'total_ms', 'max_ms', 'stack'}
+        self.offenders = {}
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._last_beat = time.monotonic()
+        self.heartbeat.start()
+        self._monitor = threading.Thread(target=self._monitor_loop, name="StallDetector", daemon=True)
+        self._monitor.start()
+
+    def stop(self, log_report=True):
+        if not self._running:
+            return
+        self._running = False
+        self.heartbeat.stop()
+        if self._monitor:
+            self._monitor.join(timeout=1)
+            self._monitor = None
+        if log_report and self.offenders:
+            print(self.report())
+
+    def _beat(self):
+        self._last_beat = time.monotonic()
+
+    def _monitor_loop(self):
+        while self._running:
+            time.sleep(self.poll_interval)
+            last_beat = self._last_beat
+            lag = time.monotonic() - last_beat
+
+            if lag >= self.threshold:
+                if self._stall_started is None:
+                    self._stall_started = last_beat
+                    self._samples = Counter()
+                    self._sample_stacks = {}
+                self._sample_gui_stack()
+            elif self._stall_started is not None:
+                self._finish_stall(last_beat)
+
+    def _sample_gui_stack(self):
+        frame = sys._current_frames().get(self.gui_ident)
+        if frame is None:
+            return
+        stack = traceback.extract_stack(frame)
+        del frame
+        key = self._attribute(stack)
+        self._samples[key] += 1
+        if key not in self._sample_stacks:
+            self._sample_stacks[key] = ''.join(traceback.format_list(stack[-8:]))
+
+    def _attribute(self, stack):
+        """Pick the innermost frame that belongs to this project, else the innermost frame"""
+        for entry in reversed(stack):
+            filename = os.path.abspath(entry.filename)
+            if filename.startswith(PROJECT_ROOT) and filename != os.path.abspath(__file__):
+                rel = os.path.relpath(filename, PROJECT_ROOT).replace("\\", "/")
+                return f"{rel}:{entry.lineno} {entry.name}"
+        if stack:
+            entry = stack[-1]
+            return f"{os.path.basename(entry.filename)}:{entry.lineno} {entry.name}"
+        return "<unknown>"
+
+    def _finish_stall(self, resumed_at):
+        duration_ms = (resumed_at - self._stall_started) * 1000
+        self._stall_started = None
+        if not self._samples:
+            return
+
+        key, _ = self._samples.most_common(1)[0]
+        with self._lock:
+            entry = self.offenders.setdefault(key, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'stack': ''})
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            if duration_ms > entry['max_ms']:
+                entry['max_ms'] = duration_ms
+                entry['stack'] = self._sample_stacks.get(key, '')
+
+        print(f"[stall] GUI thread blocked {duration_ms:.0f} ms in {key}")
+        if DEBUG:
+            print(self._sample_stacks.get(key, ''))
+
+    def ranked_offenders(self, top=STALL_REPORT_TOP):
+        """Offenders sorted by total blocked time, worst first"""
+        with self._lock:
+            items = sorted(self.offenders.items(), key=lambda kv: kv[1]['total_ms'], reverse=True)
+        return items[:top]
+
+    def report(self, top=STALL_REPORT_TOP):
+        """Human readable ranked report of the worst GUI-thread stalls"""
+        lines = [f"{'='*60}", f"GUI stall report (threshold {self.threshold * 1000:.0f} ms)", f"{'='*60}"]
+        for rank, (key, entry) in enumerate(self.ranked_offenders(top), 1):
+            lines.append(
+                f"{rank:>2}. {key}\n"
+                f"    stalls: {entry['count']}  total: {entry['total_ms']:.0f} ms  "
+                f"max: {entry['max_ms']:.0f} ms  avg: {entry['total_ms'] / entry['count']:.0f} ms"
+            )
+            if entry['stack']:
+                lines.append("    worst stack:\n" + "".join(f"      {l}\n" for l in entry['stack'].splitlines()).rstrip())
+        lines.append(f"{'='*60}")
+        return "\n".join(lines)
@@ -3,6 +3,7 @@ from .log_dialog import LogDialog
 from .file_diff_dialog import FileDiffDialog
 from .git_compare_dialog import GitSourceCompareDialog
 from .change_review_dialog import ChangeReviewDialog
+from .patch_export_dialog import PatchExportDialog
 from .settings_dialog import SettingsDialog
 
 __all__ = [
@@ -10,6 +11,7 @@ __all__ = [
     'FileDiffDialog', 
     'GitSourceCompareDialog',
     'ChangeReviewDialog',
+    'PatchExportDialog',
     'SettingsDialog'
 ]
 
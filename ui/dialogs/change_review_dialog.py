@@ -1,12 +1,18 @@
 """Change review dialog for file modifications"""
 import os
-from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit,
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                             QTableWidget, QTableWidgetItem, QPushButton, QCheckBox, QWidget)
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QHeaderView
-from PyQt6.QtGui import QFont
 
+from core.byte_compare import GENERATED, ByteComparison
+from core.generated import classify_pair
+from core.syntax import language_for
+from services.diff_service import diff_service, load_and_diff, summarize_generated
+from services.patch_export import PatchEntry
 from ui.styles import COLORS, FONTS, SPACING, STYLES
+from ui.dialogs.patch_export_dialog import PatchExportDialog
+from ui.widgets.diff_view import DiffView, unified_rows
 
 
 class ChangeReviewDialog(QDialog):
@@ -23,6 +29,8 @@ class ChangeReviewDialog(QDialog):
                           Qt.WindowType.WindowCloseButtonHint)
         self.setSizeGripEnabled(True)
         self.changes = changes  # List of FileChangeEntry objects
+        self._diff_task = None
+        self.full_diff_rows = set()  # Generated files diffed on request
         
         layout = QVBoxLayout(self)
         layout.setSpacing(int(SPACING['md'].replace('px', '')))
@@ -42,6 +50,7 @@ class ChangeReviewDialog(QDialog):
         self.file_list.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
         self.file_list.setMaximumHeight(250)  # Set max height to force scrolling for many files
         self.file_list.currentItemChanged.connect(self.on_file_selected)
+        self.file_list.cellDoubleClicked.connect(self.show_full_diff)
         
         # Populate file list
         self.checkboxes = []
@@ -79,10 +88,10 @@ class ChangeReviewDialog(QDialog):
         self.current_file_label.setStyleSheet(STYLES['label_subheading'])
         layout.addWidget(self.current_file_label)
         
-        self.diff_viewer = QTextEdit()
-        self.diff_viewer.setReadOnly(True)
-        self.diff_viewer.setFont(QFont("Consolas", 10))
-        self.diff_viewer.setStyleSheet(STYLES['text_edit_code'])
+        # Virtualized: only the rows in view are painted, however large the file
+        self.diff_viewer = DiffView()
+        self.diff_viewer.setStyleSheet(f"border: 1px solid {COLORS['border']}; border-radius: 4px;")
+        self.diff_viewer.set_message("💡 Select a file from the list above to view changes")
         layout.addWidget(self.diff_viewer)
         
         # Buttons
@@ -99,6 +108,12 @@ class ChangeReviewDialog(QDialog):
         self.deselect_all_btn.clicked.connect(self.deselect_all)
         btn_layout.addWidget(self.deselect_all_btn)
         
+        self.export_btn = QPushButton("📦 Export Patch")
+        self.export_btn.setStyleSheet(STYLES['button_secondary'])
+        self.export_btn.setToolTip("Save the selected changes as one unified diff or zip")
+        self.export_btn.clicked.connect(self.export_patch)
+        btn_layout.addWidget(self.export_btn)
+        
         btn_layout.addStretch()
         
         self.apply_btn = QPushButton("✓ Apply Selected Changes")
@@ -133,56 +148,62 @@ class ChangeReviewDialog(QDialog):
         filename = os.path.basename(change.file_path)
         self.current_file_label.setText(f"📄 Currently viewing: {filename}")
         
-        diff_lines = change.get_diff_lines()
-        
-        # Format diff with IDE-style colors and line numbers
-        formatted_diff = []
-        line_num = 0
-        for line in diff_lines:
-            # Escape HTML but preserve structure
-            escaped = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            
-            if line.startswith('+'):
-                # Added line - green background
-                line_num += 1
-                formatted_diff.append(
-                    f'<div style="background-color: #1a4b1a; padding: 2px 0;">'
-                    f'<span style="color: #858585; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                    f'<span style="color: #89d185;">{escaped}</span>'
-                    f'</div>'
-                )
-            elif line.startswith('-'):
-                # Removed line - red background
-                line_num += 1
-                formatted_diff.append(
-                    f'<div style="background-color: #4b1818; padding: 2px 0;">'
-                    f'<span style="color: #858585; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                    f'<span style="color: #f48771;">{escaped}</span>'
-                    f'</div>'
-                )
-            elif line.startswith('@@'):
-                # Diff header - blue
-                formatted_diff.append(
-                    f'<div style="background-color: #1a1a4b; padding: 2px 0;">'
-                    f'<span style="color: #858585; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">...</span>'
-                    f'<span style="color: #569cd6; font-weight: bold;">{escaped}</span>'
-                    f'</div>'
-                )
-            else:
-                # Context line - normal
-                line_num += 1
-                formatted_diff.append(
-                    f'<div style="background-color: transparent; padding: 2px 0;">'
-                    f'<span style="color: #858585; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                    f'<span style="color: #d4d4d4;">{escaped}</span>'
-                    f'</div>'
-                )
-        
-        self.diff_viewer.setHtml(
-            '<div style="margin: 0; font-family: Consolas, monospace; font-size: 10pt; line-height: 1.6;">' + 
-            ''.join(formatted_diff) + 
-            '</div>'
-        )
+        # Diff and row layout run on the worker; a newer selection supersedes this one
+        self._cancel_diff()
+        self.diff_viewer.set_message("⏳ Computing differences...")
+        self._diff_task = diff_service.submit(self._build_rows, change, row in self.full_diff_rows, parent=self)
+        self._diff_task.finished.connect(self._show_rows)
+        self._diff_task.failed.connect(self._show_diff_error)
+    
+    def show_full_diff(self, row, column=None):
+        """Diff a generated or minified file after all"""
+        if row in self.full_diff_rows:
+            return
+        self.full_diff_rows.add(row)
+        self.on_file_selected(self.file_list.item(row, 1), None)
+    
+    def _build_rows(self, change, full_diff=False, cancel=None):
+        """Unified diff rows for one change (runs on the diff worker)"""
+        if not full_diff:
+            detail = classify_pair(change.old_content, change.new_content, name=change.file_path,
+                                   globs=change.generated_globs)
+            if detail is not None:
+                return summarize_generated(change.old_content, change.new_content, detail=detail, cancel=cancel,
+                                           like_path=change.file_path)
+        result = load_and_diff(change.old_content, change.new_content, cancel=cancel)
+        if isinstance(result, ByteComparison):
+            return result
+        return unified_rows(result.old_lines, result.new_lines, result.opcodes,
+                            language=language_for(change.file_path))
+    
+    def _show_rows(self, rows):
+        self._diff_task = None
+        if isinstance(rows, ByteComparison):
+            message = rows.report()
+            if rows.reason == GENERATED:
+                message += "\n\nDouble-click the file to show its full diff."
+            self.diff_viewer.set_message(message)
+            return
+        self.diff_viewer.set_rows(rows)
+    
+    def _show_diff_error(self, message):
+        self._diff_task = None
+        self.diff_viewer.set_message(f"Could not compare file: {message}")
+    
+    def _cancel_diff(self):
+        if self._diff_task is not None:
+            self._diff_task.cancel()
+            self._diff_task = None
+    
+    def done(self, result):
+        self._cancel_diff()
+        super().done(result)
+    
+    def export_patch(self):
+        """Export the selected changes (baseline -> current) as a patch bundle"""
+        entries = [PatchEntry(change.relative_path, old_content=change.old_content, new_content=change.new_content)
+                   for change in self.changes if change.is_selected]
+        PatchExportDialog.export(self, entries, "changes")
     
     def select_all(self):
         for i, checkbox in enumerate(self.checkboxes):
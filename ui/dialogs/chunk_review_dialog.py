@@ -1,26 +1,50 @@
 """Chunk-by-chunk file review dialog"""
 import os
-import difflib
-from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit,
-                            QPushButton, QWidget, QScrollArea, QGroupBox, QMessageBox)
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox
 from PyQt6.QtCore import Qt, QTimer, QFileSystemWatcher
-from PyQt6.QtGui import QCursor, QFont
+from PyQt6.QtGui import QFont
 
-from ui.styles import COLORS, FONTS, SPACING, STYLES
+from core.byte_compare import GENERATED, ByteComparison
+from core.compare_modes import digest_cache
+from core.hunk_apply import ApplyError, apply_hunks, write_text_like
+from services.change_bus import change_bus
+from services.diff_service import diff_service
+from ui.models.chunk_list_model import ChunkListModel
+from ui.styles import SPACING, get_role_stylesheet, set_style_property
+from ui.widgets.chunk_list_view import ChunkListView
+
+INFO_TEXT = ("💡 Review each change individually. Click ◄ (or press ←) to keep new code, "
+             "► (or →) to revert to old code. Shift/Ctrl-click to decide several at once.")
 
 
 class ChangeChunk:
-    """Represents a single change chunk"""
-    def __init__(self, old_lines, new_lines, start_line):
+    """A single change chunk: old lines [old_start, old_end) become new lines [new_start, new_end)"""
+    def __init__(self, old_start, old_end, new_start, new_end, old_lines, new_lines):
+        self.old_start = old_start
+        self.old_end = old_end
+        self.new_start = new_start
+        self.new_end = new_end
         self.old_lines = old_lines
         self.new_lines = new_lines
-        self.start_line = start_line
+        self.start_line = new_start
         self.decision = None  # None=pending, 'new'=accept new, 'old'=keep old
         
 
 class ChunkReviewDialog(QDialog):
-    """Dialog to review file changes chunk by chunk with individual accept/reject"""
-    def __init__(self, file_path, old_content, new_content, parent=None):
+    """Dialog to review file changes chunk by chunk with individual accept/reject.
+
+    The diff runs on the background diff service, so the window opens immediately
+    with a placeholder. Chunks are rows of a ChunkListModel painted by a delegate, so
+    only the chunks in view cost anything, and ←/→ decide the selected chunks. Pass `old_path`/`new_path` to have a side read from disk on
+    the worker too instead of passing its content. With `base_content`, the common
+    baseline of both paths, the two files are merged three-way and only the
+    conflicts are reviewed; the merge is written to `file_path`. With `generated_globs`
+    (the system's globs, possibly empty) a minified or generated file is summarized by
+    size and digest until the full diff is asked for. With `close_if_identical` the
+    dialog says so and closes when the first diff finds no differences.
+    """
+    def __init__(self, file_path, old_content, new_content, parent=None, old_path=None, new_path=None,
+                 base_content=None, generated_globs=None, close_if_identical=False):
         super().__init__(parent)
         self.setWindowTitle(f"Review Changes - {os.path.basename(file_path)}")
         self.setWindowFlags(Qt.WindowType.Window | 
@@ -28,25 +52,25 @@ class ChunkReviewDialog(QDialog):
                           Qt.WindowType.WindowMaximizeButtonHint | 
                           Qt.WindowType.WindowCloseButtonHint)
         self.setSizeGripEnabled(True)
-        
-        self.file_path = file_path
-        self.old_content = old_content or ""
-        self.new_content = new_content or ""
-        self.chunks = []
-        self.chunk_widgets = []
-        self.last_modified_time = 0
-        
-        # Parse changes into chunks
-        self._parse_chunks()
+        # One stylesheet for the whole dialog; widgets below only carry role/variant properties
+        self.setStyleSheet(get_role_stylesheet())
+        
+        self.file_path = None
+        self.chunk_model = ChunkListModel(self)
+        self.diff_result = None
+        self.byte_comparison = None
+        self._diff_task = None
+        self._watched_path = None
+        self._watch_mode = None  # Compare mode of the digests the change bus publishes for the file
+        self._shown_digest = None  # Digest (in _watch_mode) of the file version on screen
+        self._published_digest = None  # Newer digest published since the last refresh
+        self.file_watcher = None  # Fallback for files no watcher covers, created by _watch
+        self.close_if_identical = close_if_identical
         
         # Set size based on number of chunks (more compact for small changes)
         self.setMinimumWidth(1200)
         self._update_dialog_size()
         
-        # Setup file watcher for auto-refresh
-        self.file_watcher = QFileSystemWatcher([file_path])
-        self.file_watcher.fileChanged.connect(self._on_file_changed)
-        
         # Timer to debounce rapid file changes
         self.refresh_timer = QTimer()
         self.refresh_timer.setSingleShot(True)
@@ -59,22 +83,30 @@ class ChunkReviewDialog(QDialog):
         
         # Header with auto-refresh indicator
         header_layout = QHBoxLayout()
-        self.header = QLabel(f"📄 {os.path.basename(file_path)} - {len(self.chunks)} change(s) found")
-        self.header.setStyleSheet(STYLES['label_heading'])
+        self.header = QLabel()
+        self.header.setProperty('variant', 'heading')
         header_layout.addWidget(self.header)
         
         header_layout.addStretch()
         
+        # Generated files are summarized until their diff is asked for
+        self.full_diff_btn = QPushButton("Show Full Diff")
+        self.full_diff_btn.setProperty('variant', 'secondary')
+        self.full_diff_btn.setToolTip("Diff this generated or minified file line by line (can be slow)")
+        self.full_diff_btn.clicked.connect(self.show_full_diff)
+        self.full_diff_btn.hide()
+        header_layout.addWidget(self.full_diff_btn)
+        
         # Auto-refresh indicator
         self.auto_refresh_label = QLabel("🔄 Auto-refresh ON")
-        self.auto_refresh_label.setStyleSheet(f"color: {COLORS['accent_green']}; {FONTS['small']} padding: 4px 8px; background-color: {COLORS['bg_tertiary']}; border-radius: 4px;")
+        self.auto_refresh_label.setProperty('role', 'refreshBadge')
         self.auto_refresh_label.setToolTip("Dialog will automatically update when file changes")
         header_layout.addWidget(self.auto_refresh_label)
         
         header_layout.addSpacing(int(SPACING['sm'].replace('px', '')))
         
         refresh_btn = QPushButton("🔄")
-        refresh_btn.setStyleSheet(STYLES['button_icon'])
+        refresh_btn.setProperty('variant', 'icon')
         refresh_btn.setFixedSize(32, 32)
         refresh_btn.setToolTip("Manual refresh")
         refresh_btn.clicked.connect(self.refresh_changes)
@@ -82,53 +114,203 @@ class ChunkReviewDialog(QDialog):
         
         self.main_layout.addLayout(header_layout)
         
-        self.info_label = QLabel("💡 Review each change individually. Click ◄ to keep new code, ► to revert to old code.")
-        self.info_label.setStyleSheet(STYLES['label_info'])
+        self.info_label = QLabel(INFO_TEXT)
+        self.info_label.setProperty('variant', 'info')
         self.main_layout.addWidget(self.info_label)
         
-        # Scrollable area for chunks
-        self.scroll = QScrollArea()
-        self.scroll.setWidgetResizable(True)
-        self.scroll.setStyleSheet("QScrollArea { border: none; }")
-        
-        self.chunks_widget = QWidget()
-        self.chunks_layout = QVBoxLayout(self.chunks_widget)
-        self.chunks_layout.setSpacing(15)
-        self.chunks_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        
-        # Create UI for each chunk
-        self._rebuild_chunks()
-        
-        self.scroll.setWidget(self.chunks_widget)
-        self.main_layout.addWidget(self.scroll)
+        # Shown until the first diff arrives, and when there is nothing to review
+        self.placeholder = QLabel("⏳ Computing changes...")
+        self.placeholder.setProperty('variant', 'subheading')
+        self.placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.main_layout.addWidget(self.placeholder, 1)
+        
+        # Hex preview around the first difference of a byte comparison
+        self.byte_view = QLabel()
+        self.byte_view.setFont(QFont("Consolas", 10))
+        self.byte_view.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        self.byte_view.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
+        self.byte_view.hide()
+        self.main_layout.addWidget(self.byte_view, 1)
+        
+        # Virtualized chunk list
+        self.chunk_list = ChunkListView()
+        self.chunk_list.setProperty('role', 'chunkList')
+        self.chunk_list.setModel(self.chunk_model)
+        self.chunk_list.decisions_requested.connect(self._set_decisions)
+        self.chunk_list.hide()
+        self.main_layout.addWidget(self.chunk_list, 1)
         
         # Bottom buttons
         button_layout = QHBoxLayout()
         button_layout.setSpacing(int(SPACING['sm'].replace('px', '')))
         
         self.accept_all_btn = QPushButton("✅ Accept All New")
-        self.accept_all_btn.setStyleSheet(STYLES['button_success'])
+        self.accept_all_btn.setProperty('variant', 'success')
         self.accept_all_btn.clicked.connect(self.accept_all_new)
         button_layout.addWidget(self.accept_all_btn)
         
         self.reject_all_btn = QPushButton("❌ Revert All to Old")
-        self.reject_all_btn.setStyleSheet(STYLES['button_danger'])
+        self.reject_all_btn.setProperty('variant', 'danger')
         self.reject_all_btn.clicked.connect(self.reject_all_new)
         button_layout.addWidget(self.reject_all_btn)
         
         button_layout.addStretch()
         
         self.apply_btn = QPushButton("✓ Apply Selected Changes")
-        self.apply_btn.setStyleSheet(STYLES['button_primary'])
+        self.apply_btn.setProperty('variant', 'primary')
         self.apply_btn.clicked.connect(self.apply_changes)
         button_layout.addWidget(self.apply_btn)
         
         self.cancel_btn = QPushButton("Cancel")
-        self.cancel_btn.setStyleSheet(STYLES['button_secondary'])
+        self.cancel_btn.setProperty('variant', 'secondary')
         self.cancel_btn.clicked.connect(self.reject)
         button_layout.addWidget(self.cancel_btn)
         
         self.main_layout.addLayout(button_layout)
+        
+        self.load_file(file_path, old_content, new_content, old_path, new_path, base_content,
+                       generated_globs=generated_globs)
+    
+    def load_file(self, file_path, old_content, new_content, old_path=None, new_path=None, base_content=None,
+                  result=None, task=None, modified_time=0, generated_globs=None):
+        """Review another file in this dialog, keeping its widgets.
+        
+        A finished `result` (a prefetched diff) is shown at once and a running `task`
+        is waited for; otherwise the diff is started. `modified_time` is the mtime the
+        result was computed at, so auto-refresh can tell whether it is still current.
+        """
+        self._cancel_diff()
+        self._watch(file_path)
+        self.file_path = file_path
+        self.old_path = old_path
+        self.new_path = new_path
+        self.base_content = base_content
+        self.generated_globs = generated_globs
+        self.full_diff_requested = False
+        self.old_content = old_content or ""
+        self.new_content = new_content or ""
+        self.old_lines = []  # Line snapshots the chunks were parsed from
+        self.new_lines = []
+        self.diff_result = None  # Last DiffResult; auto-refresh re-diffs incrementally from it
+        self.byte_comparison = None  # Set instead of chunks for binary or oversized files
+        self.last_modified_time = modified_time
+        self._shown_digest = self._current_digest()
+        self._published_digest = None
+        self.chunk_model.set_chunks([])
+        self.byte_view.hide()
+        self.full_diff_btn.hide()
+        
+        self.setWindowTitle(f"Review Changes - {os.path.basename(file_path)}")
+        self.header.setText(f"📄 {os.path.basename(file_path)} - computing changes...")
+        self.info_label.setText(INFO_TEXT)
+        if result is not None:
+            self._show_result(result)
+            return
+        if task is None:
+            if base_content is not None:
+                task = diff_service.merge(base_content, old_path, new_path, parent=self)
+            else:
+                task = diff_service.diff(self.old_content, self.new_content, old_path, new_path, parent=self,
+                                         generated_globs=self._generated_check())
+        self._start_diff(task, self._on_initial_diff)
+    
+    @property
+    def chunks(self):
+        return self.chunk_model.chunks
+    
+    @property
+    def computing(self):
+        """True while a diff for this dialog is running in the background"""
+        return self._diff_task is not None
+    
+    def _start_diff(self, task, on_ready, on_failed=None):
+        """Track a background diff task, replacing any diff still running"""
+        self._cancel_diff()
+        self._set_busy(True)
+        task.finished.connect(on_ready)
+        task.failed.connect(on_failed or self._on_diff_failed)
+        self._diff_task = task
+    
+    def _cancel_diff(self):
+        if self._diff_task is not None:
+            self._diff_task.cancel()
+            self._diff_task = None
+    
+    def _set_busy(self, busy):
+        # Nothing can be decided or applied for a byte comparison
+        for button in (self.accept_all_btn, self.reject_all_btn, self.apply_btn):
+            button.setEnabled(not busy and self.byte_comparison is None)
+        if busy and not self.chunks:
+            self.placeholder.setText("⏳ Computing changes...")
+            self.placeholder.show()
+            self.chunk_list.hide()
+    
+    def _show_result(self, result):
+        """Replace the chunks with a finished diff"""
+        self._diff_task = None
+        if isinstance(result, ByteComparison):
+            self._show_byte_comparison(result)
+            return
+        self.byte_comparison = None
+        self.byte_view.hide()
+        self.full_diff_btn.hide()
+        self._parse_chunks(result)
+        if result.merge is not None:
+            self.header.setText(f"📄 {os.path.basename(self.file_path)} - {len(self.chunks)} conflict(s) found")
+            self.info_label.setText(f"🔀 Merged {result.merge.auto_merged} non-conflicting change(s) from both sides. "
+                                    "For each conflict, ◀ = take Git | ▶ = keep Source.")
+        else:
+            self.header.setText(f"📄 {os.path.basename(self.file_path)} - {len(self.chunks)} change(s) found")
+        self._rebuild_chunks()
+        self._update_dialog_size()
+        self._set_busy(False)
+    
+    def _show_byte_comparison(self, comparison):
+        """Show a binary or oversized file's byte comparison instead of chunks"""
+        self.byte_comparison = comparison
+        self.diff_result = None
+        self.chunk_model.set_chunks([])
+        self.chunk_list.hide()
+        self.header.setText(f"📄 {os.path.basename(self.file_path)} - "
+                            f"{'identical' if comparison.identical else 'differs'} (byte comparison)")
+        self.placeholder.setText(comparison.describe())
+        self.placeholder.show()
+        # The summary is in the placeholder; the monospaced view holds the hex preview
+        preview = comparison.hex_preview()
+        self.byte_view.setText(preview)
+        self.byte_view.setVisible(bool(preview))
+        self.full_diff_btn.setVisible(comparison.reason == GENERATED)
+        self._set_busy(False)
+    
+    def _on_initial_diff(self, result):
+        self._show_result(result)
+        if self.close_if_identical and self._identical():
+            QMessageBox.information(self, "No Differences", "Files are identical.")
+            self.reject()
+    
+    def _identical(self):
+        """True when the shown diff leaves nothing to review or apply"""
+        if self.byte_comparison is not None:
+            return self.byte_comparison.identical
+        return not self.chunks and self.diff_result is not None and self.diff_result.merge is None
+    
+    def _generated_check(self):
+        """Globs for load_and_diff(), or None once the full diff was asked for"""
+        return None if self.full_diff_requested else self.generated_globs
+    
+    def show_full_diff(self):
+        """Diff a generated or minified file that was only summarized"""
+        self.full_diff_requested = True
+        self.full_diff_btn.hide()
+        self.byte_comparison = None
+        self.byte_view.hide()
+        task = diff_service.diff(self.old_content, self.new_content, self.old_path, self.new_path, parent=self)
+        self._start_diff(task, self._on_initial_diff)
+    
+    def _on_diff_failed(self, message):
+        self._diff_task = None
+        self._set_busy(False)
+        QMessageBox.warning(self, "Diff Failed", f"Could not compute changes: {message}")
     
     def _update_dialog_size(self):
         """Update dialog size based on number of chunks"""
@@ -143,26 +325,72 @@ class ChunkReviewDialog(QDialog):
             self.resize(1200, 750)
     
     def _rebuild_chunks(self):
-        """Rebuild chunk widgets from current chunks list"""
-        # Clear existing widgets
-        for widget in self.chunk_widgets:
-            widget.deleteLater()
-        self.chunk_widgets.clear()
-        
-        # Remove stretch if it exists
-        if self.chunks_layout.count() > 0:
-            item = self.chunks_layout.takeAt(self.chunks_layout.count() - 1)
-            if item and item.spacerItem():
-                del item
-        
-        # Create new chunk widgets
-        for i, chunk in enumerate(self.chunks):
-            chunk_widget = self._create_chunk_widget(chunk, i + 1)
-            self.chunks_layout.addWidget(chunk_widget, alignment=Qt.AlignmentFlag.AlignTop)
-            self.chunk_widgets.append(chunk_widget)
-        
-        # Add stretch to push chunks to the top
-        self.chunks_layout.addStretch()
+        """Show the current chunks list in the chunk view"""
+        self.chunk_list.scrollToTop()
+        self._update_placeholder()
+    
+    def _update_placeholder(self):
+        if self.byte_comparison is not None:
+            return
+        if self.chunks:
+            self.placeholder.hide()
+            self.chunk_list.show()
+        elif self.diff_result is not None and self.diff_result.merge is not None:
+            self.placeholder.setText(f"✅ No conflicts. {self.diff_result.merge.auto_merged} change(s) merged "
+                                     "automatically - apply to save the merge.")
+            self.placeholder.show()
+            self.chunk_list.hide()
+        else:
+            self.placeholder.setText("✅ No differences. Nothing to apply.")
+            self.placeholder.show()
+            self.chunk_list.hide()
+    
+    def _watch(self, path):
+        """Auto-refresh on changes of `path`: published by a running watcher when one covers
+        it, else reported by a QFileSystemWatcher of this dialog"""
+        self._unwatch()
+        self._watch_mode = change_bus.compare_mode(path)
+        if self._watch_mode is not None:
+            change_bus.subscribe(path, self._on_file_published)
+        elif os.path.exists(path):
+            if self.file_watcher is None:
+                self.file_watcher = QFileSystemWatcher(self)
+                self.file_watcher.fileChanged.connect(self._on_file_changed)
+            self.file_watcher.addPath(path)
+        self._watched_path = path
+    
+    def _unwatch(self):
+        if self._watched_path is None:
+            return
+        change_bus.unsubscribe(self._watched_path, self._on_file_published)
+        if self.file_watcher is not None and self._watched_path in self.file_watcher.files():
+            self.file_watcher.removePath(self._watched_path)
+        self._watched_path = None
+        self._watch_mode = None
+    
+    def _current_digest(self, changed=False):
+        """Digest of the file on disk as the watcher computes it, or None when no watcher covers it.
+        
+        The watcher hashes through the same digest_cache, so this is normally a stat.
+        `changed` drops a cached digest that may predate a write of this dialog.
+        """
+        if self._watch_mode is None:
+            return None
+        try:
+            if changed:
+                digest_cache.forget(self.file_path)
+            return digest_cache.digest(self.file_path, self._watch_mode)
+        except OSError:
+            return None
+    
+    def _on_file_published(self, path, digest):
+        """The watcher hashed a new version of the file"""
+        if digest is None:
+            return  # Deleted; a file saved by replacing it is published again when it reappears
+        if digest == self._shown_digest:
+            return  # The version on screen, e.g. this dialog's own write
+        self._published_digest = digest
+        self.refresh_timer.start()
     
     def _on_file_changed(self, path):
         """Handle file change event from file watcher"""
@@ -177,319 +405,153 @@ class ChunkReviewDialog(QDialog):
         """Auto-refresh after file changes (debounced)"""
         try:
             # Check if file was actually modified
-            import os.path
             current_mtime = os.path.getmtime(self.file_path)
-            if current_mtime == self.last_modified_time:
+            # A new digest from the watcher is a change even within the mtime resolution
+            if current_mtime == self.last_modified_time and self._published_digest is None:
                 return  # No actual change
             
             self.last_modified_time = current_mtime
-            
-            # Read current file content
-            with open(self.file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                new_content = f.read()
-            
-            # Only update if content actually changed
-            if new_content == self.new_content:
-                return
-            
-            self.new_content = new_content
-            
-            # Store current chunk count
-            old_chunk_count = len(self.chunks)
-            
-            # Re-parse chunks
-            self.chunks = []
-            self._parse_chunks()
-            
-            # Update header
-            self.header.setText(f"📄 {os.path.basename(self.file_path)} - {len(self.chunks)} change(s) found")
-            
-            # Update info label with auto-refresh notification
-            if len(self.chunks) != old_chunk_count:
-                self.info_label.setText(f"✨ Auto-updated! Found {len(self.chunks)} change(s). Review each change individually.")
-                # Briefly highlight the auto-refresh label
-                self.auto_refresh_label.setStyleSheet(f"color: white; {FONTS['small']} padding: 4px 8px; background-color: {COLORS['accent_green']}; border-radius: 4px; font-weight: bold;")
-                QTimer.singleShot(1000, lambda: self.auto_refresh_label.setStyleSheet(f"color: {COLORS['accent_green']}; {FONTS['small']} padding: 4px 8px; background-color: {COLORS['bg_tertiary']}; border-radius: 4px;"))
-            
-            # Rebuild chunk widgets
-            self._rebuild_chunks()
-            
-            # Update dialog size
-            self._update_dialog_size()
-            
-        except Exception as e:
+            if self._published_digest is not None:
+                # The worker reads this version or a newer one, which is published again
+                self._shown_digest, self._published_digest = self._published_digest, None
+            else:
+                self._shown_digest = self._current_digest()
+        except OSError as e:
             print(f"Auto-refresh error: {e}")
+            return
+        
+        # The file is read and diffed on the worker; only the edited window is re-compared
+        if self.diff_result is not None and self.base_content is None:
+            task = diff_service.rediff(self.diff_result, self.file_path, parent=self)
+        else:
+            task = self._full_diff()
+        self._start_diff(task, self._on_auto_refreshed, self._on_auto_refresh_failed)
+    
+    def _on_auto_refreshed(self, result):
+        if isinstance(result, ByteComparison) or self.byte_comparison is not None:
+            self._show_result(result)
+            return
+        
+        # Only update if content actually changed (a re-merge can change either side)
+        if result.new_content == self.new_content and result.old_content == self.old_content:
+            self._diff_task = None
+            self._set_busy(False)
+            return
+        
+        # Store current chunk count
+        old_chunk_count = len(self.chunks)
+        if result.reused is not None:
+            self._patch_chunks(result)
+        else:
+            self._show_result(result)
+        
+        # Update info label with auto-refresh notification
+        if len(self.chunks) != old_chunk_count:
+            self.info_label.setText(f"✨ Auto-updated! Found {len(self.chunks)} change(s). Review each change individually.")
+            # Briefly highlight the auto-refresh label
+            set_style_property(self.auto_refresh_label, 'active', True)
+            QTimer.singleShot(1000, lambda: set_style_property(self.auto_refresh_label, 'active', False))
+    
+    def _on_auto_refresh_failed(self, message):
+        self._diff_task = None
+        self._set_busy(False)
+        print(f"Auto-refresh error: {message}")
     
     def refresh_changes(self):
         """Manual refresh - reload file content and update display"""
         try:
-            # Read current file content
-            with open(self.file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                self.new_content = f.read()
-            
             # Update modified time
-            import os.path
             self.last_modified_time = os.path.getmtime(self.file_path)
-            
-            # Re-parse chunks
-            self.chunks = []
-            self._parse_chunks()
-            
-            # Update header
-            self.header.setText(f"📄 {os.path.basename(self.file_path)} - {len(self.chunks)} change(s) found")
-            
-            # Update info label
-            self.info_label.setText(f"🔄 Manually refreshed! Found {len(self.chunks)} change(s). Review each change individually.")
-            
-            # Rebuild chunk widgets
-            self._rebuild_chunks()
-            
-            # Update dialog size
-            self._update_dialog_size()
-            
-        except Exception as e:
+            self._shown_digest = self._current_digest()
+        except OSError as e:
             QMessageBox.warning(
                 self,
                 "Refresh Failed",
                 f"Could not refresh changes: {e}"
             )
+            return
+        
+        self._start_diff(self._full_diff(), self._on_manual_refreshed)
+    
+    def _full_diff(self):
+        """Task re-reading the file and diffing (or merging) it from scratch"""
+        if self.base_content is not None:
+            return diff_service.merge(self.base_content, self.old_path, self.new_path, parent=self)
+        return diff_service.diff(self.old_content, None, new_path=self.file_path, parent=self,
+                                 generated_globs=self._generated_check())
+    
+    def _on_manual_refreshed(self, result):
+        self._show_result(result)
+        # Update info label
+        self.info_label.setText(f"🔄 Manually refreshed! Found {len(self.chunks)} change(s). Review each change individually.")
+    
+    def _set_diff_result(self, result):
+        self.diff_result = result
+        self.old_content = result.old_content
+        self.new_content = result.new_content
+        # apply_changes slices these exact snapshots, so it cannot drift from the chunks
+        self.old_lines = result.old_lines
+        self.new_lines = result.new_lines
+    
+    def _parse_chunks(self, result):
+        """Split a finished diff into separate change chunks"""
+        self._set_diff_result(result)
+        
+        # Every non-equal opcode is one chunk
+        self.chunk_model.set_chunks(
+            ChangeChunk(i1, i2, j1, j2, result.old_lines[i1:i2], result.new_lines[j1:j2])
+            for tag, i1, i2, j1, j2 in result.opcodes if tag != 'equal'
+        )
     
-    def _parse_chunks(self):
-        """Parse diff into separate change chunks"""
-        old_lines = self.old_content.splitlines(keepends=True)
-        new_lines = self.new_content.splitlines(keepends=True)
-        
-        # Generate diff
-        differ = difflib.Differ()
-        diff = list(differ.compare(old_lines, new_lines))
-        
-        # Group consecutive changes into chunks
-        current_chunk_old = []
-        current_chunk_new = []
-        current_start = 0
-        in_chunk = False
-        line_num = 0
-        
-        for i, line in enumerate(diff):
-            if line.startswith('  '):  # Unchanged line
-                if in_chunk:
-                    # End current chunk
-                    self.chunks.append(ChangeChunk(
-                        current_chunk_old,
-                        current_chunk_new,
-                        current_start
-                    ))
-                    current_chunk_old = []
-                    current_chunk_new = []
-                    in_chunk = False
-                line_num += 1
-            elif line.startswith('- '):  # Removed line
-                if not in_chunk:
-                    current_start = line_num
-                    in_chunk = True
-                current_chunk_old.append(line[2:])
-            elif line.startswith('+ '):  # Added line
-                if not in_chunk:
-                    current_start = line_num
-                    in_chunk = True
-                current_chunk_new.append(line[2:])
-                line_num += 1
-            elif line.startswith('? '):  # Hint line (ignore)
-                continue
-        
-        # Add last chunk if exists
-        if in_chunk:
-            self.chunks.append(ChangeChunk(
-                current_chunk_old,
-                current_chunk_new,
-                current_start
-            ))
-    
-    def _create_chunk_widget(self, chunk, chunk_num):
-        """Create UI widget for a single chunk"""
-        widget = QGroupBox(f"📝 Change #{chunk_num} (Line {chunk.start_line + 1})")
-        widget.setStyleSheet(STYLES['group_box'])
-        
-        layout = QHBoxLayout(widget)
-        layout.setSpacing(int(SPACING['md'].replace('px', '')))
-        layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        
-        # Old code
-        old_box = QWidget()
-        old_layout = QVBoxLayout(old_box)
-        old_layout.setSpacing(int(SPACING['xs'].replace('px', '')))
-        old_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        old_label = QLabel("❌ Old Code")
-        old_label.setStyleSheet(f"color: {COLORS['diff_removed_text']}; {FONTS['subheading']}")
-        old_layout.addWidget(old_label)
-        
-        old_text = QTextEdit()
-        old_text.setReadOnly(True)
-        old_text.setFont(QFont("Consolas", 10))
-        
-        # Calculate height based on number of lines (more compact)
-        old_content = ''.join(chunk.old_lines) if chunk.old_lines else "[No content]"
-        line_count = len(old_content.splitlines())
-        # Dynamic height: min 40px, max 200px, ~25px per line
-        text_height = min(max(40, line_count * 25), 200)
-        old_text.setMaximumHeight(text_height)
-        old_text.setMinimumHeight(40)
-        
-        old_text.setStyleSheet(f"""
-            QTextEdit {{
-                background-color: {COLORS['diff_removed_bg']};
-                color: {COLORS['diff_removed_text']};
-                border: 1px solid {COLORS['border']};
-                border-radius: 4px;
-                padding: {SPACING['sm']};
-            }}
-        """)
-        old_text.setPlainText(old_content)
-        old_layout.addWidget(old_text)
-        layout.addWidget(old_box)
-        
-        # Arrow buttons - align at top
-        arrows = QWidget()
-        arrows_layout = QVBoxLayout(arrows)
-        arrows_layout.setSpacing(int(SPACING['md'].replace('px', '')))
-        arrows_layout.setContentsMargins(0, 0, 0, 0)
-        arrows_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        
-        arrow_left = QPushButton("◀")
-        arrow_left.setFixedSize(40, 35)
-        arrow_left.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
-        arrow_left.setToolTip("✅ Keep New Code")
-        arrow_left.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {COLORS['accent_green']};
-                color: white;
-                font-size: 18px;
-                font-weight: bold;
-                border: 2px solid {COLORS['accent_green']};
-                border-radius: 6px;
-            }}
-            QPushButton:hover {{
-                background-color: #13a313;
-                border-color: #13a313;
-            }}
-        """)
-        arrow_left.clicked.connect(lambda: self._select_chunk(chunk, 'new', widget))
-        arrows_layout.addWidget(arrow_left)
-        
-        arrows_layout.addSpacing(int(SPACING['md'].replace('px', '')))
-        
-        arrow_right = QPushButton("▶")
-        arrow_right.setFixedSize(40, 35)
-        arrow_right.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
-        arrow_right.setToolTip("❌ Keep Old Code")
-        arrow_right.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {COLORS['accent_red']};
-                color: white;
-                font-size: 18px;
-                font-weight: bold;
-                border: 2px solid {COLORS['accent_red']};
-                border-radius: 6px;
-            }}
-            QPushButton:hover {{
-                background-color: #ff1f38;
-                border-color: #ff1f38;
-            }}
-        """)
-        arrow_right.clicked.connect(lambda: self._select_chunk(chunk, 'old', widget))
-        arrows_layout.addWidget(arrow_right)
-        
-        arrows_layout.addStretch()  # Push buttons to top
-        layout.addWidget(arrows)
-        
-        # New code
-        new_box = QWidget()
-        new_layout = QVBoxLayout(new_box)
-        new_layout.setSpacing(int(SPACING['xs'].replace('px', '')))
-        new_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        new_label = QLabel("✅ New Code")
-        new_label.setStyleSheet(f"color: {COLORS['diff_added_text']}; {FONTS['subheading']}")
-        new_layout.addWidget(new_label)
-        
-        new_text = QTextEdit()
-        new_text.setReadOnly(True)
-        new_text.setFont(QFont("Consolas", 10))
-        
-        # Calculate height based on number of lines (more compact)
-        new_content = ''.join(chunk.new_lines) if chunk.new_lines else "[Deleted]"
-        new_line_count = len(new_content.splitlines())
-        # Dynamic height: min 40px, max 200px, ~25px per line
-        new_text_height = min(max(40, new_line_count * 25), 200)
-        new_text.setMaximumHeight(new_text_height)
-        new_text.setMinimumHeight(40)
-        
-        new_text.setStyleSheet(f"""
-            QTextEdit {{
-                background-color: {COLORS['diff_added_bg']};
-                color: {COLORS['diff_added_text']};
-                border: 1px solid {COLORS['border']};
-                border-radius: 4px;
-                padding: {SPACING['sm']};
-            }}
-        """)
-        new_text.setPlainText(new_content)
-        new_layout.addWidget(new_text)
-        layout.addWidget(new_box)
-        
-        return widget
-    
-    def _select_chunk(self, chunk, decision, widget):
-        """Mark chunk with decision"""
-        chunk.decision = decision
-        
-        # Visual feedback
-        if decision == 'new':
-            widget.setStyleSheet(f"""
-                QGroupBox {{
-                    {FONTS['subheading']}
-                    border: 3px solid {COLORS['accent_green']};
-                    border-radius: 6px;
-                    margin-top: {SPACING['md']};
-                    padding-top: {SPACING['md']};
-                    background-color: {COLORS['diff_added_bg']};
-                }}
-                QGroupBox::title {{
-                    subcontrol-origin: margin;
-                    left: {SPACING['md']};
-                    padding: 0 {SPACING['sm']};
-                    color: {COLORS['accent_green']};
-                }}
-            """)
-        else:  # old
-            widget.setStyleSheet(f"""
-                QGroupBox {{
-                    {FONTS['subheading']}
-                    border: 3px solid {COLORS['accent_red']};
-                    border-radius: 6px;
-                    margin-top: {SPACING['md']};
-                    padding-top: {SPACING['md']};
-                    background-color: {COLORS['diff_removed_bg']};
-                }}
-                QGroupBox::title {{
-                    subcontrol-origin: margin;
-                    left: {SPACING['md']};
-                    padding: 0 {SPACING['sm']};
-                    color: {COLORS['accent_red']};
-                }}
-            """)
+    def _patch_chunks(self, result):
+        """Splice an incremental diff into the chunk list.
+        
+        Chunks outside the edited window keep their objects, rows and decisions;
+        the ones after it only have their new-side position shifted. A re-diffed chunk
+        identical to one it replaces inherits that chunk's decision.
+        """
+        self._diff_task = None
+        kept_before, kept_after = result.reused
+        changes = [op for op in result.opcodes if op[0] != 'equal']
+        tail_start = len(self.chunks) - kept_after
+        
+        decisions = {(tuple(c.old_lines), tuple(c.new_lines)): c.decision
+                     for c in self.chunks[kept_before:tail_start] if c.decision}
+        middle = []
+        for tag, i1, i2, j1, j2 in changes[kept_before:len(changes) - kept_after]:
+            chunk = ChangeChunk(i1, i2, j1, j2, result.old_lines[i1:i2], result.new_lines[j1:j2])
+            chunk.decision = decisions.get((tuple(chunk.old_lines), tuple(chunk.new_lines)))
+            middle.append(chunk)
+        tail = self.chunks[tail_start:]
+        for chunk, (tag, i1, i2, j1, j2) in zip(tail, changes[len(changes) - kept_after:]):
+            chunk.new_start, chunk.new_end = j1, j2
+            chunk.start_line = j1
+        
+        self._set_diff_result(result)
+        # Only the re-diffed rows are replaced; rows after them are renumbered by the model
+        self.chunk_model.replace_rows(kept_before, tail_start - kept_before, middle)
+        
+        self._update_placeholder()
+        self.header.setText(f"📄 {os.path.basename(self.file_path)} - {len(self.chunks)} change(s) found")
+        self._set_busy(False)
+    
+    def _set_decisions(self, rows, decision):
+        """Mark chunks with a decision; the list repaints only those rows"""
+        self.chunk_model.set_decisions(rows, decision)
     
     def accept_all_new(self):
         """Accept all new changes"""
-        for i, chunk in enumerate(self.chunks):
-            self._select_chunk(chunk, 'new', self.chunk_widgets[i])
+        self._set_decisions(range(len(self.chunks)), 'new')
     
     def reject_all_new(self):
         """Reject all new changes (keep old)"""
-        for i, chunk in enumerate(self.chunks):
-            self._select_chunk(chunk, 'old', self.chunk_widgets[i])
+        self._set_decisions(range(len(self.chunks)), 'old')
     
     def apply_changes(self):
         """Apply selected changes to file"""
+        if self.byte_comparison is not None:
+            return  # Binary and oversized files are never rewritten from decoded text
+        
         # Check if all chunks have decisions
         pending = [i+1 for i, c in enumerate(self.chunks) if c.decision is None]
         if pending:
@@ -500,88 +562,82 @@ class ChunkReviewDialog(QDialog):
             )
             return
         
-        # Rebuild file by merging chunks based on decisions
-        final_lines = []
-        old_lines = self.old_content.splitlines(keepends=True)
-        new_lines = self.new_content.splitlines(keepends=True)
-        
-        # Use differ to get full comparison
-        differ = difflib.Differ()
-        diff = list(differ.compare(old_lines, new_lines))
-        
-        # Track which chunk we're in
-        chunk_idx = 0
-        in_chunk = False
-        current_chunk_lines_old = []
-        current_chunk_lines_new = []
-        
-        for line in diff:
-            if line.startswith('  '):  # Unchanged line
-                # If we were in a chunk, process it
-                if in_chunk:
-                    if chunk_idx < len(self.chunks):
-                        chunk = self.chunks[chunk_idx]
-                        if chunk.decision == 'new':
-                            final_lines.extend(current_chunk_lines_new)
-                        else:  # 'old'
-                            final_lines.extend(current_chunk_lines_old)
-                        chunk_idx += 1
-                    current_chunk_lines_old = []
-                    current_chunk_lines_new = []
-                    in_chunk = False
-                
-                # Add unchanged line
-                final_lines.append(line[2:])
-                
-            elif line.startswith('- '):  # Removed line
-                in_chunk = True
-                current_chunk_lines_old.append(line[2:])
-                
-            elif line.startswith('+ '):  # Added line
-                in_chunk = True
-                current_chunk_lines_new.append(line[2:])
-                
-            elif line.startswith('? '):  # Hint line
-                continue
-        
-        # Process last chunk if exists
-        if in_chunk and chunk_idx < len(self.chunks):
-            chunk = self.chunks[chunk_idx]
-            if chunk.decision == 'new':
-                final_lines.extend(current_chunk_lines_new)
-            else:  # 'old'
-                final_lines.extend(current_chunk_lines_old)
-        
-        # Write to file
-        final_content = ''.join(final_lines)
-        
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                f.write(final_content)
-            
-            new_count = sum(1 for c in self.chunks if c.decision == 'new')
-            old_count = sum(1 for c in self.chunks if c.decision == 'old')
-            
-            QMessageBox.information(
-                self, 
-                "Success", 
-                f"File saved successfully!\n\n"
-                f"✅ Kept {new_count} new change(s)\n"
-                f"❌ Reverted {old_count} change(s) to old"
-            )
-            self.accept()
+            self._write_decisions()
+        except ApplyError as e:
+            QMessageBox.warning(self, "File Changed", str(e))
+            return
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to write file: {e}")
+            return
+        # The watcher publishes the written version too; it needs no refresh
+        self._shown_digest = self._current_digest(changed=True)
+        
+        new_count = sum(1 for c in self.chunks if c.decision == 'new')
+        old_count = sum(1 for c in self.chunks if c.decision == 'old')
+        self._on_applied(new_count, old_count)
+    
+    def _on_applied(self, new_count, old_count):
+        """The decisions were written to the file"""
+        QMessageBox.information(
+            self, 
+            "Success", 
+            f"File saved successfully!\n\n"
+            f"✅ Kept {new_count} new change(s)\n"
+            f"❌ Reverted {old_count} change(s) to old"
+        )
+        self.accept()
+    
+    def _write_decisions(self):
+        """Write the decided chunks to the file.
+        
+        When the file is one of the diffed sides, only the chunks that switch it to the
+        other side are written and the rest of the file is copied byte for byte.
+        """
+        merge = self.diff_result.merge if self.diff_result is not None else None
+        if merge is not None and self._is_file(self.old_path):
+            choices = ['theirs' if c.decision == 'new' else 'ours' for c in self.chunks]
+            apply_hunks(self.file_path, merge.ours, merge.ours_replacements(choices))
+            return
+        if self._is_file(self.new_path):
+            apply_hunks(self.file_path, self.new_lines,
+                        [(c.new_start, c.new_end, c.old_lines) for c in self.chunks if c.decision == 'old'])
+            return
+        if self._is_file(self.old_path):
+            apply_hunks(self.file_path, self.old_lines,
+                        [(c.old_start, c.old_end, c.new_lines) for c in self.chunks if c.decision == 'new'])
+            return
+        # Both sides came from memory: assemble the result from the opcode ranges captured
+        # at parse time. Text between chunks is identical on both sides.
+        final_lines = []
+        pos = 0
+        for chunk in self.chunks:
+            final_lines.extend(self.old_lines[pos:chunk.old_start])
+            final_lines.extend(chunk.new_lines if chunk.decision == 'new' else chunk.old_lines)
+            pos = chunk.old_end
+        final_lines.extend(self.old_lines[pos:])
+        write_text_like(self.file_path, ''.join(final_lines))
+    
+    def _is_file(self, path):
+        return path is not None and os.path.abspath(path) == os.path.abspath(self.file_path)
+    
+    def done(self, result):
+        # accept()/reject() do not go through closeEvent
+        self._cancel_diff()
+        self._unwatch()
+        super().done(result)
     
     def closeEvent(self, event):
         """Clean up resources when dialog closes"""
+        # Abandon a diff that is still running
+        self._cancel_diff()
+        
         # Stop timers
         if hasattr(self, 'refresh_timer'):
             self.refresh_timer.stop()
         
-        # Remove file watcher
-        if hasattr(self, 'file_watcher'):
-            self.file_watcher.removePath(self.file_path)
+        # Stop following the file
+        self._unwatch()
         
         event.accept()
 
@@ -1,15 +1,27 @@
 """File diff comparison dialog"""
 import os
-import difflib
-from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit,
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                             QGroupBox, QPushButton, QWidget)
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QCursor, QFont
+from PyQt6.QtGui import QCursor
+
+from core.byte_compare import GENERATED, ByteComparison
+from core.generated import classify_pair
+from core.hunk_apply import write_text_like
+from core.syntax import language_for
+from services.diff_service import diff_service, load_and_diff, summarize_generated
+from ui.widgets.diff_view import DiffView, side_by_side_rows, link_scrolling
 
 
 class FileDiffDialog(QDialog):
-    """Dialog to view old code vs new code comparison for a single file"""
-    def __init__(self, file_path, old_content, new_content, parent=None):
+    """Dialog to view old code vs new code comparison for a single file.
+
+    Both panes are virtualized DiffViews aligned row for row. They show a placeholder
+    until the diff and the display rows have been built on the diff worker. With
+    `generated_globs` (the system's globs, possibly empty) a generated or minified
+    file is only summarized until "Show Full Diff" is clicked.
+    """
+    def __init__(self, file_path, old_content, new_content, parent=None, generated_globs=None):
         super().__init__(parent)
         self.setWindowTitle(f"File Comparison - {os.path.basename(file_path)}")
         self.setMinimumWidth(1000)
@@ -23,6 +35,7 @@ class FileDiffDialog(QDialog):
         self.old_content = old_content
         self.new_content = new_content
         self.file_path = file_path
+        self.generated_globs = generated_globs
         
         layout = QVBoxLayout(self)
         
@@ -34,6 +47,11 @@ class FileDiffDialog(QDialog):
         path_label.setToolTip(file_path)  # Show full path on hover
         top_bar.addWidget(path_label)
         top_bar.addStretch()
+        self.full_diff_btn = QPushButton("Show Full Diff")
+        self.full_diff_btn.setToolTip("Diff this generated or minified file line by line (can be slow)")
+        self.full_diff_btn.clicked.connect(self.show_full_diff)
+        self.full_diff_btn.hide()
+        top_bar.addWidget(self.full_diff_btn)
         
         layout.addLayout(top_bar)
         
@@ -43,28 +61,13 @@ class FileDiffDialog(QDialog):
         # Old content panel
         self.old_panel = QGroupBox("Old Code")
         old_layout = QVBoxLayout()
-        self.old_text = QTextEdit()
-        self.old_text.setReadOnly(True)
-        self.old_text.setFont(QFont("Consolas", 10))  # Better IDE font
-        self.old_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                border: 1px solid #3e3e3e;
-                padding: 5px;
-            }
-        """)
-        if old_content is None:
-            self.old_text.setHtml("<span style='color: #858585; font-style: italic;'>[File did not exist]</span>")
-        else:
-            self.old_text.setHtml(self._highlight_content(old_content, new_content, is_old=True))
+        self.old_text = DiffView()
+        self.old_text.setStyleSheet("border: 1px solid #3e3e3e;")
+        self.old_text.set_message("⏳ Computing differences...")
         old_layout.addWidget(self.old_text)
         self.old_panel.setLayout(old_layout)
         comparison_layout.addWidget(self.old_panel)
         
-        # Connect scrollbars for synchronized scrolling
-        old_scrollbar = self.old_text.verticalScrollBar()
-        
         # Middle panel with arrow buttons - smaller and follow changes
         middle_panel = QWidget()
         middle_layout = QVBoxLayout(middle_panel)
@@ -95,29 +98,15 @@ class FileDiffDialog(QDialog):
         # New content panel
         self.new_panel = QGroupBox("New Code (Current)")
         new_layout = QVBoxLayout()
-        self.new_text = QTextEdit()
-        self.new_text.setReadOnly(True)
-        self.new_text.setFont(QFont("Consolas", 10))  # Better IDE font
-        self.new_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                border: 1px solid #3e3e3e;
-                padding: 5px;
-            }
-        """)
-        if new_content is None:
-            self.new_text.setHtml("<span style='color: #858585; font-style: italic;'>[File was deleted]</span>")
-        else:
-            self.new_text.setHtml(self._highlight_content(new_content, old_content, is_old=False))
+        self.new_text = DiffView()
+        self.new_text.setStyleSheet("border: 1px solid #3e3e3e;")
+        self.new_text.set_message("⏳ Computing differences...")
         new_layout.addWidget(self.new_text)
         self.new_panel.setLayout(new_layout)
         comparison_layout.addWidget(self.new_panel)
         
-        # Connect scrollbars for synchronized scrolling
-        new_scrollbar = self.new_text.verticalScrollBar()
-        old_scrollbar.valueChanged.connect(new_scrollbar.setValue)
-        new_scrollbar.valueChanged.connect(old_scrollbar.setValue)
+        # Rows are aligned, so the panes scroll in step
+        link_scrolling(self.old_text, self.new_text)
         
         layout.addLayout(comparison_layout)
         
@@ -129,83 +118,78 @@ class FileDiffDialog(QDialog):
         close_btn.clicked.connect(self.accept)
         btn_layout.addWidget(close_btn)
         layout.addLayout(btn_layout)
+        
+        self._render(self.generated_globs)
+    
+    def _render(self, generated_globs):
+        self._render_task = diff_service.submit(self._build_rows, generated_globs, parent=self)
+        self._render_task.finished.connect(self._show_panes)
+        self._render_task.failed.connect(self._show_render_error)
+    
+    def show_full_diff(self):
+        """Diff a generated or minified file that was only summarized"""
+        self.full_diff_btn.hide()
+        self.old_text.set_message("⏳ Computing differences...")
+        self.new_text.set_message("⏳ Computing differences...")
+        self._render(None)
+    
+    def _build_rows(self, generated_globs=None, cancel=None):
+        """Diff and build the aligned rows of both panes (runs on the diff worker)"""
+        if generated_globs is not None:
+            detail = classify_pair(self.old_content, self.new_content, name=self.file_path, globs=generated_globs)
+            if detail is not None:
+                return summarize_generated(self.old_content, self.new_content, detail=detail, cancel=cancel,
+                                           like_path=self.file_path)
+        result = load_and_diff(self.old_content, self.new_content, cancel=cancel)
+        if isinstance(result, ByteComparison):
+            return result
+        return side_by_side_rows(result.old_lines, result.new_lines, result.opcodes, language_for(self.file_path))
+    
+    def _show_panes(self, panes):
+        self._render_task = None
+        if isinstance(panes, ByteComparison):
+            self._show_byte_comparison(panes)
+            return
+        old_rows, new_rows = panes
+        if self.old_content is None:
+            self.old_text.set_message("[File did not exist]")
+        else:
+            self.old_text.set_rows(old_rows)
+        if self.new_content is None:
+            self.new_text.set_message("[File was deleted]")
+        else:
+            self.new_text.set_rows(new_rows)
+    
+    def _show_byte_comparison(self, comparison):
+        """Binary or oversized contents: hex previews instead of text, and no write-back"""
+        self.old_text.set_message(comparison.report('old'))
+        self.new_text.set_message(comparison.report('new'))
+        if comparison.reason == GENERATED:
+            # Still text: writing either side back whole stays possible
+            self.full_diff_btn.show()
+            return
+        for button in (self.arrow_left_btn, self.arrow_right_btn):
+            button.setEnabled(False)
+            button.setToolTip("Not available for binary or oversized files")
+    
+    def _show_render_error(self, message):
+        self._render_task = None
+        self.old_text.set_message(f"Could not compare files: {message}")
+        self.new_text.set_message(f"Could not compare files: {message}")
     
-    def _highlight_content(self, content, other_content, is_old=True):
-        """Highlight differences between two contents with colors and line numbers (IDE-style)"""
-        if content is None or other_content is None:
-            # If one file doesn't exist, show as is with line numbers
-            if content:
-                lines = content.split('\n')
-                html_lines = []
-                for line_num, line in enumerate(lines, 1):
-                    escaped = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                    if is_old:
-                        bg_color = '#4b1818'  # Dark red for deleted file
-                    else:
-                        bg_color = '#1a4b1a'  # Dark green for new file
-                    html_lines.append(
-                        f'<div style="background-color: {bg_color}; padding: 2px 0;">'
-                        f'<span style="color: #858585; user-select: none; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                        f'<span style="color: #d4d4d4;">{escaped if escaped else "&nbsp;"}</span>'
-                        f'</div>'
-                    )
-                return '<div style="margin: 0; font-family: Consolas, monospace; font-size: 10pt; line-height: 1.6;">' + ''.join(html_lines) + '</div>'
-            return content
-        
-        # Split into lines for comparison
-        content_lines = content.split('\n')
-        other_lines = other_content.split('\n')
-        
-        # Use difflib to get differences
-        diff = difflib.ndiff(content_lines if is_old else other_lines, 
-                            other_lines if is_old else content_lines)
-        
-        html_lines = []
-        line_num = 0
-        for line in diff:
-            # Escape HTML characters but preserve tabs
-            escaped = line[2:].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('\t', '    ')
-            
-            if line.startswith('- ') and is_old:
-                # Line removed (only show in old) - dark red background
-                line_num += 1
-                html_lines.append(
-                    f'<div style="background-color: #4b1818; padding: 2px 0;">'
-                    f'<span style="color: #858585; user-select: none; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                    f'<span style="color: #f48771;">{escaped if escaped else "&nbsp;"}</span>'
-                    f'</div>'
-                )
-            elif line.startswith('+ ') and not is_old:
-                # Line added (only show in new) - dark green background
-                line_num += 1
-                html_lines.append(
-                    f'<div style="background-color: #1a4b1a; padding: 2px 0;">'
-                    f'<span style="color: #858585; user-select: none; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                    f'<span style="color: #89d185;">{escaped if escaped else "&nbsp;"}</span>'
-                    f'</div>'
-                )
-            elif line.startswith('  '):
-                # Line unchanged - normal background
-                line_num += 1
-                html_lines.append(
-                    f'<div style="background-color: transparent; padding: 2px 0;">'
-                    f'<span style="color: #858585; user-select: none; padding: 0 10px; min-width: 50px; display: inline-block; text-align: right; border-right: 1px solid #3e3e3e; margin-right: 10px;">{line_num}</span>'
-                    f'<span style="color: #d4d4d4;">{escaped if escaped else "&nbsp;"}</span>'
-                    f'</div>'
-                )
-            elif line.startswith('? '):
-                # Skip these marker lines from ndiff
-                continue
-        
-        return '<div style="margin: 0; font-family: Consolas, monospace; font-size: 10pt; line-height: 1.6;">' + ''.join(html_lines) + '</div>'
+    def done(self, result):
+        # Abandon rendering if the dialog is closed before it finishes
+        if self._render_task is not None:
+            self._render_task.cancel()
+            self._render_task = None
+        super().done(result)
     
     def select_new_change(self):
         """Accept new change - write new content to file"""
         # Write the new content to the file
         if self.new_content is not None:
             try:
-                with open(self.file_path, 'w', encoding='utf-8', errors='ignore') as f:
-                    f.write(self.new_content)
+                write_text_like(self.file_path, self.new_content)
                 self.selected_action = 'accept_new'
                 from PyQt6.QtWidgets import QMessageBox
                 QMessageBox.information(self, "Applied", f"✅ New code applied to:\n{os.path.basename(self.file_path)}")
@@ -219,8 +203,7 @@ class FileDiffDialog(QDialog):
         # Write the old content back to the file to revert changes
         if self.old_content is not None:
             try:
-                with open(self.file_path, 'w', encoding='utf-8', errors='ignore') as f:
-                    f.write(self.old_content)
+                write_text_like(self.file_path, self.old_content)
                 self.selected_action = 'revert_to_old'
                 from PyQt6.QtWidgets import QMessageBox
                 QMessageBox.information(self, "Reverted", f"File reverted to old version:\n{os.path.basename(self.file_path)}")
@@ -1,6 +1,5 @@
 """Git to source comparison dialog - COMPLETE FIXED VERSION"""
 import os
-import hashlib
 import shutil
 import threading
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
@@ -9,8 +8,12 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushBut
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtWidgets import QHeaderView
 
+from core.compare_modes import EXACT, COMPARE_MODES, files_match
+from services.patch_export import PatchEntry
+from services.progress_reporter import ProgressReporter
 from ui.dialogs.chunk_review_dialog import ChunkReviewDialog
-from ui.styles import COLORS, FONTS, SPACING, STYLES
+from ui.dialogs.patch_export_dialog import PatchExportDialog
+from ui.styles import COLORS, FONTS, SPACING, STYLES, get_role_stylesheet
 
 
 class ScanThread(QThread):
@@ -18,10 +21,11 @@ class ScanThread(QThread):
     progress = pyqtSignal(int, str)
     finished_scan = pyqtSignal(list)
     
-    def __init__(self, git_path, source_path, without_paths, except_paths):
+    def __init__(self, git_path, source_path, without_paths, except_paths, compare_mode=EXACT):
         super().__init__()
         self.git_path = git_path
         self.source_path = source_path
+        self.compare_mode = compare_mode
         self.without_paths = [self._normalize_path(p) for p in (without_paths or []) if p]
         self.except_paths = [self._normalize_path(p) for p in (except_paths or []) if p]
         self._running = True
@@ -242,7 +246,9 @@ class ScanThread(QThread):
             self.finished_scan.emit(changes)
             return
         
-        processed = 0
+        # Emits at most a few times per second; the ETA is seeded from the last scan of this pair
+        reporter = ProgressReporter(self.progress.emit, stats_key=f"{self.git_path}|{self.source_path}")
+        reporter.set_total(total_files)
         processed_files = set()  # Track processed files to avoid duplicates
         
         # Scan git path - show ALL files (don't ignore without/except settings)
@@ -280,11 +286,12 @@ class ScanThread(QThread):
                                 found_in_git = False
                             
                             status = ""
+                            read_bytes = 0
                             
                             # Track this file to avoid duplicate processing
                             file_key = git_rel_path
                             if file_key in processed_files:
-                                processed += 1
+                                reporter.update()
                                 continue
                             processed_files.add(file_key)
                             
@@ -294,16 +301,11 @@ class ScanThread(QThread):
                                     # Add small buffer for file system write delays
                                     time.sleep(0.01)
                                     
-                                    with open(git_file, 'rb') as f1:
-                                        git_content = f1.read()
-                                    with open(source_file, 'rb') as f2:
-                                        source_content = f2.read()
+                                    read_bytes = os.path.getsize(git_file) + os.path.getsize(source_file)
                                     
-                                    # Compare content directly - only show if files are DIFFERENT
+                                    # Compare digests under the system's compare mode - only show if files are DIFFERENT
                                     # If files are identical (same content), skip them (don't add to changes)
-                                    if git_content != source_content:
-                                        git_hash = hashlib.md5(git_content).hexdigest()
-                                        source_hash = hashlib.md5(source_content).hexdigest()
+                                    if not files_match(git_file, source_file, self.compare_mode):
                                         status = "Modified"
                                     # If files are identical, status remains empty and file is skipped
                                 except (OSError, PermissionError, TimeoutError) as e:
@@ -313,7 +315,7 @@ class ScanThread(QThread):
                                 status = "New in Git"
                             elif not found_in_git:
                                 # Git file is not accessible - skip this file (don't count it)
-                                processed += 1
+                                reporter.update()
                                 continue
                             
                             # Only add to changes if there's a status (file is different or missing)
@@ -327,12 +329,9 @@ class ScanThread(QThread):
                                     'git_rel_path': git_rel_path
                                 })
                             
-                            processed += 1
-                            if total_files > 0:
-                                progress = int((processed / total_files) * 100)
-                                self.progress.emit(progress, f"Scanning: {git_rel_path}")
+                            reporter.update(nbytes=read_bytes, current=git_rel_path)
                         except (OSError, PermissionError, TimeoutError):
-                            processed += 1
+                            reporter.update()
                             continue
                 except (OSError, PermissionError, TimeoutError):
                     continue
@@ -363,7 +362,7 @@ class ScanThread(QThread):
                             # Check if already processed
                             file_key = source_rel_path
                             if file_key in processed_files:
-                                processed += 1
+                                reporter.update()
                                 continue
                             
                             # Check if there's a matching git file
@@ -383,18 +382,16 @@ class ScanThread(QThread):
                                 })
                                 processed_files.add(file_key)
                             
-                            processed += 1
-                            if total_files > 0:
-                                progress = int((processed / total_files) * 100)
-                                self.progress.emit(progress, f"Scanning: {source_rel_path}")
+                            reporter.update(current=source_rel_path)
                         except (OSError, PermissionError, TimeoutError):
-                            processed += 1
+                            reporter.update()
                             continue
                 except (OSError, PermissionError, TimeoutError):
                     continue
         except (OSError, PermissionError, TimeoutError) as e:
             self.progress.emit(0, f"❌ Error: {str(e)}")
         
+        reporter.finish(save_stats=self._running)
         self.finished_scan.emit(changes)
     
     def stop(self):
@@ -404,7 +401,8 @@ class ScanThread(QThread):
 class GitSourceCompareDialog(QDialog):
     """Dialog to compare files between Git path and Source path"""
     
-    def __init__(self, git_path, source_path, backup_path="", without_paths=None, except_paths=None, parent=None):
+    def __init__(self, git_path, source_path, backup_path="", without_paths=None, except_paths=None, parent=None,
+                 compare_mode=EXACT, baselines=None, generated_globs=None):
         super().__init__(parent)
         self.setWindowTitle("Git to Source Comparison")
         self.setMinimumWidth(1000)
@@ -414,8 +412,13 @@ class GitSourceCompareDialog(QDialog):
                           Qt.WindowType.WindowMaximizeButtonHint | 
                           Qt.WindowType.WindowCloseButtonHint)
         self.setSizeGripEnabled(True)
+        # Property-driven rules for the per-row widgets, parsed once for the dialog
+        self.setStyleSheet(get_role_stylesheet())
         
         self.git_path = os.path.normpath(git_path)
+        self.compare_mode = compare_mode
+        self.baselines = baselines or {}  # Source file -> content captured by the watcher at Start
+        self.generated_globs = generated_globs or []  # The system's globs of generated files
         self.source_path = os.path.normpath(source_path)
         self.backup_path = os.path.normpath(backup_path) if backup_path else ""
         self.without_paths = without_paths or []
@@ -517,6 +520,13 @@ class GitSourceCompareDialog(QDialog):
         self.copy_to_source_btn.setEnabled(False)
         btn_layout.addWidget(self.copy_to_source_btn)
         
+        self.export_btn = QPushButton("📦 Export Patch")
+        self.export_btn.setStyleSheet(STYLES['button_secondary'])
+        self.export_btn.setToolTip("Save what copying the checked files would change as one unified diff or zip")
+        self.export_btn.clicked.connect(self.export_patch)
+        self.export_btn.setEnabled(False)
+        btn_layout.addWidget(self.export_btn)
+        
         close_btn = QPushButton("Close")
         close_btn.setStyleSheet(STYLES['button_secondary'])
         close_btn.clicked.connect(self.accept)
@@ -539,7 +549,8 @@ class GitSourceCompareDialog(QDialog):
         self.scan_btn.setEnabled(False)
         self.scan_btn.setText("⏳ Scanning...")
         
-        self.scan_thread = ScanThread(self.git_path, self.source_path, self.without_paths, self.except_paths)
+        self.scan_thread = ScanThread(self.git_path, self.source_path, self.without_paths, self.except_paths,
+                                      self.compare_mode)
         self.scan_thread.progress.connect(self.on_scan_progress)
         self.scan_thread.finished_scan.connect(self.on_scan_finished)
         self.scan_thread.start()
@@ -563,10 +574,14 @@ class GitSourceCompareDialog(QDialog):
         
         self.progress_bar.setVisible(False)
         self.progress_bar.setValue(0)
-        self.status_label.setText(f"✅ Found {len(self.changes)} difference(s)")
+        status_text = f"✅ Found {len(self.changes)} difference(s)"
+        if self.compare_mode != EXACT:
+            status_text += f" (Compare: {COMPARE_MODES[self.compare_mode]})"
+        self.status_label.setText(status_text)
         self.scan_btn.setEnabled(True)
         self.scan_btn.setText("🔍 Scan for Changes")
         self.copy_to_source_btn.setEnabled(len(self.changes) > 0)
+        self.export_btn.setEnabled(len(self.changes) > 0)
         self.select_all_btn.setEnabled(len(self.changes) > 0)
         self.deselect_all_btn.setEnabled(len(self.changes) > 0)
     
@@ -622,30 +637,21 @@ class GitSourceCompareDialog(QDialog):
             btn_tooltip = "View differences and apply changes from git"
         
         view_btn = QPushButton(btn_text)
-        view_btn.setStyleSheet(STYLES['button_secondary'])
+        view_btn.setProperty('variant', 'secondary')
         view_btn.setToolTip(btn_tooltip)
         view_btn.clicked.connect(lambda checked, g=git_file, s=source_file: self.view_diff(g, s))
         self.file_list.setCellWidget(row, 3, view_btn)
     
+    def _baseline(self, source_file):
+        """Watcher baseline of a source file, if it was captured; a file changed on both sides is merged against it"""
+        return self.baselines.get(source_file.replace("\\", "/"), self.baselines.get(source_file))
+    
     def view_diff(self, git_file, source_file):
         try:
-            if os.path.exists(source_file):
-                with open(source_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    source_content = f.read()
-            else:
-                source_content = ""
-            
-            if os.path.exists(git_file):
-                with open(git_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    git_content = f.read()
-            else:
-                git_content = ""
-            
-            if source_content == git_content:
-                QMessageBox.information(self, "No Differences", "Files are identical.")
-                return
-            
-            dialog = ChunkReviewDialog(source_file, source_content, git_content, self)
+            # Both files are read and diffed on the worker while the dialog is already open
+            dialog = ChunkReviewDialog(source_file, None, None, self, old_path=source_file, new_path=git_file,
+                                       base_content=self._baseline(source_file),
+                                       generated_globs=self.generated_globs, close_if_identical=True)
             dialog.setWindowTitle(f"Git → Source - {os.path.basename(source_file)}")
             
             result = dialog.exec()
@@ -667,6 +673,13 @@ class GitSourceCompareDialog(QDialog):
         for checkbox in self.checkboxes:
             checkbox.setChecked(False)
     
+    def export_patch(self):
+        """Export what copying the checked files to Source would change (source -> git) as a patch bundle"""
+        entries = [PatchEntry(change['rel_path'], old_path=change['source_file'], new_path=change['git_file'])
+                   for i, change in enumerate(self.changes)
+                   if self.checkboxes[i].isChecked() and change['status'] != "Only in Source"]
+        PatchExportDialog.export(self, entries, "git-to-source")
+    
     def copy_to_source(self):
         checked_rows = [i for i, cb in enumerate(self.checkboxes) if cb.isChecked()]
         
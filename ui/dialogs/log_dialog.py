@@ -1,17 +1,19 @@
 """Log dialog for displaying file scanning progress"""
+import time
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QTextEdit, QTableView
-from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import pyqtSignal, QTimer
 
 from ui.models.log_table_model import LogTableModel
 
 
 class LogDialog(QDialog):
     """Popup window for file scanning logs."""
-    
+
     add_log_signal = pyqtSignal(str)  # Signal to update the table safely from another thread
+    add_file_log_signal = pyqtSignal(str, int)  # Scanned file path and its size in bytes
     upt_log_signal = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, log_file=None):
         super().__init__()
         self.setWindowTitle("Scanning files...")
         self.setMinimumWidth(600)
@@ -28,6 +30,10 @@ class LogDialog(QDialog):
         self.row_layout_user.addWidget(self.user_input_name)
         self.layout.addLayout(self.row_layout_user)
 
+        # Running counter and throughput
+        self.stats_label = QLabel("Scanned: 0 files", self)
+        self.layout.addWidget(self.stats_label)
+
         # Table for logs
         self.table = QTableView()
         self.table.setShowGrid(False)
@@ -37,15 +43,22 @@ class LogDialog(QDialog):
         self.table.resizeRowsToContents()
         self.table.horizontalHeader().setStretchLastSection(True)
 
-        # Initialize the model
-        self.model = LogTableModel()
+        # Initialize the model; with a log file it is memory-mapped instead of kept in memory
+        self.model = LogTableModel(log_file)
         self.table.setModel(self.model)
         self.layout.addWidget(self.table)
 
         # Connect the signal to update the UI safely
         self.add_log_signal.connect(self.model.append_row)
+        self.add_file_log_signal.connect(self.model.append_row)
         self.upt_log_signal.connect(self.setText)
 
+        self._last_sample = (time.monotonic(), 0, 0)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(500)
+        self.stats_timer.timeout.connect(self.update_stats)
+        self.stats_timer.start()
+
     def setLog(self, text):
         """Safely update the table model from another thread."""
         self.add_log_signal.emit(text)  # Emit signal to safely update table
@@ -53,3 +66,22 @@ class LogDialog(QDialog):
     def setText(self, text):
         self.user_input_name.setText(text)
 
+    def update_stats(self):
+        """Refresh the file counter and files/s, MB/s since the previous tick"""
+        now = time.monotonic()
+        last_time, last_rows, last_bytes = self._last_sample
+        rows, size = self.model.total_rows, self.model.total_bytes
+        elapsed = max(now - last_time, 1e-6)
+        files_per_sec = (rows - last_rows) / elapsed
+        mb_per_sec = (size - last_bytes) / elapsed / (1024 * 1024)
+        self._last_sample = (now, rows, size)
+
+        self.stats_label.setText(
+            f"Scanned: {rows:,} files ({size / (1024 * 1024):,.1f} MB) | "
+            f"{files_per_sec:,.0f} files/s | {mb_per_sec:,.1f} MB/s"
+        )
+
+    def done(self, result):
+        # Closing (not hiding) releases a log file's mapping and handle
+        self.model.close()
+        super().done(result)
@@ -0,0 +1,98 @@
+"""Progress dialog for exporting selected changes as a patch bundle"""
+import os
+from datetime import datetime
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar, QPushButton,
+                             QFileDialog, QMessageBox)
+
+from services.patch_export import PatchExportThread
+from ui.styles import SPACING, get_role_stylesheet
+
+
+class PatchExportDialog(QDialog):
+    """Runs a PatchExportThread and shows its progress (files/s, ETA) until it is done.
+
+    Use export() to ask for the target file first.
+    """
+    def __init__(self, entries, out_path, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Exporting Patch - {os.path.basename(out_path)}")
+        self.setMinimumWidth(560)
+        self.setStyleSheet(get_role_stylesheet())
+        self.out_path = out_path
+        self.stats = None
+
+        layout = QVBoxLayout(self)
+        layout.setSpacing(int(SPACING['md'].replace('px', '')))
+        layout.setContentsMargins(20, 20, 20, 20)
+
+        heading = QLabel(f"📦 {len(entries):,} file(s) → {os.path.basename(out_path)}")
+        heading.setProperty('variant', 'heading')
+        heading.setToolTip(out_path)
+        layout.addWidget(heading)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("⏳ Starting workers...")
+        self.status_label.setProperty('variant', 'info')
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setProperty('variant', 'secondary')
+        self.cancel_btn.clicked.connect(self.reject)
+        button_layout.addWidget(self.cancel_btn)
+        layout.addLayout(button_layout)
+
+        self.thread = PatchExportThread(entries, out_path, self)
+        self.thread.progress.connect(self._on_progress)
+        self.thread.export_finished.connect(self._on_finished)
+        self.thread.export_failed.connect(self._on_failed)
+        self.thread.start()
+
+    @classmethod
+    def export(cls, parent, entries, default_name="changes"):
+        """Ask where to save the patch of `entries` (PatchEntry) and export it; returns the stats or None"""
+        if not entries:
+            QMessageBox.information(parent, "No Selection", "Please select files to export")
+            return None
+        suggested = f"{default_name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.patch"
+        out_path, _ = QFileDialog.getSaveFileName(parent, "Export Patch", suggested,
+                                                  "Unified diff (*.patch *.diff);;Zip archive (*.zip)")
+        if not out_path:
+            return None
+        dialog = cls(entries, out_path, parent)
+        dialog.exec()
+        return dialog.stats
+
+    def _on_progress(self, percent, message):
+        self.progress_bar.setValue(percent)
+        self.status_label.setText(message)
+
+    def _on_finished(self, stats):
+        self.stats = stats
+        rate = stats['files'] / stats['seconds'] if stats['seconds'] > 0 else 0
+        QMessageBox.information(
+            self, "Patch Exported",
+            f"✅ Exported {stats['changed']:,} changed file(s) of {stats['files']:,} to:\n{self.out_path}\n\n"
+            f"{stats['seconds']:.1f} s, {rate:,.0f} files/s"
+        )
+        self.accept()
+
+    def _on_failed(self, message):
+        if self.result() == QDialog.DialogCode.Rejected and not self.isVisible():
+            return  # Cancelled by the user
+        QMessageBox.warning(self, "Export Failed", f"Could not export patch: {message}")
+        super().reject()
+
+    def reject(self):
+        # Stop the export; the partial file is discarded and the original left in place
+        if self.thread.isRunning():
+            self.status_label.setText("⏹ Cancelling...")
+            self.cancel_btn.setEnabled(False)
+            self.thread.stop()
+            self.thread.wait()
+        super().reject()
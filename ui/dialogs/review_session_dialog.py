@@ -0,0 +1,182 @@
+"""Review of many changed files in one window"""
+import os
+from PyQt6.QtWidgets import QHBoxLayout, QLabel, QPushButton
+
+from config import REVIEW_PREFETCH_FILES
+from services.diff_service import diff_service
+from ui.dialogs.chunk_review_dialog import ChunkReviewDialog
+from ui.styles import SPACING
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0
+
+
+class ReviewItem:
+    """One file of a review session, with the arguments ChunkReviewDialog takes for it"""
+    def __init__(self, file_path, old_content=None, new_content=None, old_path=None, new_path=None,
+                 base_content=None, generated_globs=None):
+        self.file_path = file_path
+        self.old_content = old_content
+        self.new_content = new_content
+        self.old_path = old_path
+        self.new_path = new_path
+        self.base_content = base_content
+        self.generated_globs = generated_globs
+        self.result = None        # Prefetched DiffResult or ByteComparison
+        self.modified_time = 0    # mtime of file_path when the result was computed
+        self.task = None          # Prefetch still running
+        self.applied = False
+
+    def start(self, parent):
+        """Start diffing this file in the background"""
+        self.modified_time = _mtime(self.file_path)
+        if self.base_content is not None:
+            self.task = diff_service.merge(self.base_content, self.old_path, self.new_path, parent=parent)
+        else:
+            self.task = diff_service.diff(self.old_content, self.new_content, self.old_path, self.new_path,
+                                          parent=parent, generated_globs=self.generated_globs)
+        return self.task
+
+    def drop(self):
+        """Forget the prefetched result, cancelling it if still running"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.result = None
+
+
+class ReviewSessionDialog(ChunkReviewDialog):
+    """ChunkReviewDialog walking through a queue of files.
+
+    The dialog's widgets are reused from one file to the next. Once the current
+    file's diff is done, the next `prefetch` files are diffed in the background, so
+    moving on shows them at once; results the session moved away from are dropped.
+    Applying a file's decisions moves on to the next file not yet applied.
+    """
+    def __init__(self, items, start=0, parent=None, prefetch=REVIEW_PREFETCH_FILES):
+        self.items = list(items)
+        self.index = start
+        self.prefetch = prefetch
+        item = self.items[start]
+        super().__init__(item.file_path, item.old_content, item.new_content, parent, old_path=item.old_path,
+                         new_path=item.new_path, base_content=item.base_content,
+                         generated_globs=item.generated_globs)
+        self.last_modified_time = _mtime(item.file_path)
+
+        nav_layout = QHBoxLayout()
+        nav_layout.setSpacing(int(SPACING['sm'].replace('px', '')))
+        self.prev_btn = QPushButton("◀ Previous File")
+        self.prev_btn.setProperty('variant', 'secondary')
+        self.prev_btn.setShortcut("Alt+Left")
+        self.prev_btn.clicked.connect(lambda: self.show_item(self.index - 1))
+        nav_layout.addWidget(self.prev_btn)
+        nav_layout.addStretch()
+        self.position_label = QLabel()
+        self.position_label.setProperty('variant', 'subheading')
+        nav_layout.addWidget(self.position_label)
+        nav_layout.addStretch()
+        self.next_btn = QPushButton("Next File ▶")
+        self.next_btn.setProperty('variant', 'secondary')
+        self.next_btn.setShortcut("Alt+Right")
+        self.next_btn.clicked.connect(lambda: self.show_item(self.index + 1))
+        nav_layout.addWidget(self.next_btn)
+        self.main_layout.insertLayout(1, nav_layout)
+        self._update_navigation()
+
+    def show_item(self, index):
+        """Move the review to another file of the queue"""
+        if not 0 <= index < len(self.items) or index == self.index:
+            return
+        self._keep_current()
+        self.index = index
+        item = self.items[index]
+        if item.task is not None:
+            # Still prefetching: wait for that task instead of diffing again
+            task, item.task = item.task, None
+            self.load_file(item.file_path, item.old_content, item.new_content, item.old_path, item.new_path,
+                           item.base_content, task=task, modified_time=item.modified_time,
+                           generated_globs=item.generated_globs)
+        elif item.result is not None:
+            self.load_file(item.file_path, item.old_content, item.new_content, item.old_path, item.new_path,
+                           item.base_content, result=item.result, modified_time=item.modified_time,
+                           generated_globs=item.generated_globs)
+            # Re-diffs only if the file changed after the prefetch
+            self._auto_refresh()
+        else:
+            self.load_file(item.file_path, item.old_content, item.new_content, item.old_path, item.new_path,
+                           item.base_content, modified_time=_mtime(item.file_path),
+                           generated_globs=item.generated_globs)
+        self._update_navigation()
+
+    def _keep_current(self):
+        """Keep the shown result for going back, unless it is still being computed"""
+        item = self.items[self.index]
+        item.drop()
+        if not self.computing and not item.applied:
+            item.result = self.byte_comparison or self.diff_result
+            item.modified_time = self.last_modified_time
+
+    def _prefetch(self):
+        """Diff the next files in the background and drop results out of reach"""
+        if self.computing:
+            return  # The file on screen comes first
+        keep = range(max(0, self.index - 1), min(len(self.items), self.index + self.prefetch + 1))
+        for i, item in enumerate(self.items):
+            if i not in keep and i != self.index:
+                item.drop()
+        for i in range(self.index + 1, keep.stop):
+            item = self.items[i]
+            if item.result is None and item.task is None and not item.applied:
+                task = item.start(self)
+                task.finished.connect(lambda result, item=item: self._on_prefetched(item, result))
+                task.failed.connect(lambda message, item=item: self._on_prefetch_failed(item, message))
+
+    def _on_prefetched(self, item, result):
+        item.task = None
+        item.result = result
+
+    def _on_prefetch_failed(self, item, message):
+        # Diffed again when the file is shown
+        item.task = None
+        print(f"Prefetch failed for {item.file_path}: {message}")
+
+    def _show_result(self, result):
+        super()._show_result(result)
+        self._prefetch()
+
+    def _update_dialog_size(self):
+        # Sized once, as for a long review; the window should not jump between files
+        if not getattr(self, '_sized', False):
+            self._sized = True
+            self.setMinimumHeight(700)
+            self.resize(1200, 750)
+
+    def _update_navigation(self):
+        name = os.path.basename(self.file_path)
+        done = sum(1 for item in self.items if item.applied)
+        self.setWindowTitle(f"Review Session - {name} ({self.index + 1}/{len(self.items)})")
+        self.position_label.setText(f"File {self.index + 1} of {len(self.items)} · {done} applied")
+        self.prev_btn.setEnabled(self.index > 0)
+        self.next_btn.setEnabled(self.index < len(self.items) - 1)
+
+    def _on_applied(self, new_count, old_count):
+        item = self.items[self.index]
+        item.applied = True
+        item.drop()
+        remaining = [i for i in range(len(self.items)) if not self.items[i].applied]
+        if not remaining:
+            self.accept()
+            return
+        following = [i for i in remaining if i > self.index]
+        self.show_item(following[0] if following else remaining[0])
+        self.info_label.setText(f"✅ Saved {os.path.basename(item.file_path)}: kept {new_count} new change(s), "
+                                f"reverted {old_count}. {len(remaining)} file(s) left.")
+
+    def done(self, result):
+        for item in self.items:
+            item.drop()
+        super().done(result)
@@ -1,5 +1,7 @@
 """UI models for table views"""
 from .log_table_model import LogTableModel
+from .log_file_index import LogFileIndex
+from .chunk_list_model import ChunkListModel
 
-__all__ = ['LogTableModel']
+__all__ = ['LogTableModel', 'LogFileIndex', 'ChunkListModel']
 
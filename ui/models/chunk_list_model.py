@@ -0,0 +1,57 @@
+"""List model of change chunks for the chunk review view"""
+from PyQt6.QtCore import QAbstractListModel, Qt, QModelIndex
+
+
+class ChunkListModel(QAbstractListModel):
+    """ChangeChunk objects of ChunkReviewDialog, one row each.
+
+    The model owns the chunk list; decisions are written through set_decisions() so
+    that views repaint only the rows that changed.
+    """
+    ChunkRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.chunks = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.chunks)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        chunk = self.chunks[index.row()]
+        if role == self.ChunkRole:
+            return chunk
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"📝 Change #{index.row() + 1} (Line {chunk.start_line + 1})"
+        return None
+
+    def set_chunks(self, chunks):
+        self.beginResetModel()
+        self.chunks = list(chunks)
+        self.endResetModel()
+
+    def replace_rows(self, first, count, chunks):
+        """Swap rows [first, first + count) for `chunks`; later rows are renumbered"""
+        if count:
+            self.beginRemoveRows(QModelIndex(), first, first + count - 1)
+            del self.chunks[first:first + count]
+            self.endRemoveRows()
+        if chunks:
+            self.beginInsertRows(QModelIndex(), first, first + len(chunks) - 1)
+            self.chunks[first:first] = chunks
+            self.endInsertRows()
+        self.rows_changed(first + len(chunks), len(self.chunks) - 1)
+
+    def set_decisions(self, rows, decision):
+        rows = list(rows)
+        if not rows:
+            return
+        for row in rows:
+            self.chunks[row].decision = decision
+        self.rows_changed(min(rows), max(rows))
+
+    def rows_changed(self, first, last):
+        if first <= last:
+            self.dataChanged.emit(self.index(first), self.index(last))
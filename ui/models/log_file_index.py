@@ -0,0 +1,112 @@
+"""Memory-mapped line-offset index for large log files"""
+import os
+import mmap
+import threading
+from array import array
+
+INDEX_CHUNK_BYTES = 4 * 1024 * 1024  # Bytes scanned per step before yielding progress
+
+
+class LogFileIndex:
+    """Line-offset index over a memory-mapped log file.
+
+    The index is built by a background thread, a chunk at a time, so the first rows
+    are available while the rest of a multi-GB file is still being scanned. Only
+    offsets are stored; line text is decoded on demand by line().
+
+    `offsets` holds the start of every line plus the start of the next, not yet
+    terminated line, so `line_count` is always len(offsets) - 1. A trailing line
+    without a newline shows up once it is terminated.
+    """
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self.offsets = array('Q', [0])
+        self.indexed_upto = 0  # Bytes scanned so far
+        self.mapped_size = 0
+        self.identity = None  # (device, inode) of the file that was opened
+        self._file = None
+        self._mm = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def line_count(self):
+        return len(self.offsets) - 1
+
+    @property
+    def is_building(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def open(self):
+        """Map the file and start indexing it in the background"""
+        self._file = open(self.path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self.identity = (stat.st_dev, stat.st_ino)
+        self._remap()
+        self._start_scan()
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._mm = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def refresh(self):
+        """Pick up bytes appended since the last scan (tail-follow).
+
+        Returns False when the file shrank or the path now names another file
+        (truncated or rotated) and the caller should rebuild the index from scratch,
+        True otherwise.
+        """
+        if self._file is None or self.is_building:
+            return True
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return True  # Between rotation steps; checked again on the next tick
+        size = stat.st_size
+        if size < self.indexed_upto or (stat.st_dev, stat.st_ino) != self.identity:
+            return False
+        if size > self.mapped_size:
+            self._remap()
+            self._start_scan()
+        return True
+
+    def line(self, row):
+        """Decode a single line without its line ending"""
+        start = self.offsets[row]
+        end = self.offsets[row + 1]
+        return self._mm[start:end].decode(self.encoding, errors="replace").rstrip("\r\n")
+
+    def _remap(self):
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            return  # mmap cannot map an empty file; wait for data to arrive
+        # Swapping the reference keeps the old map alive for any reader still holding it
+        self._mm = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        self.mapped_size = size
+
+    def _start_scan(self):
+        if self._mm is None or self.indexed_upto >= self.mapped_size:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._scan, args=(self._mm, self.mapped_size), daemon=True)
+        self._thread.start()
+
+    def _scan(self, mm, size):
+        offsets = self.offsets
+        pos = self.indexed_upto
+        while pos < size and not self._stop.is_set():
+            chunk_end = min(pos + INDEX_CHUNK_BYTES, size)
+            find = mm.find
+            nl = find(b"\n", pos, chunk_end)
+            while nl != -1:
+                offsets.append(nl + 1)
+                nl = find(b"\n", nl + 1, chunk_end)
+            pos = chunk_end
+            self.indexed_upto = pos
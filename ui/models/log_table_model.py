@@ -1,37 +1,143 @@
 """Table model for log display"""
-from PyQt6.QtCore import QAbstractTableModel, Qt, QModelIndex
+from PyQt6.QtCore import QAbstractTableModel, Qt, QModelIndex, QTimer
+
+from config import LOG_MAX_ROWS, LOG_FLUSH_INTERVAL_MS, LOG_FOLLOW_INTERVAL_MS
+from ui.models.log_file_index import LogFileIndex
 
 
 class LogTableModel(QAbstractTableModel):
-    """Efficient model for handling large log files in QTableView"""
-    def __init__(self, log_file=None):
+    """Log rows for QTableView, either in memory or backed by a log file.
+
+    In memory mode only the newest `capacity` rows are kept. Appends are queued and
+    flushed once per tick as a single row insertion, so a burst of thousands of log
+    lines costs one beginInsertRows/endInsertRows pair instead of one per line.
+
+    With `log_file` the model is file-backed: the file is memory-mapped, a line
+    index is built in the background and only rows the view asks for are decoded.
+    New lines appended to the file are picked up without a reload (tail-follow).
+    """
+    def __init__(self, log_file=None, capacity=LOG_MAX_ROWS, flush_interval_ms=LOG_FLUSH_INTERVAL_MS,
+                 follow=True):
         super().__init__()
         self.log_file = log_file
-        self.lines = []  # Initialize with an empty list
+        self.follow = follow
+        self._index = None
+        self._file_rows = 0
+        self.capacity = max(1, capacity)
+        self._buffer = [None] * self.capacity
+        self._start = 0  # Index of the oldest row inside _buffer
+        self._count = 0
+        self._pending = []
+
+        # Running totals, including rows already evicted from the buffer
+        self.total_rows = 0
+        self.total_bytes = 0
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+
+        # Publishes rows indexed in the background and follows the file tail
+        self._sync_timer = QTimer(self)
+        self._sync_timer.setInterval(LOG_FOLLOW_INTERVAL_MS)
+        self._sync_timer.timeout.connect(self._sync_file_rows)
+
         if log_file:
             self.load_lines()
 
     def load_lines(self):
-        """Loads only line references (not full file) for efficiency"""
-        with open(self.log_file, "r", encoding="utf-8") as f:
-            self.lines = f.readlines()  # Load lines from the file
-        self.layoutChanged.emit()  # Notify the view that the data has changed
+        """(Re)open the log file and start indexing its lines in the background"""
+        self.beginResetModel()
+        if self._index:
+            self._index.close()
+        self._index = LogFileIndex(self.log_file)
+        self._index.open()
+        self._file_rows = 0
+        self.total_rows = 0
+        self.endResetModel()
+        self._sync_timer.start()
+
+    def close(self):
+        """Stop background indexing and release the file mapping; load_lines() reopens it"""
+        self._sync_timer.stop()
+        if self._index:
+            self.beginResetModel()
+            self._index.close()
+            self._index = None
+            self._file_rows = 0
+            self.endResetModel()
+
+    def _sync_file_rows(self):
+        """Expose newly indexed rows and pick up lines appended to the file"""
+        index = self._index
+        if index is None:
+            return
+        if self.follow and not index.refresh():
+            self.load_lines()  # File was truncated or rotated
+            return
+
+        line_count = index.line_count
+        if line_count > self._file_rows:
+            self.beginInsertRows(QModelIndex(), self._file_rows, line_count - 1)
+            self._file_rows = line_count
+            self.total_rows = line_count
+            self.endInsertRows()
+        elif not self.follow and not index.is_building:
+            self._sync_timer.stop()
 
     def rowCount(self, parent=None):
-        return len(self.lines)
+        if self._index is not None:
+            return self._file_rows
+        return self._count
 
     def columnCount(self, parent=None):
         return 1  # One column for log text
 
     def data(self, index, role):
         if role == Qt.ItemDataRole.DisplayRole:
-            return self.lines[index.row()].strip()  # Return log text without extra spaces
+            if self._index is not None:
+                return self._index.line(index.row()).strip()
+            return self._buffer[(self._start + index.row()) % self.capacity].strip()
         return None
 
-    def append_row(self, new_line):
-        """Append a new row to the model"""
-        QIndex = QModelIndex()  
-        self.beginInsertRows(QIndex, len(self.lines), len(self.lines))  # Notify about row insertion
-        self.lines.append(new_line + "\n")  # Add the new line to the data
-        self.endInsertRows()  # End the row insertion process
+    def append_row(self, new_line, size=0):
+        """Queue a row; rows are inserted in batches on the next flush tick"""
+        self._pending.append(new_line)
+        self.total_rows += 1
+        self.total_bytes += size
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Insert all queued rows with a single model update, evicting the oldest rows"""
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = []
+        if len(pending) > self.capacity:
+            pending = pending[-self.capacity:]
+
+        overflow = self._count + len(pending) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._buffer[self._start] = None
+                self._start = (self._start + 1) % self.capacity
+            self._count -= overflow
+            self.endRemoveRows()
+
+        first = self._count
+        self.beginInsertRows(QModelIndex(), first, first + len(pending) - 1)
+        self._push(pending)
+        self.endInsertRows()
 
+    def _push(self, lines):
+        """Write rows at the tail of the ring, dropping the oldest when full"""
+        for line in lines:
+            end = (self._start + self._count) % self.capacity
+            self._buffer[end] = line
+            if self._count < self.capacity:
+                self._count += 1
+            else:
+                self._start = (self._start + 1) % self.capacity
@@ -1,4 +1,5 @@
 """Consistent UI styles for the application"""
+from functools import lru_cache
 
 # Color Palette - Modern Dark Theme
 COLORS = {
@@ -26,6 +27,15 @@ COLORS = {
     'diff_removed_bg': '#4b1818',
     'diff_removed_text': '#f48771',
     'diff_modified_bg': '#1a1a4b',
+    'diff_added_word_bg': '#2e7d32',
+    'diff_removed_word_bg': '#8b2a2a',
+    
+    # Syntax highlighting
+    'syntax_keyword': '#569cd6',
+    'syntax_string': '#ce9178',
+    'syntax_comment': '#6a9955',
+    'syntax_number': '#b5cea8',
+    'syntax_variable': '#9cdcfe',
     
     # Border colors
     'border': '#3e3e3e',
@@ -355,6 +365,153 @@ STYLES = {
     """,
 }
 
+
+def _scoped(css, widget_type, selector):
+    """Re-target a STYLES entry from every `widget_type` to widgets matching `selector`"""
+    return css.replace(widget_type, selector)
+
+
+# Property-driven rules. Widgets opt in with setProperty() instead of carrying their own
+# stylesheet, so creating a row or flipping a decision does not reparse any CSS.
+ROLE_STYLES = {
+    'variants': "".join([
+        _scoped(STYLES['label_heading'], 'QLabel', 'QLabel[variant="heading"]'),
+        _scoped(STYLES['label_subheading'], 'QLabel', 'QLabel[variant="subheading"]'),
+        _scoped(STYLES['label_info'], 'QLabel', 'QLabel[variant="info"]'),
+        _scoped(STYLES['button_primary'], 'QPushButton', 'QPushButton[variant="primary"]'),
+        _scoped(STYLES['button_success'], 'QPushButton', 'QPushButton[variant="success"]'),
+        _scoped(STYLES['button_danger'], 'QPushButton', 'QPushButton[variant="danger"]'),
+        _scoped(STYLES['button_secondary'], 'QPushButton', 'QPushButton[variant="secondary"]'),
+        _scoped(STYLES['button_icon'], 'QPushButton', 'QPushButton[variant="icon"]'),
+    ]),
+
+    'chunk_review': f"""
+        QLabel[role="refreshBadge"] {{
+            color: {COLORS['accent_green']};
+            {FONTS['small']}
+            padding: 4px 8px;
+            background-color: {COLORS['bg_tertiary']};
+            border-radius: 4px;
+        }}
+        QLabel[role="refreshBadge"][active="true"] {{
+            color: white;
+            background-color: {COLORS['accent_green']};
+            font-weight: bold;
+        }}
+        QListView[role="chunkList"] {{
+            background-color: {COLORS['bg_primary']};
+            border: none;
+            outline: none;
+        }}
+    """,
+
+    'table_rows': """
+        QPushButton[role="rowAction"] {
+            padding: 0px 6px;
+            font-size: 11px;
+            border-radius: 3px;
+        }
+        QPushButton[role="rowRemove"] {
+            border: none;
+            padding: 0px;
+            background: transparent;
+        }
+        QPushButton[role="rowRemove"]:hover {
+            background: rgba(255, 0, 0, 0.1);
+            border-radius: 3px;
+        }
+    """,
+
+    'git_source_page': """
+        QWidget[role="gitPage"], QWidget[role="gitContent"] {
+            background-color: #1E1E1E;
+        }
+        QWidget[role="gitToolbar"] {
+            background-color: #252526;
+            border-bottom: 1px solid #3C3C3C;
+        }
+        QLabel[role="gitToolbarTitle"] {
+            color: #FFFFFF;
+            font-size: 14px;
+            font-weight: 600;
+            background-color: transparent;
+        }
+        QWidget[role="transparent"] {
+            background-color: transparent;
+        }
+        QWidget[role="systemCard"] {
+            background-color: #252526;
+            border-radius: 6px;
+            border: 1px solid #3C3C3C;
+        }
+        QWidget[role="systemCard"]:hover {
+            border: 1px solid #505050;
+            background-color: #2A2D2E;
+        }
+        QLabel[role="systemTitle"] {
+            font-size: 15px;
+            font-weight: 600;
+            color: #FFFFFF;
+            background-color: transparent;
+        }
+        QPushButton[role="compareButton"] {
+            background-color: #007ACC;
+            color: #FFFFFF;
+            border: none;
+            padding: 5px 14px;
+            font-size: 12px;
+            font-weight: 500;
+            border-radius: 6px;
+            min-height: 24px;
+        }
+        QPushButton[role="compareButton"]:hover {
+            background-color: #1C97EA;
+        }
+        QPushButton[role="compareButton"]:pressed {
+            background-color: #005A9E;
+        }
+        QLabel[role="pathLabel"] {
+            font-size: 12px;
+            color: #858585;
+            background-color: transparent;
+        }
+        QLabel[role="pageDescription"], QLabel[role="emptyDescription"] {
+            font-size: 13px;
+            color: #858585;
+            background-color: transparent;
+        }
+        QLabel[role="emptyTitle"] {
+            font-size: 16px;
+            font-weight: 500;
+            color: #CCCCCC;
+            background-color: transparent;
+        }
+    """,
+}
+
+
+@lru_cache(maxsize=None)
+def get_role_stylesheet():
+    """All property-driven rules as one stylesheet, built once.
+
+    Install it on a top-level window (or append it to the window's own sheet): a
+    stylesheet set on an ancestor takes precedence over the application one.
+    """
+    return "".join(ROLE_STYLES.values())
+
+
+def set_style_property(widget, name, value):
+    """Flip a dynamic property used by the role stylesheet and repolish only this widget"""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+
+
+@lru_cache(maxsize=None)
 def get_app_stylesheet():
     """Get the complete application stylesheet"""
     return f"""
@@ -368,5 +525,6 @@ def get_app_stylesheet():
         {STYLES['input']}
         {STYLES['checkbox']}
         {STYLES['tab_widget']}
+        {get_role_stylesheet()}
     """
 
@@ -1,6 +1,7 @@
 """Custom widgets for the application"""
 from .custom_text_edit import CustomTextEdit
 from .file_watcher_table import FileWatcherTable
+from .diff_view import DiffView
 
-__all__ = ['CustomTextEdit', 'FileWatcherTable']
+__all__ = ['CustomTextEdit', 'FileWatcherTable', 'DiffView']
 
@@ -0,0 +1,228 @@
+"""Virtualized chunk list for ChunkReviewDialog"""
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt6.QtCore import Qt, QRect, QSize, QEvent, pyqtSignal
+from PyQt6.QtGui import QFont, QFontMetrics, QColor, QPen
+
+from ui.models.chunk_list_model import ChunkListModel
+from core.intraline import intraline_spans
+from ui.styles import COLORS
+from ui.widgets.diff_view import display_text, fill_spans
+
+MAX_CHUNK_LINES = 8   # Code lines shown per side before the rest is summarized
+CARD_MARGIN = 6       # Space between cards
+CARD_PADDING = 12
+ARROW_WIDTH = 40
+ARROW_HEIGHT = 35
+COLUMN_GAP = 12
+
+# decision -> (card background, border, title color)
+CARD_COLORS = {
+    None: (COLORS['bg_secondary'], COLORS['border'], COLORS['text_heading']),
+    'new': (COLORS['diff_added_bg'], COLORS['accent_green'], COLORS['accent_green']),
+    'old': (COLORS['diff_removed_bg'], COLORS['accent_red'], COLORS['accent_red']),
+}
+
+
+class ChunkDelegate(QStyledItemDelegate):
+    """Paints a chunk as a card: title, old code, ◀/▶ buttons and new code.
+
+    Only cards in view are painted and no widgets are created per chunk; the two
+    buttons are hit-tested in editorEvent and reported through `decision_clicked`.
+    """
+    decision_clicked = pyqtSignal(int, str)  # Row, 'new' or 'old'
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.code_font = QFont("Consolas", 10)
+        self.title_font = QFont()
+        self.title_font.setBold(True)
+        code_metrics = QFontMetrics(self.code_font)
+        self.line_height = code_metrics.height() + 2
+        self.title_height = QFontMetrics(self.title_font).height() + 8
+
+    def _visible_lines(self, lines):
+        """Lines drawn for one side, plus one for the '… N more lines' note when truncated"""
+        count = max(1, len(lines))
+        return MAX_CHUNK_LINES + 1 if count > MAX_CHUNK_LINES else count
+
+    def sizeHint(self, option, index):
+        chunk = index.data(ChunkListModel.ChunkRole)
+        lines = max(self._visible_lines(chunk.old_lines), self._visible_lines(chunk.new_lines))
+        code_height = max(lines * self.line_height + 8, ARROW_HEIGHT * 2 + COLUMN_GAP)
+        height = 2 * CARD_MARGIN + 2 * CARD_PADDING + 2 * self.title_height + code_height
+        return QSize(option.rect.width(), height)
+
+    def _layout(self, rect):
+        """Rects of the card parts inside an item rect"""
+        card = rect.adjusted(CARD_MARGIN, CARD_MARGIN, -CARD_MARGIN, -CARD_MARGIN)
+        inner = card.adjusted(CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+        title = QRect(inner.left(), inner.top(), inner.width(), self.title_height)
+        column_width = (inner.width() - ARROW_WIDTH - 2 * COLUMN_GAP) // 2
+        labels_top = title.bottom() + 1
+        code_top = labels_top + self.title_height
+        code_height = inner.bottom() - code_top + 1
+        old_x = inner.left()
+        arrows_x = old_x + column_width + COLUMN_GAP
+        new_x = arrows_x + ARROW_WIDTH + COLUMN_GAP
+        return {
+            'card': card,
+            'title': title,
+            'old_label': QRect(old_x, labels_top, column_width, self.title_height),
+            'new_label': QRect(new_x, labels_top, column_width, self.title_height),
+            'old_code': QRect(old_x, code_top, column_width, code_height),
+            'new_code': QRect(new_x, code_top, column_width, code_height),
+            'keep_new': QRect(arrows_x, code_top, ARROW_WIDTH, ARROW_HEIGHT),
+            'keep_old': QRect(arrows_x, code_top + ARROW_HEIGHT + COLUMN_GAP, ARROW_WIDTH, ARROW_HEIGHT),
+        }
+
+    def hit_test(self, rect, pos):
+        """'new', 'old' or None for a point inside an item rect"""
+        parts = self._layout(rect)
+        if parts['keep_new'].contains(pos):
+            return 'new'
+        if parts['keep_old'].contains(pos):
+            return 'old'
+        return None
+
+    def paint(self, painter, option, index):
+        chunk = index.data(ChunkListModel.ChunkRole)
+        parts = self._layout(option.rect)
+        background, border, title_color = CARD_COLORS[chunk.decision]
+        selected = bool(option.state & QStyle.StateFlag.State_Selected)
+
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        painter.setBrush(QColor(background))
+        pen_width = 3 if chunk.decision else 1
+        painter.setPen(QPen(QColor(COLORS['border_hover'] if selected else border), pen_width + (1 if selected else 0)))
+        painter.drawRoundedRect(parts['card'], 6, 6)
+
+        painter.setFont(self.title_font)
+        painter.setPen(QColor(title_color))
+        painter.drawText(parts['title'], Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         index.data(Qt.ItemDataRole.DisplayRole))
+        painter.setPen(QColor(COLORS['diff_removed_text']))
+        painter.drawText(parts['old_label'], Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, "❌ Old Code")
+        painter.setPen(QColor(COLORS['diff_added_text']))
+        painter.drawText(parts['new_label'], Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, "✅ New Code")
+
+        old_texts = [display_text(line) for line in chunk.old_lines[:MAX_CHUNK_LINES]]
+        new_texts = [display_text(line) for line in chunk.new_lines[:MAX_CHUNK_LINES]]
+        # Word-level spans of the line pairs, only for cards being painted
+        old_spans, new_spans = [], []
+        for old_text, new_text in zip(old_texts, new_texts):
+            spans = intraline_spans(old_text, new_text) or ((), ())
+            old_spans.append(spans[0])
+            new_spans.append(spans[1])
+        self._paint_code(painter, parts['old_code'], old_texts, len(chunk.old_lines), old_spans, "[No content]",
+                         COLORS['diff_removed_bg'], COLORS['diff_removed_text'], COLORS['diff_removed_word_bg'])
+        self._paint_code(painter, parts['new_code'], new_texts, len(chunk.new_lines), new_spans, "[Deleted]",
+                         COLORS['diff_added_bg'], COLORS['diff_added_text'], COLORS['diff_added_word_bg'])
+        self._paint_button(painter, parts['keep_new'], "◀", COLORS['accent_green'])
+        self._paint_button(painter, parts['keep_old'], "▶", COLORS['accent_red'])
+        painter.restore()
+
+    def _paint_code(self, painter, rect, texts, total, spans, empty_text, background, color, word_color):
+        painter.setPen(QPen(QColor(COLORS['border']), 1))
+        painter.setBrush(QColor(background))
+        painter.drawRoundedRect(rect, 4, 4)
+
+        painter.setFont(self.code_font)
+        metrics = QFontMetrics(self.code_font)
+        text_width = rect.width() - 16
+        text_rect = QRect(rect.left() + 8, rect.top() + 4, text_width, rect.height() - 8)
+        y = text_rect.top()
+        painter.save()
+        painter.setClipRect(text_rect)
+        for row, text in enumerate(texts or [empty_text]):
+            if row < len(spans) and spans[row]:
+                fill_spans(painter, metrics, text, spans[row], text_rect.left(), y, self.line_height, QColor(word_color))
+            painter.setPen(QColor(color))
+            painter.drawText(QRect(text_rect.left(), y, text_width, self.line_height),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             metrics.elidedText(text, Qt.TextElideMode.ElideRight, text_width))
+            y += self.line_height
+        painter.restore()
+        if total > MAX_CHUNK_LINES:
+            painter.setPen(QColor(COLORS['text_secondary']))
+            painter.drawText(QRect(text_rect.left(), y, text_width, self.line_height),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             f"… {total - MAX_CHUNK_LINES} more line(s)")
+
+    def _paint_button(self, painter, rect, text, color):
+        painter.setPen(QPen(QColor(color), 2))
+        painter.setBrush(QColor(color))
+        painter.drawRoundedRect(rect, 6, 6)
+        font = QFont(self.title_font)
+        font.setPixelSize(18)
+        painter.setFont(font)
+        painter.setPen(QColor('white'))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton):
+            decision = self.hit_test(option.rect, event.position().toPoint())
+            if decision:
+                self.decision_clicked.emit(index.row(), decision)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class ChunkListView(QListView):
+    """Scrollable list of chunk cards with keyboard review.
+
+    ← (or N) keeps the new code and → (or O) keeps the old code for every selected
+    chunk, then moves on to the next chunk, so thousands of chunks can be reviewed
+    without the mouse. Shift/Ctrl extend the selection as usual.
+    """
+    decisions_requested = pyqtSignal(list, str)  # Rows, 'new' or 'old'
+
+    KEY_DECISIONS = {
+        Qt.Key.Key_Left: 'new',
+        Qt.Key.Key_N: 'new',
+        Qt.Key.Key_Right: 'old',
+        Qt.Key.Key_O: 'old',
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.delegate = ChunkDelegate(self)
+        self.setItemDelegate(self.delegate)
+        self.delegate.decision_clicked.connect(lambda row, decision: self.decisions_requested.emit([row], decision))
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(20)
+        # Item heights are cheap to compute, but lay them out in batches so opening stays responsive
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(200)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+
+    def selected_rows(self):
+        rows = sorted(index.row() for index in self.selectionModel().selectedRows())
+        if not rows and self.currentIndex().isValid():
+            rows = [self.currentIndex().row()]
+        return rows
+
+    def keyPressEvent(self, event):
+        decision = self.KEY_DECISIONS.get(event.key())
+        if decision is None or event.modifiers() & ~Qt.KeyboardModifier.KeypadModifier:
+            super().keyPressEvent(event)
+            return
+        rows = self.selected_rows()
+        if not rows:
+            return
+        self.decisions_requested.emit(rows, decision)
+        next_row = rows[-1] + 1
+        if next_row < self.model().rowCount():
+            self.setCurrentIndex(self.model().index(next_row, 0))
+            self.scrollTo(self.currentIndex())
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        pos = event.position().toPoint()
+        index = self.indexAt(pos)
+        over_button = index.isValid() and self.delegate.hit_test(self.visualRect(index), pos) is not None
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor if over_button else Qt.CursorShape.ArrowCursor)
@@ -0,0 +1,383 @@
+"""Virtualized diff viewer that paints only the rows in view"""
+from array import array
+from bisect import bisect_left
+from PyQt6.QtWidgets import QAbstractScrollArea, QFrame
+from PyQt6.QtCore import Qt, QEvent
+from PyQt6.QtGui import QPainter, QFont, QFontMetrics, QColor
+
+from core.diff import get_grouped_opcodes, hunk_header
+from core.intraline import intraline_spans
+from core.syntax import KEYWORD, STRING, COMMENT, NUMBER, VARIABLE
+from services.highlight_service import highlight_service
+from ui.styles import COLORS
+
+# Row kinds
+EQUAL, DELETE, INSERT, FILLER, HEADER = range(5)
+
+# Which line list a row's index points into
+OLD, NEW = 0, 1
+
+# kind -> (background, text color); None background means the view background
+ROW_COLORS = {
+    EQUAL: (None, '#d4d4d4'),
+    DELETE: (COLORS['diff_removed_bg'], COLORS['diff_removed_text']),
+    INSERT: (COLORS['diff_added_bg'], COLORS['diff_added_text']),
+    FILLER: (COLORS['bg_secondary'], None),
+    HEADER: (COLORS['diff_modified_bg'], COLORS['text_link']),
+}
+
+# Background of the changed words inside a changed line
+WORD_COLORS = {
+    DELETE: COLORS['diff_removed_word_bg'],
+    INSERT: COLORS['diff_added_word_bg'],
+}
+
+# Token kind -> text color for syntax highlighting
+SYNTAX_COLORS = {
+    KEYWORD: COLORS['syntax_keyword'],
+    STRING: COLORS['syntax_string'],
+    COMMENT: COLORS['syntax_comment'],
+    NUMBER: COLORS['syntax_number'],
+    VARIABLE: COLORS['syntax_variable'],
+}
+
+GUTTER_PADDING = 10
+TEXT_PADDING = 10
+TAB = '    '
+
+
+class DiffRows:
+    """Display rows for a DiffView, stored as parallel arrays.
+
+    Row r shows line `indices[r]` of `lines[sources[r]]`. An index of -1 marks a
+    filler row (padding opposite the longer side of a change) or a header row whose
+    text is kept in `headers`. `partners[r]` is the line on the other side that a
+    changed line pairs with for word-level highlighting, or -1. Equal runs are appended in bulk, so building the rows
+    for a 200k-line diff is a handful of array extends, not 200k Python objects.
+    `language` (a core.syntax Language) turns on syntax highlighting.
+    """
+    def __init__(self, old_lines=(), new_lines=(), language=None):
+        self.lines = (old_lines, new_lines)
+        self.language = language
+        self.kinds = bytearray()
+        self.sources = bytearray()
+        self.indices = array('l')
+        self.partners = array('l')
+        self.headers = {}  # Row -> header text
+        self.line_width = None  # text_width() of both sides, set by max_text_length()
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def append_run(self, kind, source, start, stop, partner_start=0, partner_stop=0):
+        """Rows for lines [start, stop) of one side.
+
+        Within a change, line start + k pairs with partner_start + k on the other
+        side for as long as both ranges last.
+        """
+        count = stop - start
+        paired = min(count, partner_stop - partner_start)
+        self.kinds.extend(bytes((kind,)) * count)
+        self.sources.extend(bytes((source,)) * count)
+        self.indices.extend(range(start, stop))
+        self.partners.extend(range(partner_start, partner_start + paired))
+        self.partners.extend(array('l', [-1]) * (count - paired))
+
+    def append_filler(self, count):
+        self.kinds.extend(bytes((FILLER,)) * count)
+        self.sources.extend(bytes(count))
+        self.indices.extend(array('l', [-1]) * count)
+        self.partners.extend(array('l', [-1]) * count)
+
+    def append_header(self, text):
+        self.headers[len(self.kinds)] = text
+        self.kinds.append(HEADER)
+        self.sources.append(OLD)
+        self.indices.append(-1)
+        self.partners.append(-1)
+
+    def text(self, row):
+        index = self.indices[row]
+        if index < 0:
+            return self.headers.get(row, "")
+        return display_text(self.lines[self.sources[row]][index])
+
+    def word_spans(self, row):
+        """Changed character ranges of the row's text, or None to mark the whole line"""
+        partner = self.partners[row]
+        if partner < 0:
+            return None
+        source = self.sources[row]
+        text = self.text(row)
+        other = display_text(self.lines[1 - source][partner])
+        if source == OLD:
+            spans = intraline_spans(text, other)
+            return spans[0] if spans else None
+        spans = intraline_spans(other, text)
+        return spans[1] if spans else None
+
+    def number(self, row):
+        """1-based line number shown in the gutter, or None"""
+        index = self.indices[row]
+        return index + 1 if index >= 0 else None
+
+    def max_text_length(self):
+        """Upper bound for the horizontal scroll range, counting each tab as display_text() draws it.
+
+        Computed once; the row builders do it on the diff worker.
+        """
+        if self.line_width is None:
+            self.line_width = max(map(text_width, self.lines))
+        headers = max(map(len, self.headers.values()), default=0)
+        return max(self.line_width, headers)
+
+
+def text_width(lines):
+    """Widest of `lines` once display_text() expanded their tabs (line breaks included)"""
+    shift = len(TAB) - 1
+    return max((len(line) + line.count('\t') * shift for line in lines), default=0)
+
+
+def side_by_side_rows(old_lines, new_lines, opcodes, language=None):
+    """(old_rows, new_rows) aligned row for row; the shorter side of a change gets filler rows"""
+    old_rows = DiffRows(old_lines, new_lines, language)
+    new_rows = DiffRows(old_lines, new_lines, language)
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            old_rows.append_run(EQUAL, OLD, i1, i2)
+            new_rows.append_run(EQUAL, NEW, j1, j2)
+            continue
+        height = max(i2 - i1, j2 - j1)
+        old_rows.append_run(DELETE, OLD, i1, i2, j1, j2)
+        old_rows.append_filler(height - (i2 - i1))
+        new_rows.append_run(INSERT, NEW, j1, j2, i1, i2)
+        new_rows.append_filler(height - (j2 - j1))
+    # Both sides show the same lines; measure them once, here on the worker
+    old_rows.max_text_length()
+    new_rows.line_width = old_rows.line_width
+    return old_rows, new_rows
+
+
+def unified_rows(old_lines, new_lines, opcodes, context=3, language=None):
+    """Single-column rows laid out like unified_diff(): '@@' headers and hunks with context"""
+    rows = DiffRows(old_lines, new_lines, language)
+    for group in get_grouped_opcodes(opcodes, context):
+        rows.append_header(hunk_header(group))
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                rows.append_run(EQUAL, NEW, j1, j2)
+                continue
+            rows.append_run(DELETE, OLD, i1, i2, j1, j2)
+            rows.append_run(INSERT, NEW, j1, j2, i1, i2)
+    rows.max_text_length()  # Measured on the worker, not when the view is filled
+    return rows
+
+
+def display_text(line):
+    return line.rstrip('\r\n').replace('\t', TAB)
+
+
+def display_spans(line, spans):
+    """Token spans of a raw line moved to the offsets of its display_text()"""
+    length = len(line.rstrip('\r\n'))
+    if '\t' not in line:
+        return [(start, min(end, length), kind) for start, end, kind in spans if start < length]
+    tabs = [i for i, char in enumerate(line) if char == '\t']
+    shift = len(TAB) - 1
+    moved = []
+    for start, end, kind in spans:
+        if start >= length:
+            break
+        end = min(end, length)
+        moved.append((start + shift * bisect_left(tabs, start), end + shift * bisect_left(tabs, end), kind))
+    return moved
+
+
+def fill_spans(painter, metrics, text, spans, x, y, height, color):
+    """Highlight character ranges of `text` drawn starting at x"""
+    for start, end in spans:
+        left = x + metrics.horizontalAdvance(text[:start])
+        painter.fillRect(left, y, metrics.horizontalAdvance(text[start:end]), height, color)
+
+
+class DiffView(QAbstractScrollArea):
+    """Read-only diff pane with a line-number gutter that paints only the visible rows.
+
+    Nothing is laid out up front: scroll ranges come from the row count and the
+    longest line, and paintEvent draws one screen of rows. Changed words of paired
+    lines are highlighted as rows are painted (see core.intraline). Rows with a
+    language are tokenized on the highlight worker; until the tokens arrive the text
+    is drawn plain, and afterwards only visible rows apply them. Use link_scrolling() to
+    keep two panes of a side-by-side diff in step.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = DiffRows()
+        self.message = None
+        self._max_chars = 0
+        self._tokens = [None, None]  # Spans per line of the old and new side, once tokenized
+        self._highlight_tasks = []
+        self._syntax_colors = {kind: QColor(color) for kind, color in SYNTAX_COLORS.items()}
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.setFont(QFont("Consolas", 10))
+        self._update_metrics()
+
+    def _update_metrics(self):
+        metrics = QFontMetrics(self.font())
+        self._metrics = metrics
+        self._line_height = metrics.height() + 4
+        self._ascent = metrics.ascent() + 2
+        self._char_width = max(1, metrics.horizontalAdvance('0'))
+        self._update_scrollbars()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.FontChange:
+            self._update_metrics()
+            self.viewport().update()
+
+    def set_rows(self, rows):
+        self.rows = rows
+        self.message = None
+        self._max_chars = rows.max_text_length()
+        self._request_tokens(rows)
+        self.verticalScrollBar().setValue(0)
+        self.horizontalScrollBar().setValue(0)
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def set_message(self, text):
+        """Show a note (placeholder, missing file, error) instead of rows"""
+        self.rows = DiffRows()
+        self.message = text
+        self._max_chars = 0
+        self._request_tokens(self.rows)
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def _request_tokens(self, rows):
+        """Tokenize the sides the rows show, replacing any tokenization still running"""
+        for task in self._highlight_tasks:
+            task.cancel()
+        self._highlight_tasks = []
+        self._tokens = [None, None]
+        if rows.language is None:
+            return
+        for source in (OLD, NEW):
+            if rows.lines[source] and source in rows.sources:
+                task = highlight_service.tokens(rows.lines[source], rows.language, parent=self)
+                task.finished.connect(lambda tokens, s=source, r=rows: self._set_tokens(r, s, tokens))
+                self._highlight_tasks.append(task)
+    
+    def _set_tokens(self, rows, source, tokens):
+        if rows is self.rows:
+            self._tokens[source] = tokens
+            self.viewport().update()
+    
+    def _draw_highlighted(self, painter, text, line, spans, x, y, right, color):
+        """Draw a row's text with its token spans in their colors, stopping past the right edge"""
+        metrics = self._metrics
+        pos = 0
+        for start, end, kind in display_spans(line, spans):
+            if start > pos:
+                painter.setPen(color)
+                painter.drawText(x, y, text[pos:start])
+                x += metrics.horizontalAdvance(text[pos:start])
+            painter.setPen(self._syntax_colors[kind])
+            painter.drawText(x, y, text[start:end])
+            x += metrics.horizontalAdvance(text[start:end])
+            pos = end
+            if x > right:
+                return
+        if pos < len(text):
+            painter.setPen(color)
+            painter.drawText(x, y, text[pos:])
+    
+    def scroll_to_row(self, row):
+        self.verticalScrollBar().setValue(row - self._visible_rows() // 3)
+
+    def _visible_rows(self):
+        return max(1, self.viewport().height() // self._line_height)
+
+    def _gutter_width(self):
+        digits = len(str(max(1, len(self.rows))))
+        return digits * self._char_width + 2 * GUTTER_PADDING
+
+    def _update_scrollbars(self):
+        visible = self._visible_rows()
+        vbar = self.verticalScrollBar()
+        vbar.setRange(0, max(0, len(self.rows) - visible))
+        vbar.setPageStep(visible)
+        vbar.setSingleStep(1)
+
+        content_width = self._gutter_width() + TEXT_PADDING + self._max_chars * self._char_width
+        hbar = self.horizontalScrollBar()
+        hbar.setRange(0, max(0, content_width - self.viewport().width()))
+        hbar.setPageStep(self.viewport().width())
+        hbar.setSingleStep(self._char_width)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.setFont(self.font())
+        rect = self.viewport().rect()
+        painter.fillRect(rect, QColor(COLORS['bg_primary']))
+
+        if self.message is not None:
+            painter.setPen(QColor(COLORS['text_secondary']))
+            painter.drawText(rect.adjusted(TEXT_PADDING, TEXT_PADDING, -TEXT_PADDING, -TEXT_PADDING),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop | Qt.TextFlag.TextWordWrap,
+                             self.message)
+            return
+
+        rows = self.rows
+        line_height = self._line_height
+        first = self.verticalScrollBar().value()
+        last = min(len(rows), first + rect.height() // line_height + 2)
+        gutter = self._gutter_width()
+        text_x = gutter + TEXT_PADDING - self.horizontalScrollBar().value()
+
+        # Row backgrounds and text; the gutter is painted over the text afterwards
+        for row in range(first, last):
+            y = (row - first) * line_height
+            kind = rows.kinds[row]
+            background, foreground = ROW_COLORS[kind]
+            if background:
+                painter.fillRect(0, y, rect.width(), line_height, QColor(background))
+            if foreground:
+                text = rows.text(row)
+                spans = rows.word_spans(row) if kind in WORD_COLORS else None
+                if spans:
+                    fill_spans(painter, self._metrics, text, spans, text_x, y, line_height, QColor(WORD_COLORS[kind]))
+                index = rows.indices[row]
+                tokens = self._tokens[rows.sources[row]] if index >= 0 else None
+                if tokens and tokens[index]:
+                    line = rows.lines[rows.sources[row]][index]
+                    self._draw_highlighted(painter, text, line, tokens[index], text_x, y + self._ascent,
+                                           rect.width(), QColor(foreground))
+                else:
+                    painter.setPen(QColor(foreground))
+                    painter.drawText(text_x, y + self._ascent, text)
+
+        painter.fillRect(0, 0, gutter, rect.height(), QColor(COLORS['bg_primary']))
+        painter.setPen(QColor(COLORS['text_secondary']))
+        for row in range(first, last):
+            y = (row - first) * line_height
+            number = rows.number(row)
+            label = '...' if rows.kinds[row] == HEADER else ('' if number is None else str(number))
+            painter.drawText(0, y, gutter - GUTTER_PADDING, line_height,
+                             Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, label)
+        painter.setPen(QColor(COLORS['border']))
+        painter.drawLine(gutter - 1, 0, gutter - 1, rect.height())
+
+
+def link_scrolling(first, second):
+    """Keep the scroll positions of two DiffViews in step"""
+    for bar_a, bar_b in ((first.verticalScrollBar(), second.verticalScrollBar()),
+                         (first.horizontalScrollBar(), second.horizontalScrollBar())):
+        bar_a.valueChanged.connect(bar_b.setValue)
+        bar_b.valueChanged.connect(bar_a.setValue)
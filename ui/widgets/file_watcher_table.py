@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import (QTableWidget, QTableWidgetItem, QPushButton,
 from PyQt6.QtCore import Qt, QSize
 from PyQt6.QtGui import QCursor, QIcon
 
+from core.byte_compare import read_baseline
 from core.events import FileUpdateEvent, FileDeleteEvent
 from utils.helpers import get_pixmap_from_base64
 from config import DEBUG
@@ -15,6 +16,7 @@ class FileWatcherTable(QTableWidget):
         super().__init__()
         self.folder_to_watch = folder_to_watch
         self.file_contents = {}  # Track old file content for diff {file_path: content}
+        self.generated_globs = []  # The system's globs of generated files, summarized instead of diffed
         
         self.setColumnCount(2)  # Ensure only 2 columns
         self.setHorizontalHeaderLabels(["File Name", "Action"])
@@ -34,30 +36,26 @@ class FileWatcherTable(QTableWidget):
         if column != 0:
             return
         
-        file_name = self.item(row, 0).text()
-        # Normalize path to forward slashes to match stored baseline keys
-        file_path = os.path.join(self.folder_to_watch, file_name).replace("\\", "/")
-        
-        # Get old content from cache (baseline from when Start was clicked)
-        old_content = self.file_contents.get(file_path)
-        
         if DEBUG:
-            print(f"on_file_clicked: {file_path}")
-            print(f"old_content found: {old_content is not None}")
-        
-        # Read current content
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                new_content = f.read()
-        except Exception as e:
-            print(f"Error reading file {file_path}: {e}")
-            new_content = None
+            print(f"on_file_clicked: {self.item(row, 0).text()}")
         
-        # Show chunk-by-chunk review dialog
-        from ui.dialogs.chunk_review_dialog import ChunkReviewDialog
-        dialog = ChunkReviewDialog(file_path, old_content, new_content, self)
+        # Review every file of the table in one window, starting at the clicked one; the
+        # current contents are read on the diff worker
+        from ui.dialogs.review_session_dialog import ReviewSessionDialog
+        dialog = ReviewSessionDialog(self.review_items(), row, self)
         dialog.exec()
     
+    def review_items(self):
+        """A ReviewItem per row: the baseline from when Start was clicked against the file on disk"""
+        from ui.dialogs.review_session_dialog import ReviewItem
+        items = []
+        for row in range(self.rowCount()):
+            # Normalize path to forward slashes to match stored baseline keys
+            file_path = os.path.join(self.folder_to_watch, self.item(row, 0).text()).replace("\\", "/")
+            items.append(ReviewItem(file_path, self.file_contents.get(file_path), new_path=file_path,
+                                    generated_globs=self.generated_globs))
+        return items
+    
     def remove_button_row(self, button):
         # removeRow build-in, but overrite to see log
         for row in range(self.rowCount()):
@@ -112,8 +110,7 @@ class FileWatcherTable(QTableWidget):
         
         # Store the current file content for diff comparison
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                self.file_contents[file_path] = f.read()
+            self.file_contents[file_path] = read_baseline(file_path)
         except Exception as e:
             print(f"Error reading file {file_path}: {e}")
             self.file_contents[file_path] = None
@@ -1,5 +1,5 @@
 """Utility functions and helpers"""
-from .helpers import get_pixmap_from_base64, escape_markdown
+from .helpers import get_pixmap_from_base64, escape_markdown, atomic_write_text
 
-__all__ = ['get_pixmap_from_base64', 'escape_markdown']
+__all__ = ['get_pixmap_from_base64', 'escape_markdown', 'atomic_write_text']
 
@@ -3,6 +3,8 @@ import re
 from PyQt6.QtCore import QByteArray
 from PyQt6.QtGui import QPixmap
 
+from core.hunk_apply import atomic_writer
+
 
 def get_pixmap_from_base64(base64_string):
     """Convert Base64 string to QPixmap."""
@@ -17,3 +19,13 @@ def escape_markdown(text):
     special_chars = r'_\*\[\]\(\)~`>#+-=|{}.!'
     return re.sub(f"([{re.escape(special_chars)}])", r"\\\1", text)
 
+
+
+def atomic_write_text(path, text, encoding='utf-8'):
+    """Write text to a temp file next to `path` and rename it over the original.
+
+    Readers (and the file watcher) only ever see the old or the new file, never a
+    partially written one. Permission bits of an existing file are kept.
+    """
+    with atomic_writer(path) as f:
+        f.write(text.encode(encoding))